@@ -0,0 +1,37 @@
+begin;
+
+-- Claves naturales para el upsert directo del scraper (tools/scrapers/pipeline/push.py):
+--   eventos.clave_origen             <fuente>:<slug>
+--   eventos_municipios.clave_origen  <fuente>:<slug>:<hash venue>
+--   eventoFechas.clave_origen        <clave venue>:<fecha>T<hora>
+-- Filas cargadas a mano o desde la app quedan en null (no chocan con el índice único).
+-- Las que ya había cargado el scraper desde los CSV también quedan en null: la clave de
+-- venues usa la normalización de texto de Python, así que no se calcula aquí; push.py las
+-- busca antes del upsert y les completa clave_origen en vez de insertar un duplicado.
+alter table public.eventos
+  add column if not exists clave_origen text;
+
+alter table public.eventos_municipios
+  add column if not exists clave_origen text;
+
+alter table public."eventoFechas"
+  add column if not exists clave_origen text;
+
+create unique index if not exists eventos_clave_origen_key
+  on public.eventos (clave_origen);
+
+create unique index if not exists eventos_municipios_clave_origen_key
+  on public.eventos_municipios (clave_origen);
+
+create unique index if not exists "eventoFechas_clave_origen_key"
+  on public."eventoFechas" (clave_origen);
+
+-- El push no envía ids: las secuencias deben ir por delante de los ids cargados desde CSV.
+select setval(pg_get_serial_sequence('public.eventos', 'id'), coalesce(max(id), 0) + 1, false)
+  from public.eventos;
+select setval(pg_get_serial_sequence('public.eventos_municipios', 'id'), coalesce(max(id), 0) + 1, false)
+  from public.eventos_municipios;
+select setval(pg_get_serial_sequence('public."eventoFechas"', 'id'), coalesce(max(id), 0) + 1, false)
+  from public."eventoFechas";
+
+commit;
@@ -0,0 +1,16 @@
+begin;
+
+-- Clave natural de categoriaEventos para el upsert de categorías nuevas del scraper
+-- (tools/scrapers/pipeline/push.py): el nombre normalizado (minúsculas, sin acentos ni
+-- puntuación). Las categorías cargadas a mano quedan en null; el push las reconoce por nombre.
+alter table public."categoriaEventos"
+  add column if not exists clave_origen text;
+
+create unique index if not exists "categoriaEventos_clave_origen_key"
+  on public."categoriaEventos" (clave_origen);
+
+-- Antes el scraper insertaba categorías con id propio (max+1): la secuencia debe ir por delante.
+select setval(pg_get_serial_sequence('public."categoriaEventos"', 'id'), coalesce(max(id), 0) + 1, false)
+  from public."categoriaEventos";
+
+commit;
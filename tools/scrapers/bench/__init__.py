@@ -0,0 +1 @@
+"""Benchmarks offline de los scrapers (corpus sintético + páginas guardadas)."""
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del parseo por página de scrape_prticket (sin red).
+
+Uso:
+  python3 tools/scrapers/bench/bench_extraction.py --count 300
+  python3 tools/scrapers/bench/bench_extraction.py --pages-dir exports/prticket/pages --baseline-rev HEAD~1
+
+Con --baseline-rev se parsea el mismo corpus con scrape_prticket.py de esa
+revisión ("antes") y con el árbol actual ("después"), y se verifica que ambos
+produzcan el mismo EventScraped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.harness import event_page_parser, load_module_at_rev, summarize, time_each  # noqa: E402
+from prticket import scrape_prticket  # noqa: E402
+
+SCRAPER_RELPATH = "tools/scrapers/prticket/scrape_prticket.py"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de extracción por página.")
+    parser.add_argument("--pages-dir", default="", help="Directorio con páginas guardadas (*.html).")
+    parser.add_argument("--count", type=int, default=300, help="Páginas sintéticas si no hay --pages-dir.")
+    parser.add_argument("--save-pages", default="", help="Guardar el corpus sintético en este directorio.")
+    parser.add_argument("--baseline-rev", default="", help="Revisión git a comparar (antes).")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas completas; se reporta la mejor.")
+    parser.add_argument("--json-out", default="", help="Guardar resultados en JSON.")
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = synthetic.load_pages_dir(Path(args.pages_dir))
+    else:
+        pages = synthetic.event_pages(args.count)
+        if args.save_pages:
+            synthetic.save_pages_dir(Path(args.save_pages), pages)
+    if not pages:
+        print("ERROR: corpus vacío.", file=sys.stderr)
+        return 1
+
+    results = {"pages": len(pages), "avg_page_kb": round(sum(len(p) for _, p in pages) / len(pages) / 1024, 1)}
+
+    after_parse = event_page_parser(scrape_prticket, synthetic.municipios_rows())
+    after_out = [after_parse(item) for item in pages]
+    results["after"] = summarize(time_each(after_parse, pages, repeat=args.repeat))
+
+    if args.baseline_rev:
+        baseline = load_module_at_rev(args.baseline_rev, SCRAPER_RELPATH, "scrape_prticket_baseline")
+        before_parse = event_page_parser(baseline, synthetic.municipios_rows())
+        before_out = [before_parse(item) for item in pages]
+        results["before"] = summarize(time_each(before_parse, pages, repeat=args.repeat))
+        results["baseline_rev"] = args.baseline_rev
+        results["mismatches"] = sum(
+            1 for a, b in zip(before_out, after_out) if repr(a) != repr(b)
+        )
+        if results["after"]["total_ms"]:
+            results["speedup"] = round(results["before"]["total_ms"] / results["after"]["total_ms"], 3)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if results.get("mismatches") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Memoria de los registros del pipeline (tracemalloc) para N eventos sintéticos.
+
+Para cada tamaño de --sizes mide, en bytes retenidos (current) y pico (peak):
+- eventos: N EventScraped con sus Venue (NamedTuple) frente a los mismos
+  campos en dicts;
+- export_state: ExportState tras append_event_rows de los N eventos;
+- filas: las filas NamedTuple de ese estado frente a las mismas como dict
+  (como se guardaban antes);
+- csv: pico al escribir eventoFechas con write_rows frente a write_csv (dicts,
+  csv.DictWriter como antes) y tiempo de cada escritura sin tracemalloc (la
+  mejor de --repeat pasadas).
+
+En eventos y filas las dos variantes comparten los strings: la diferencia es
+solo el contenedor de cada registro.
+
+Los eventos se generan directamente (sin HTML ni parseo), así se mide solo
+el tamaño de los registros.
+
+Uso:
+  python3 tools/scrapers/bench/bench_memory.py --sizes 10000,100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from common.id_allocator import IdAllocator  # noqa: E402
+from pipeline import stages  # noqa: E402
+from pipeline.models import EventoFechaRow, EventScraped, Venue  # noqa: E402
+
+
+def iter_events(count: int, seed: int = 7) -> Iterator[EventScraped]:
+    rng = random.Random(seed)
+    for idx in range(count):
+        municipio_id = rng.randint(1, len(synthetic.MUNICIPIOS))
+        venues = [
+            Venue(
+                municipio_id=municipio_id,
+                municipio_nombre=synthetic.MUNICIPIOS[municipio_id - 1],
+                lugar=f"{rng.choice(synthetic.VENUE_KINDS)} {rng.choice(synthetic.VENUE_NAMES)}",
+                direccion=f"Calle {rng.randint(1, 99)}, {synthetic.MUNICIPIOS[municipio_id - 1]}",
+            )
+            for _ in range(rng.choice((1, 1, 1, 2)))
+        ]
+        datetimes = [
+            (f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", f"{rng.randint(10, 22):02d}:{rng.choice(('00', '30'))}")
+            for _ in range(rng.randint(1, 4))
+        ]
+        slug = f"evento-sintetico-{idx}"
+        yield EventScraped(
+            url=f"{synthetic.BASE_EVENTS_URL}{slug}",
+            slug=slug,
+            nombre=f"Evento sintético {idx}",
+            descripcion=" ".join(rng.choice(synthetic.FILLER_SENTENCES) for _ in range(6)),
+            costo=f"${rng.randint(10, 150)}.00",
+            categoria_raw=rng.choice(synthetic.CATEGORIES),
+            imagen=f"https://cdn.example.com/{slug}.jpg",
+            datetimes=datetimes,
+            venues=venues,
+        )
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, Dict[str, int]]:
+    """Construye con tracemalloc activo; devuelve el resultado y sus bytes retenidos / pico."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"current_bytes": current, "peak_bytes": peak, "seconds": round(elapsed, 3)}
+
+
+def copy_events(events: List[EventScraped], as_dict: bool) -> list:
+    """Copia los eventos (mismos strings y listas de fechas) como NamedTuple o como dict."""
+    copies: list = []
+    for event in events:
+        if as_dict:
+            values = dict(zip(event._fields, event))
+            values["venues"] = [dict(zip(v._fields, v)) for v in event.venues]
+            copies.append(values)
+        else:
+            copies.append(event._replace(venues=[Venue(*v) for v in event.venues]))
+    return copies
+
+
+def build_state(count: int) -> stages.ExportState:
+    state = stages.ExportState(
+        source="prticket",
+        ids=IdAllocator(None, stages.ID_TABLES),
+        next_new_category_id=13,
+    )
+    categorias = synthetic.categorias_rows()
+    for scraped in iter_events(count):
+        stages.append_event_rows(state, scraped.url, scraped, None, categorias)
+    return state
+
+
+def copy_rows(state: stages.ExportState, as_dict: bool) -> Dict[str, list]:
+    """Copia las filas (mismos strings) como NamedTuple o como dict: mide solo el contenedor de cada fila."""
+    copies: Dict[str, list] = {}
+    for name, row_type in state.ROW_LISTS:
+        rows = getattr(state, name)
+        copies[name] = [dict(zip(row._fields, row)) for row in rows] if as_dict else [row_type(*row) for row in rows]
+    return copies
+
+
+def ratio(old: Dict[str, int], new: Dict[str, int], key: str) -> float:
+    return round(old[key] / new[key], 2) if new[key] else 0.0
+
+
+def run_size(count: int, out_dir: Path, repeat: int = 3) -> dict:
+    result: dict = {"events": count}
+
+    events = list(iter_events(count))
+    _, slotted = measure(lambda: copy_events(events, as_dict=False))
+    _, plain = measure(lambda: copy_events(events, as_dict=True))
+    result["eventos"] = {"slots": slotted, "dict": plain, "ratio_current": ratio(plain, slotted, "current_bytes")}
+    events.clear()
+
+    state, built = measure(lambda: build_state(count))
+    result["rows"] = {name: len(getattr(state, name)) for name, _ in state.ROW_LISTS}
+    result["export_state"] = built
+    _, tuple_mem = measure(lambda: copy_rows(state, as_dict=False))
+    dict_rows, dict_mem = measure(lambda: copy_rows(state, as_dict=True))
+    result["filas"] = {"namedtuple": tuple_mem, "dict": dict_mem, "ratio_current": ratio(dict_mem, tuple_mem, "current_bytes")}
+
+    fechas_path = out_dir / "eventoFechas.csv"
+
+    def write_tuples() -> None:
+        stages.write_rows(fechas_path, EventoFechaRow, state.evento_fechas_rows)
+
+    def write_dicts() -> None:
+        stages.write_csv(fechas_path, list(EventoFechaRow._fields), dict_rows["evento_fechas_rows"])
+
+    _, written_tuple = measure(write_tuples)
+    written_tuple["best_seconds"] = best_seconds(write_tuples, repeat)
+    tuple_csv = fechas_path.read_bytes()
+    _, written_dict = measure(write_dicts)
+    written_dict["best_seconds"] = best_seconds(write_dicts, repeat)
+    result["csv"] = {
+        "write_rows": written_tuple,
+        "write_csv_dict": written_dict,
+        "speedup": round(written_dict["best_seconds"] / written_tuple["best_seconds"], 2) if written_tuple["best_seconds"] else 0.0,
+        "identical": tuple_csv == fechas_path.read_bytes(),
+    }
+    return result
+
+
+def best_seconds(write: Callable[[], object], repeat: int) -> float:
+    """Mejor tiempo de `repeat` escrituras, sin tracemalloc (que multiplica el costo de cada asignación)."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        write()
+        best = min(best, time.perf_counter() - t0)
+    return round(best, 4)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de registros y filas del pipeline.")
+    parser.add_argument("--sizes", default="10000,100000", help="Cantidades de eventos, separadas por coma.")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas del tiempo de escritura del CSV (se toma la mejor).")
+    parser.add_argument("--json-out", default="", help="Guardar resultados en JSON.")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory(prefix="bench_memory_") as tmp:
+        results = {"runs": [run_size(count, Path(tmp), args.repeat) for count in sizes]}
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0 if all(run["csv"]["identical"] for run in results["runs"]) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark del matcher de municipios sobre un corpus de líneas de descripción.
+
+Compara el recorrido lineal original (substring " nombre " por cada municipio)
+con MunicipioMatcher, para detect_municipio_id (mejor municipio) y para el
+chequeo `contains` de infer_venues, y verifica que den el mismo resultado.
+
+Uso:
+  python3 tools/scrapers/bench/bench_municipio_matcher.py --lines 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.harness import summarize, time_each  # noqa: E402
+from pipeline import stages  # noqa: E402
+
+
+def linear_find(text_norm, municipios):
+    padded = f" {text_norm} "
+    for municipio in municipios:
+        if f" {municipio[2]} " in padded:
+            return municipio
+    return None
+
+
+def linear_contains(text_norm, municipios):
+    return any(f" {nombre_norm} " in f" {text_norm} " for _, _, nombre_norm in municipios)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del matcher de municipios.")
+    parser.add_argument("--lines", type=int, default=20000, help="Líneas del corpus.")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas; se reporta la mejor.")
+    args = parser.parse_args()
+
+    matcher = stages.build_municipios(synthetic.municipios_rows())
+    municipios = list(matcher)
+    lines = [stages.normalize_text(ln) for ln in synthetic.description_lines_corpus(args.lines)]
+
+    mismatches = 0
+    for ln in lines:
+        if linear_find(ln, municipios) != matcher.find(ln) or linear_contains(ln, municipios) != matcher.contains(ln):
+            mismatches += 1
+
+    result = {
+        "lines": len(lines),
+        "municipios": len(municipios),
+        "mismatches": mismatches,
+        "find_linear": summarize(time_each(lambda ln: linear_find(ln, municipios), lines, args.repeat)),
+        "find_matcher": summarize(time_each(matcher.find, lines, args.repeat)),
+        "contains_linear": summarize(time_each(lambda ln: linear_contains(ln, municipios), lines, args.repeat)),
+        "contains_matcher": summarize(time_each(matcher.contains, lines, args.repeat)),
+    }
+    for op in ("find", "contains"):
+        fast = result[f"{op}_matcher"]["total_ms"]
+        if fast:
+            result[f"{op}_speedup"] = round(result[f"{op}_linear"]["total_ms"] / fast, 2)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
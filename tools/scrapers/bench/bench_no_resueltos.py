@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark del enriquecimiento de fill_venues_addresses con un registro de no resueltos grande.
+
+Corre enrich_rows (todo en memoria, sin red) sobre el mismo lote de filas con
+registros de 0 a 50k venues pendientes y reporta el tiempo por fila, que con
+NoResueltosStore debería mantenerse plano. Como referencia mide también la
+limpieza lineal original (recorrer todo el registro por cada fila resuelta)
+sobre una muestra de filas, y verifica que ambas dejen el mismo registro.
+
+Uso:
+  python3 tools/scrapers/bench/bench_no_resueltos.py --rows 2000 --sizes 0,10000,50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.harness import summarize  # noqa: E402
+from common import fill_venues_addresses as fva  # noqa: E402
+from common.no_resueltos_store import NoResueltosStore  # noqa: E402
+from common.text import clean_spaces, normalize_text  # noqa: E402
+from common.venue_cache_store import VenueCacheStore  # noqa: E402
+
+SOURCE = "prticket"
+
+
+class _StubResolver:
+    """Sin red: alterna direcciones resueltas y ZERO_RESULTS según la clave."""
+
+    api_calls = 0
+
+    def resolve(self, key, lugar, municipio_id):
+        self.api_calls += 1
+        digest = zlib.crc32(key.encode("utf-8"))
+        if digest % 3 == 0:
+            return None, "ZERO_RESULTS"
+        return {"direccion": f"Calle {digest % 500}, Puerto Rico", "place_id": key, "fuente": "google_places"}, None
+
+
+def venue_name(rng: random.Random, idx: int) -> str:
+    return f"{rng.choice(synthetic.VENUE_KINDS)} {rng.choice(synthetic.VENUE_NAMES)} {idx}"
+
+
+def build_input(rng: random.Random, rows: int):
+    input_rows = []
+    cache = {}
+    for idx in range(rows):
+        lugar = venue_name(rng, idx % (rows // 2 or 1))
+        municipio_id = str(rng.randint(1, len(synthetic.MUNICIPIOS)))
+        input_rows.append({"lugar": lugar, "municipio_id": municipio_id, "enlaceboletos": f"https://x/{idx}"})
+        if idx % 2 == 0:
+            key = fva.make_key(lugar, municipio_id)
+            cache[key] = {
+                "key": key,
+                "nombre_lugar": lugar,
+                "municipio_id": municipio_id,
+                "direccion": f"Carr. {idx}, Puerto Rico",
+                "place_id": f"pid{idx}",
+                "fuente": "google_places",
+            }
+    return input_rows, cache
+
+
+def build_unresolved(rng: random.Random, size: int, input_rows):
+    """Pendientes: ~10% del mismo lote (se limpian al resolver), el resto de otros venues/fuentes."""
+    rows = []
+    for idx in range(size):
+        if input_rows and idx % 10 == 0:
+            src = rng.choice(input_rows)
+            lugar, municipio_id, fuente = src["lugar"].upper(), src["municipio_id"], SOURCE
+        else:
+            lugar = f"Pendiente {idx} {rng.choice(synthetic.VENUE_NAMES)}"
+            municipio_id = str(rng.randint(1, len(synthetic.MUNICIPIOS)))
+            fuente = rng.choice([SOURCE, "pietix", "ticketera"])
+        rows.append(
+            {
+                "nombre_lugar": lugar,
+                "municipio_id": municipio_id,
+                "fuente_scraper": fuente,
+                "enlaceboletos": f"https://x/p{idx}",
+                "motivo": "ZERO_RESULTS",
+            }
+        )
+    return rows
+
+
+def make_store(rows):
+    store = NoResueltosStore(fva.NO_RESUELTOS_HEADERS)
+    for row in rows:
+        store.add(dict(row))
+    return store
+
+
+def legacy_cleanup(no_resueltos: dict, lugar: str, municipio_id: str, source_name: str) -> None:
+    to_delete = []
+    for unresolved_key, unresolved_row in no_resueltos.items():
+        if (
+            normalize_text(unresolved_row.get("nombre_lugar", "")) == normalize_text(lugar)
+            and clean_spaces(unresolved_row.get("municipio_id", "")) == municipio_id
+            and clean_spaces(unresolved_row.get("fuente_scraper", "")).lower() == source_name.lower()
+        ):
+            to_delete.append(unresolved_key)
+    for unresolved_key in to_delete:
+        no_resueltos.pop(unresolved_key, None)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de enrich_rows con no_resueltos grande.")
+    parser.add_argument("--rows", type=int, default=2000, help="Filas de entrada a enriquecer.")
+    parser.add_argument("--sizes", default="0,1000,10000,50000", help="Tamaños del registro de no resueltos.")
+    parser.add_argument("--legacy-rows", type=int, default=100, help="Filas de muestra para la limpieza lineal.")
+    parser.add_argument("--json-out", default="", help="Guardar resultados en JSON.")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    input_rows, base_cache = build_input(rng, args.rows)
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bench_no_resueltos_"))
+    results = {"rows": len(input_rows), "sizes": []}
+    mismatches = 0
+
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        unresolved = build_unresolved(random.Random(size), size, input_rows)
+        store = make_store(unresolved)
+        cache = VenueCacheStore(tmp_dir / f"cache_{size}.sqlite")
+        cache.upsert_many(base_cache.values())
+
+        t0 = time.perf_counter()
+        _, stats = fva.enrich_rows(input_rows, cache, store, _StubResolver(), SOURCE)
+        elapsed = time.perf_counter() - t0
+        cache.close()
+
+        # Referencia lineal: mismo registro inicial, limpieza por cada fila resuelta.
+        legacy = {}
+        for row in unresolved:
+            legacy["|".join(row[h] for h in fva.NO_RESUELTOS_HEADERS)] = dict(row)
+        sample = input_rows[: args.legacy_rows]
+        legacy_samples = []
+        for row in sample:
+            lugar = clean_spaces(row["lugar"])
+            t1 = time.perf_counter()
+            legacy_cleanup(legacy, lugar, row["municipio_id"], SOURCE)
+            legacy_samples.append(time.perf_counter() - t1)
+
+        check = make_store(unresolved)
+        for row in sample:
+            check.discard_venue(clean_spaces(row["lugar"]), row["municipio_id"], SOURCE)
+        if [check.row_key(r) for r in check.rows()] != list(legacy):
+            mismatches += 1
+
+        legacy_summary = summarize(legacy_samples)
+        results["sizes"].append(
+            {
+                "no_resueltos": size,
+                "restantes": len(store),
+                "enrich_total_ms": round(elapsed * 1000, 3),
+                "enrich_ms_por_fila": round(elapsed * 1000 / max(1, len(input_rows)), 4),
+                "cache_hits": stats["cache_hits"],
+                "legacy_limpieza_ms_por_fila": legacy_summary["mean_ms"],
+                "legacy_estimado_total_ms": round(legacy_summary["mean_ms"] * len(input_rows), 1),
+            }
+        )
+
+    results["mismatches"] = mismatches
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
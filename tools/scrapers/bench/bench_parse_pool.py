@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throughput del parseo en procesos (pipeline/parse_pool.py) vs. en el hilo principal.
+
+Parsea el mismo corpus (sintético o --pages-dir) con 0 procesos (source.parse
+directo) y con cada valor de --workers, manteniendo en vuelo a lo sumo
+queue_size páginas como hace iter_scraped_events; verifica que todos den los
+mismos EventScraped en el mismo orden.
+
+Uso:
+  python3 tools/scrapers/bench/bench_parse_pool.py --count 2000 --workers 1,2,4,8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from pipeline import stages  # noqa: E402
+from pipeline.models import EventScraped  # noqa: E402
+from pipeline.parse_pool import ParsePool  # noqa: E402
+from pipeline.source import get_source  # noqa: E402
+
+
+def parse_pooled(pool: ParsePool, source, pages: List[Tuple[str, str]]) -> List[EventScraped]:
+    results: List[EventScraped] = []
+    in_flight: Deque = deque()
+    for url, page in pages:
+        if len(in_flight) >= pool.queue_size:
+            results.append(in_flight.popleft().result())
+        in_flight.append(pool.submit(source, url, page))
+    results.extend(future.result() for future in in_flight)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del pool de procesos de parseo.")
+    parser.add_argument("--pages-dir", default="", help="Directorio con páginas guardadas (*.html).")
+    parser.add_argument("--count", type=int, default=1000, help="Páginas sintéticas si no hay --pages-dir.")
+    parser.add_argument("--workers", default="1,2,4", help="Procesos a probar, separados por coma.")
+    parser.add_argument("--source", default="prticket", help="Fuente cuyo parse se mide.")
+    parser.add_argument("--json-out", default="", help="Guardar resultados en JSON.")
+    args = parser.parse_args()
+
+    pages = synthetic.load_pages_dir(Path(args.pages_dir)) if args.pages_dir else synthetic.event_pages(args.count)
+    if not pages:
+        print("ERROR: corpus vacío.", file=sys.stderr)
+        return 1
+    source = get_source(args.source)
+    municipios_rows = synthetic.municipios_rows()
+    municipios = stages.build_municipios(municipios_rows)
+
+    t0 = time.perf_counter()
+    expected = [source.parse(url, page, municipios) for url, page in pages]
+    elapsed = time.perf_counter() - t0
+    results = {
+        "pages": len(pages),
+        "cpu_count": os.cpu_count(),
+        "runs": [{"workers": 0, "seconds": round(elapsed, 3), "pages_per_s": round(len(pages) / elapsed, 1)}],
+    }
+    mismatches = 0
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        with ParsePool(workers, municipios_rows) as pool:
+            # Arranque de los procesos (spawn + import) fuera del cronómetro.
+            parse_pooled(pool, source, pages[: pool.workers])
+            t0 = time.perf_counter()
+            got = parse_pooled(pool, source, pages)
+            elapsed = time.perf_counter() - t0
+        mismatches += sum(1 for a, b in zip(expected, got) if a != b)
+        results["runs"].append(
+            {
+                "workers": workers,
+                "seconds": round(elapsed, 3),
+                "pages_per_s": round(len(pages) / elapsed, 1),
+                "speedup": round(results["runs"][0]["seconds"] / elapsed, 2) if elapsed else 0.0,
+            }
+        )
+    results["mismatches"] = mismatches
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Benchmark de punta a punta de scrape_prticket + fill_venues_addresses sin red.
+
+Sirve un corpus de 100/1k/10k eventos desde un FixtureServer local (páginas
+sintéticas, o grabadas con record_fixtures.py y recicladas hasta el tamaño
+pedido) y cronometra cada etapa con el código real:
+
+  reference_data   selects de Municipios/categoriaEventos/max id (Supabase)
+  fetch            frontpage + páginas de eventos por HttpEngine
+  extract          scan_event_page + *_from_fields (título, categoría, imagen, precio)
+  dates            scan_lines (prticket/datetime_scanner) / pair_dates_times
+  infer_venues     infer_venues
+  map_category_id  map_category_id
+  rows             append_event_rows
+  csv_write        write_csv de las 4 salidas + SQL de categorías
+  enrichment       fill_venues_addresses (Google Places servido por el fixture)
+
+Los resultados se guardan en JSON (por defecto bench/results/pipeline-<rev>.json)
+para comparar commits con --compare.
+
+Uso:
+  python3 tools/scrapers/bench/bench_pipeline.py --sizes 100,1000
+  python3 tools/scrapers/bench/bench_pipeline.py --fixtures exports/prticket/fixtures --sizes 1000
+  python3 tools/scrapers/bench/bench_pipeline.py --sizes 1000 --compare HEAD~1 --fail-over 1.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import fixtures  # noqa: E402
+from bench.harness import summarize  # noqa: E402
+from common import fill_venues_addresses as fva  # noqa: E402
+from common import reference_data  # noqa: E402
+from common.http_engine import HostPolicy  # noqa: E402
+from common.id_allocator import IdAllocator  # noqa: E402
+from common.no_resueltos_store import NoResueltosStore  # noqa: E402
+from common.venue_cache_store import VenueCacheStore  # noqa: E402
+from pipeline import stages as ps  # noqa: E402
+from pipeline.models import EventoFechaRow, EventoMunicipioRow, EventoRow, NoDatedRow  # noqa: E402
+from prticket import scrape_prticket as sp  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+STAGES = [
+    "reference_data",
+    "fetch",
+    "extract",
+    "dates",
+    "infer_venues",
+    "map_category_id",
+    "rows",
+    "csv_write",
+    "enrichment",
+]
+EXPORT_FILES = ps.ExportFiles.for_source("prticket")
+MAX_ID_TABLES = ("eventos", "eventos_municipios", "eventoFechas")
+
+
+def git_rev() -> str:
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, text=True).strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain", "--", str(BENCH_DIR.parent)], cwd=BENCH_DIR, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+    return f"{rev}-dirty" if dirty.strip() else rev
+
+
+def stage(total_seconds: float, items: int, samples: Optional[List[float]] = None) -> dict:
+    result = {
+        "items": items,
+        "total_ms": round(total_seconds * 1000, 3),
+        "items_per_s": round(items / total_seconds, 1) if total_seconds > 0 else 0.0,
+    }
+    if samples is not None:
+        result["per_item"] = summarize(samples)
+    return result
+
+
+def run_size(store: fixtures.FixtureStore, args: argparse.Namespace, work_dir: Path) -> dict:
+    stages: Dict[str, dict] = {}
+    with fixtures.FixtureServer(store) as server:
+        http = fixtures.ReplayHttpEngine(
+            server.base_url,
+            default_policy=HostPolicy(max_concurrency=args.fetch_workers, rate=0.0),
+            timeout=30,
+        )
+        # Sin snapshot en disco: mide la ronda en frío contra Supabase.
+        reference_client = reference_data.ReferenceData(http=http, url=fixtures.SUPABASE_URL, key="bench")
+
+        t0 = time.perf_counter()
+        reference = reference_client.load(max_id_tables=MAX_ID_TABLES)
+        municipios_rows = reference.tables["Municipios"]
+        categorias = reference.tables["categoriaEventos"]
+        ids = IdAllocator(None, ps.ID_TABLES)
+        for table, max_id in reference.max_ids.items():
+            ids.raise_floor(table, max_id)
+        municipios = ps.build_municipios(municipios_rows)
+        stages["reference_data"] = stage(time.perf_counter() - t0, 2 + len(MAX_ID_TABLES))
+
+        # fetch: ventana de `fetch_workers` descargas en vuelo; el HTML no se retiene.
+        t0 = time.perf_counter()
+        event_urls = sp.extract_frontpage_event_urls(http.fetch_text(sp.FRONTPAGE_URL))
+        latencies: List[float] = []
+        fetched_bytes = 0
+
+        async def timed_fetch(url: str) -> int:
+            start = time.perf_counter()
+            text = await http.afetch_text(url)
+            latencies.append(time.perf_counter() - start)
+            return len(text)
+
+        pending = []
+        for url in event_urls:
+            pending.append(http.submit(timed_fetch(url)))
+            if len(pending) >= args.fetch_workers * 4:
+                fetched_bytes += pending.pop(0).result()
+        fetched_bytes += sum(future.result() for future in pending)
+        stages["fetch"] = stage(time.perf_counter() - t0, len(event_urls), latencies)
+        stages["fetch"]["mb"] = round(fetched_bytes / 1e6, 2)
+
+        # Etapas de parseo, por página (el HTML sale del store fuera del cronómetro).
+        samples: Dict[str, List[float]] = {name: [] for name in ("extract", "dates", "infer_venues", "map_category_id")}
+        new_categories: Dict[str, int] = {}
+        next_category_id = 100
+        scraped_events = []
+        for url in event_urls:
+            page_html = store.text(url)
+            t0 = time.perf_counter()
+            fields = sp.scan_event_page(page_html)
+            data_layer = sp.parse_data_layer(fields.data_layer_json)
+            description_text = sp.html_to_text(fields.description_html)
+            sp.title_from_fields(fields)
+            categoria_raw = sp.category_from_fields(fields, data_layer)
+            sp.image_from_fields(fields, url)
+            sp.summarize_price(description_text, price_html=fields.price_html)
+            t1 = time.perf_counter()
+            lines = sp.split_lines(description_text)
+            line_scans = sp.scan_lines(lines)
+            dates = [val for scan in line_scans for val in scan.dates]
+            times_ = [val for scan in line_scans for val in scan.times]
+            sp.pair_dates_times(list(dict.fromkeys(dates)), list(dict.fromkeys(times_)))
+            t2 = time.perf_counter()
+            sp.infer_venues(lines, data_layer, municipios, line_scans)
+            t3 = time.perf_counter()
+            _, next_category_id = ps.map_category_id(categoria_raw, categorias, new_categories, next_category_id)
+            t4 = time.perf_counter()
+            samples["extract"].append(t1 - t0)
+            samples["dates"].append(t2 - t1)
+            samples["infer_venues"].append(t3 - t2)
+            samples["map_category_id"].append(t4 - t3)
+            scraped_events.append((url, sp.parse_event_page(url, page_html, municipios)))
+        for name, values in samples.items():
+            stages[name] = stage(sum(values), len(values), values)
+
+        state = ps.ExportState(
+            source="prticket",
+            ids=ids,
+            next_new_category_id=max(13, max((int(r.get("id", 0)) for r in categorias), default=0) + 1),
+        )
+        t0 = time.perf_counter()
+        for url, scraped in scraped_events:
+            ps.append_event_rows(state, url, scraped, None, categorias)
+        stages["rows"] = stage(time.perf_counter() - t0, len(scraped_events))
+
+        outputs = [
+            (EXPORT_FILES.eventos_csv, EventoRow, state.eventos_rows),
+            (EXPORT_FILES.eventos_municipios_csv, EventoMunicipioRow, state.eventos_municipios_rows),
+            (EXPORT_FILES.evento_fechas_csv, EventoFechaRow, state.evento_fechas_rows),
+            (EXPORT_FILES.no_dated_csv, NoDatedRow, state.no_dated_rows),
+        ]
+        t0 = time.perf_counter()
+        for name, row_type, rows in outputs:
+            ps.write_rows(work_dir / name, row_type, rows)
+        ps.write_category_sql(work_dir / EXPORT_FILES.categorias_sql, state.categories_new)
+        stages["csv_write"] = stage(time.perf_counter() - t0, sum(len(rows) for _, _, rows in outputs))
+
+        # enrichment: cache vacío en cada tamaño, así todos los venues pasan por Google (servido local).
+        input_path = work_dir / EXPORT_FILES.eventos_municipios_csv
+        cache = VenueCacheStore(work_dir / "venues_cache.sqlite")
+        resolver = fva.GoogleResolver(
+            http=http,
+            api_key="bench",
+            municipios_map={str(r["id"]): r["nombre"] for r in municipios_rows},
+            details_fanout=args.details_fanout,
+            details_hedge=args.details_hedge,
+            cache=cache,
+        )
+        enrich_headers = fva.read_csv_headers(input_path)
+        if "direccion" not in enrich_headers:
+            enrich_headers.append("direccion")
+        enrich_stats = fva.new_enrich_stats()
+        t0 = time.perf_counter()
+        if args.enrich_workers > 1:
+            resolver.prefetch(fva.collect_cache_misses(fva.iter_csv_rows(input_path), cache), workers=args.enrich_workers)
+        enriched = fva.iter_enriched_rows(
+            fva.iter_csv_rows(input_path),
+            cache,
+            NoResueltosStore(fva.NO_RESUELTOS_HEADERS),
+            resolver,
+            "prticket",
+            enrich_stats,
+        )
+        written = fva.write_csv_stream(
+            work_dir / "eventos_municipios_con_direcciones.csv",
+            enrich_headers,
+            enriched,
+        )
+        stages["enrichment"] = stage(time.perf_counter() - t0, written)
+        stages["enrichment"]["api_calls"] = resolver.api_calls
+        stages["enrichment"]["cache_hits"] = enrich_stats["cache_hits"]
+        cache.close()
+        http.close()
+
+        return {
+            "events": len(event_urls),
+            "exported": len(state.eventos_rows),
+            "http_requests": server.requests,
+            "http_misses": server.misses,
+            "stages": stages,
+        }
+
+
+def resolve_results_path(ref: str) -> Path:
+    """`ref` es un JSON de resultados o una revisión git con resultados en bench/results."""
+    path = Path(ref)
+    if path.exists():
+        return path
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "--short", ref], cwd=BENCH_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        raise FileNotFoundError(f"no existe {ref} ni es una revisión git") from None
+    path = RESULTS_DIR / f"pipeline-{rev}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"no hay resultados guardados para {ref} ({path})")
+    return path
+
+
+def compare(previous: dict, current: dict) -> List[dict]:
+    """Cociente actual/anterior de total_ms por tamaño y etapa (>1 = más lento)."""
+    rows = []
+    before_by_size = {run["events"]: run for run in previous.get("runs", [])}
+    for run in current.get("runs", []):
+        before = before_by_size.get(run["events"])
+        if before is None:
+            continue
+        for name in STAGES:
+            old = before["stages"].get(name, {}).get("total_ms")
+            new = run["stages"].get(name, {}).get("total_ms")
+            if not old or new is None:
+                continue
+            rows.append({"events": run["events"], "stage": name, "before_ms": old, "after_ms": new, "ratio": round(new / old, 3)})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark por etapas de los scrapers con fixtures HTTP locales.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Tamaños del corpus (eventos).")
+    parser.add_argument("--fixtures", default="", help="Directorio de fixtures grabadas (record_fixtures.py).")
+    parser.add_argument("--seed", type=int, default=7, help="Semilla del corpus sintético.")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="Descargas simultáneas en la etapa fetch.")
+    parser.add_argument("--enrich-workers", type=int, default=8, help="--workers de fill_venues_addresses.")
+    parser.add_argument("--details-fanout", type=int, default=fva.DEFAULT_DETAILS_FANOUT, help="--details-fanout del enriquecedor.")
+    parser.add_argument("--details-hedge", type=float, default=fva.DEFAULT_DETAILS_HEDGE, help="--details-hedge del enriquecedor.")
+    parser.add_argument("--label", default="", help="Etiqueta libre guardada con los resultados.")
+    parser.add_argument("--json-out", default="", help="Ruta del JSON (por defecto bench/results/pipeline-<rev>.json).")
+    parser.add_argument("--compare", default="", help="JSON o revisión git con resultados previos para comparar.")
+    parser.add_argument("--fail-over", type=float, default=0.0, help="Salir con 1 si alguna etapa supera este cociente.")
+    args = parser.parse_args()
+
+    recorded = fixtures.FixtureStore.load(Path(args.fixtures)) if args.fixtures else None
+    rev = git_rev()
+    results = {
+        "rev": rev,
+        "label": args.label,
+        "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "corpus": f"fixtures:{args.fixtures}" if recorded else f"synthetic:seed={args.seed}",
+        "runs": [],
+    }
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        store = fixtures.scaled_store(recorded, size) if recorded else fixtures.synthetic_store(size, seed=args.seed)
+        with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+            run = run_size(store, args, Path(tmp))
+        results["runs"].append(run)
+        print(f"[{size}] " + ", ".join(f"{name} {run['stages'][name]['total_ms']:.0f}ms" for name in STAGES), file=sys.stderr)
+
+    out_path = Path(args.json_out) if args.json_out else RESULTS_DIR / f"pipeline-{rev}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"Resultados: {out_path}", file=sys.stderr)
+
+    if args.compare:
+        previous = json.loads(resolve_results_path(args.compare).read_text(encoding="utf-8"))
+        rows = compare(previous, results)
+        for row in rows:
+            print(f"{row['events']:>6} {row['stage']:<16} {row['before_ms']:>10.1f} → {row['after_ms']:>10.1f} ms  x{row['ratio']}")
+        if args.fail_over and any(row["ratio"] > args.fail_over for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,319 @@
+"""
+Fixtures HTTP grabadas para correr los scrapers sin red.
+
+- FixtureStore: respuestas (status, content-type, cuerpo gzip) indexadas por
+  host + path + query sin credenciales (key/apikey). Se guarda en un directorio
+  con index.json y un archivo .gz por respuesta.
+- FixtureServer: ThreadingHTTPServer local que sirve el store. El primer
+  segmento del path es el host original (/boletos.prticket.com/events/en/...),
+  así un solo servidor atiende PRticket, Supabase y Google. Lo que no está
+  grabado lo responde `fallback` (por defecto: Google Places y max id de
+  Supabase sintéticos y deterministas).
+- ReplayHttpEngine: HttpEngine que reescribe cualquier URL hacia el servidor
+  local; el resto del motor (pool, token bucket, gzip) es el real.
+- RecordingHttpEngine: HttpEngine real que además guarda cada respuesta en un
+  FixtureStore (ver record_fixtures.py).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import threading
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bench import synthetic
+from common.http_engine import HttpEngine, HttpResponse
+
+SUPABASE_HOST = "bench.supabase.co"
+SUPABASE_URL = f"https://{SUPABASE_HOST}"
+PRTICKET_HOST = "boletos.prticket.com"
+GOOGLE_HOST = "maps.googleapis.com"
+FRONTPAGE_PATH = "/events/en/frontpage"
+EVENTS_PATH = "/events/en/"
+
+# Parámetros que no forman parte de la clave (credenciales).
+SECRET_PARAMS = {"key", "apikey"}
+
+Fixture = Tuple[int, str, bytes]  # status, content-type, cuerpo gzip
+Fallback = Callable[[str, str, Dict[str, str]], Optional[Tuple[int, str, bytes]]]
+
+
+def fixture_key(url: str) -> str:
+    parsed = urllib.parse.urlsplit(url)
+    params = [(k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True) if k not in SECRET_PARAMS]
+    query = urllib.parse.urlencode(sorted(params))
+    return f"{parsed.hostname or ''}{parsed.path or '/'}" + (f"?{query}" if query else "")
+
+
+class FixtureStore:
+    def __init__(self) -> None:
+        self.entries: Dict[str, Fixture] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, url: str) -> bool:
+        return fixture_key(url) in self.entries
+
+    def add(self, url: str, body: bytes, content_type: str = "text/html; charset=utf-8", status: int = 200) -> None:
+        self.entries[fixture_key(url)] = (status, content_type, gzip.compress(body, compresslevel=6))
+
+    def add_json(self, url: str, payload: Any) -> None:
+        self.add(url, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def lookup(self, key: str) -> Optional[Fixture]:
+        return self.entries.get(key)
+
+    def text(self, url: str) -> str:
+        entry = self.entries[fixture_key(url)]
+        return gzip.decompress(entry[2]).decode("utf-8", errors="replace")
+
+    def save(self, directory: Path) -> None:
+        bodies = directory / "bodies"
+        bodies.mkdir(parents=True, exist_ok=True)
+        index = {}
+        for idx, (key, (status, content_type, body)) in enumerate(sorted(self.entries.items())):
+            name = f"{idx:06d}.gz"
+            (bodies / name).write_bytes(body)
+            index[key] = {"status": status, "content_type": content_type, "file": name}
+        (directory / "index.json").write_text(json.dumps(index, indent=1, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path) -> "FixtureStore":
+        store = cls()
+        index = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+        for key, meta in index.items():
+            body = (directory / "bodies" / meta["file"]).read_bytes()
+            store.entries[key] = (int(meta["status"]), meta["content_type"], body)
+        return store
+
+
+# ---- Corpus sintético / escalado ----
+
+
+def add_reference_tables(store: FixtureStore, max_ids: Optional[Dict[str, int]] = None) -> None:
+    """Municipios y categoriaEventos con las mismas queries que usan los scrapers."""
+    store.add_json(f"{SUPABASE_URL}/rest/v1/Municipios?select=id,nombre&order=nombre.asc", synthetic.municipios_rows())
+    store.add_json(
+        f"{SUPABASE_URL}/rest/v1/categoriaEventos?select=id,nombre,icono&order=id.asc", synthetic.categorias_rows()
+    )
+    for table, max_id in (max_ids or {}).items():
+        store.add_json(f"{SUPABASE_URL}/rest/v1/{table}?select=id&order=id.desc&limit=1", [{"id": max_id}])
+
+
+def add_frontpage(store: FixtureStore, event_urls: List[str]) -> None:
+    store.add(f"https://{PRTICKET_HOST}{FRONTPAGE_PATH}", synthetic.frontpage_html(event_urls).encode("utf-8"))
+
+
+def synthetic_store(count: int, seed: int = 7) -> FixtureStore:
+    store = FixtureStore()
+    urls = []
+    for url, page in synthetic.iter_event_pages(count, seed=seed):
+        store.add(url, page.encode("utf-8"))
+        urls.append(url)
+    add_frontpage(store, urls)
+    add_reference_tables(store)
+    return store
+
+
+def scaled_store(recorded: FixtureStore, count: int) -> FixtureStore:
+    """Corpus de `count` eventos reciclando las páginas grabadas con slugs nuevos."""
+    pages = [fixture_key(url) for url in iter_event_urls(recorded)]
+    if not pages:
+        raise ValueError("las fixtures grabadas no tienen páginas de eventos de PRticket")
+    store = FixtureStore()
+    store.entries.update({k: v for k, v in recorded.entries.items() if not k.startswith(PRTICKET_HOST)})
+    urls = []
+    for idx in range(count):
+        source = pages[idx % len(pages)]
+        slug = source.rsplit("/", 1)[-1] + ("" if idx < len(pages) else f"-r{idx // len(pages)}")
+        url = f"https://{PRTICKET_HOST}{EVENTS_PATH}{slug}"
+        store.entries[fixture_key(url)] = recorded.entries[source]
+        urls.append(url)
+    add_frontpage(store, urls)
+    if fixture_key(f"{SUPABASE_URL}/rest/v1/Municipios?select=id,nombre&order=nombre.asc") not in store.entries:
+        add_reference_tables(store)
+    return store
+
+
+def iter_event_urls(store: FixtureStore) -> Iterator[str]:
+    prefix = f"{PRTICKET_HOST}{EVENTS_PATH}"
+    for key in sorted(store.entries):
+        if key.startswith(prefix) and key != f"{PRTICKET_HOST}{FRONTPAGE_PATH}":
+            yield f"https://{key}"
+
+
+def synthetic_fallback(host: str, path: str, params: Dict[str, str]) -> Optional[Tuple[int, str, bytes]]:
+    """Respuestas deterministas para lo que no está grabado (Google Places y max id de Supabase)."""
+    if host == GOOGLE_HOST and path.endswith("/textsearch/json"):
+        query = params.get("query", "")
+        digest = zlib.crc32(query.encode("utf-8"))
+        if digest % 7 == 0:
+            return _json_response({"status": "ZERO_RESULTS", "results": []})
+        name = query.split(",", 1)[0]
+        results = [
+            {
+                "place_id": f"bench-{digest:08x}-{rank}",
+                "name": name,
+                "formatted_address": f"{name}, Calle {digest % 900 + rank}, Puerto Rico",
+                "geometry": {"location": {"lat": 18.0 + (digest % 1000) / 10000, "lng": -66.0 - rank / 100}},
+            }
+            for rank in range(1 + digest % 3)
+        ]
+        return _json_response({"status": "OK", "results": results})
+    if host == GOOGLE_HOST and path.endswith("/details/json"):
+        place_id = params.get("place_id", "")
+        digest = zlib.crc32(place_id.encode("utf-8"))
+        result = {
+            "place_id": place_id,
+            "formatted_address": f"Calle {digest % 900}, Urb. Bench, Puerto Rico 00{digest % 1000:03d}",
+            "geometry": {"location": {"lat": 18.2, "lng": -66.5}},
+        }
+        return _json_response({"status": "OK", "result": result})
+    if host == SUPABASE_HOST and path.startswith("/rest/v1/") and params.get("order") == "id.desc":
+        return _json_response([{"id": 1000}])
+    return None
+
+
+def _json_response(payload: Any) -> Tuple[int, str, bytes]:
+    return 200, "application/json; charset=utf-8", gzip.compress(json.dumps(payload).encode("utf-8"), compresslevel=1)
+
+
+# ---- Servidor local ----
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Conexiones keep-alive que el cliente cierra o cancela no son errores del fixture.
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    def __init__(self, store: FixtureStore, fallback: Optional[Fallback] = synthetic_fallback) -> None:
+        self.store = store
+        self.fallback = fallback
+        self.requests = 0
+        self.misses = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: Optional[_QuietServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None, "FixtureServer.start() no fue llamado"
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FixtureServer":
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Encabezados y cuerpo van en writes separados; sin esto cada respuesta espera el ACK retardado.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                owner._handle(self)
+
+        self._server = _QuietServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        host, _, rest = handler.path.lstrip("/").partition("/")
+        key = fixture_key(f"http://{host}/{rest}")
+        entry = self.store.lookup(key)
+        if entry is None and self.fallback is not None:
+            parsed = urllib.parse.urlsplit(f"/{rest}")
+            entry = self.fallback(host, parsed.path, dict(urllib.parse.parse_qsl(parsed.query)))
+        with self._lock:
+            self.requests += 1
+            if entry is None:
+                self.misses += 1
+        if entry is None:
+            entry = (404, "text/plain", gzip.compress(b"fixture no grabada"))
+        status, content_type, body = entry
+        if "gzip" not in handler.headers.get("Accept-Encoding", ""):
+            body = gzip.decompress(body)
+            encoding = ""
+        else:
+            encoding = "gzip"
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", content_type)
+            if encoding:
+                handler.send_header("Content-Encoding", encoding)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except ConnectionError:
+            # El cliente canceló el request (p. ej. details descartados por el fan-out).
+            handler.close_connection = True
+            return
+        with self._lock:
+            self.bytes_sent += len(body)
+
+
+# ---- Motores HTTP ----
+
+
+class ReplayHttpEngine(HttpEngine):
+    """HttpEngine que envía todo al FixtureServer: https://host/path → {base}/host/path."""
+
+    def __init__(self, base_url: str, **kwargs: Any) -> None:
+        # El FixtureServer es local: sin los proxies del entorno.
+        kwargs.setdefault("proxies", {})
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def replay_url(self, url: str) -> str:
+        if url.startswith(self.base_url):
+            return url
+        parsed = urllib.parse.urlsplit(url)
+        target = f"{self.base_url}/{parsed.hostname}{parsed.path or '/'}"
+        return f"{target}?{parsed.query}" if parsed.query else target
+
+    async def arequest(self, method: str, url: str, *args: Any, **kwargs: Any) -> HttpResponse:
+        return await super().arequest(method, self.replay_url(url), *args, **kwargs)
+
+
+class RecordingHttpEngine(HttpEngine):
+    """HttpEngine real que guarda cada respuesta 2xx en `store` (sin credenciales en la clave)."""
+
+    def __init__(self, store: FixtureStore, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.store = store
+        self._record_lock = threading.Lock()
+
+    async def arequest(self, method: str, url: str, *args: Any, **kwargs: Any) -> HttpResponse:
+        response = await super().arequest(method, url, *args, **kwargs)
+        if method.upper() == "GET":
+            with self._record_lock:
+                self.store.add(url, response.body, response.headers.get("content-type", ""), response.status)
+        return response
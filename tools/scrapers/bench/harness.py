@@ -0,0 +1,119 @@
+"""Utilidades comunes de los benchmarks: métricas de tiempo y carga de módulos de otra revisión git."""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+SCRAPERS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRAPERS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRAPERS_DIR))
+
+# Paquetes que un módulo de otra revisión debe importar desde esa misma revisión.
+SIBLING_PACKAGES = ("prticket", "common", "pipeline", "bench")
+
+
+def summarize(samples_seconds: List[float]) -> Dict[str, float]:
+    """Resumen en milisegundos: total, media, mediana y p95."""
+    if not samples_seconds:
+        return {"n": 0, "total_ms": 0.0, "mean_ms": 0.0, "median_ms": 0.0, "p95_ms": 0.0}
+    ordered = sorted(samples_seconds)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "n": len(ordered),
+        "total_ms": round(sum(ordered) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+    }
+
+
+def time_each(func: Callable, items: List, repeat: int = 1) -> List[float]:
+    """Tiempo por ítem (mejor de `repeat` pasadas completas)."""
+    best: List[float] = []
+    for _ in range(max(1, repeat)):
+        samples = []
+        for item in items:
+            t0 = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - t0)
+        if not best or sum(samples) < sum(best):
+            best = samples
+    return best
+
+
+def load_module_at_rev(rev: str, relpath: str, name: str) -> ModuleType:
+    """Importa `relpath` tal como estaba en la revisión git `rev` (para comparar antes/después).
+
+    Los módulos hermanos (prticket.*, common.*, pipeline.*) también se toman de `rev`: se
+    extrae tools/scrapers de esa revisión y se importa con esos paquetes
+    aislados en sys.modules, restaurando los actuales al terminar.
+    """
+    repo_root = Path(
+        subprocess.check_output(["git", "rev-parse", "--show-toplevel"], cwd=SCRAPERS_DIR, text=True).strip()
+    )
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bench_rev_"))
+    scrapers_rel = SCRAPERS_DIR.relative_to(repo_root).as_posix()
+    archive = subprocess.check_output(["git", "archive", rev, scrapers_rel], cwd=repo_root)
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(tmp_dir)
+    rev_scrapers_dir = tmp_dir / scrapers_rel
+
+    source = subprocess.check_output(["git", "show", f"{rev}:{relpath}"], cwd=repo_root)
+    path = tmp_dir / f"{name}.py"
+    path.write_bytes(source)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+
+    shared = [key for key in sys.modules if key.split(".")[0] in SIBLING_PACKAGES]
+    saved = {key: sys.modules.pop(key) for key in shared}
+    sys.path.insert(0, str(rev_scrapers_dir))
+    try:
+        # dataclasses resuelve anotaciones vía sys.modules durante la carga.
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(rev_scrapers_dir))
+        for key in [key for key in sys.modules if key.split(".")[0] in SIBLING_PACKAGES]:
+            del sys.modules[key]
+        sys.modules.update(saved)
+    return module
+
+
+class _StaticHttp:
+    """Sustituto del cliente HTTP para revisiones sin parse_event_page: devuelve la página actual."""
+
+    def __init__(self) -> None:
+        self.page = ""
+
+    def fetch_text(self, url: str, extra_headers=None) -> str:
+        return self.page
+
+
+def event_page_parser(module: ModuleType, municipios_rows: List[dict]) -> Callable[[Tuple[str, str]], object]:
+    """(url, html) → EventScraped con el scrape_prticket de `module` (el actual o uno de load_module_at_rev)."""
+    if hasattr(module, "build_municipios"):
+        municipios = module.build_municipios(municipios_rows)
+    else:
+        from pipeline.stages import build_municipios
+
+        municipios = build_municipios(municipios_rows)
+    if hasattr(module, "parse_event_page"):
+        return lambda item: module.parse_event_page(item[0], item[1], municipios)
+    http = _StaticHttp()
+
+    def parse(item: Tuple[str, str]) -> object:
+        http.page = item[1]
+        return module.scrape_event(http=http, event_url=item[0], municipios=municipios)
+
+    return parse
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+PostgREST mínimo en memoria para probar --push y reference_data sin Supabase.
+
+Atiende /rest/v1/<tabla> con lo que usan los scrapers:
+- GET: select=a,b | order=col.asc|desc | limit=N | filtros col=eq.valor,
+  col=is.null y col=in.(a,"b c").
+- POST (lista JSON): on_conflict=col con Prefer resolution=merge-duplicates o
+  ignore-duplicates y return=representation|minimal (+ select=).
+  Cada request es atómico; ids de una secuencia por tabla si la fila no trae id.
+  Igual que Postgres: on_conflict sin índice único → 400/42P10, fila duplicada
+  en un mismo lote → 400/21000, foreign key inexistente → 409/23503,
+  unique violado → 409/23505.
+
+El esquema replica las foreign keys reales (eventoFechas → eventos_municipios →
+eventos → categoriaEventos/Municipios) y el índice único de clave_origen.
+
+Uso (servidor suelto, con Municipios/categorías sintéticos):
+  python3 tools/scrapers/bench/postgrest_stub.py --port 54321
+  SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_SERVICE_ROLE_KEY=x \\
+    python3 tools/scrapers/prticket/scrape_prticket.py --push
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import csv
+import json
+import sys
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.fixtures import _QuietServer  # noqa: E402
+
+
+@dataclass
+class TableSpec:
+    unique: Tuple[str, ...] = ()
+    foreign_keys: Dict[str, str] = field(default_factory=dict)
+
+
+DEFAULT_SCHEMA: Dict[str, TableSpec] = {
+    "Municipios": TableSpec(),
+    "categoriaEventos": TableSpec(unique=("clave_origen",)),
+    "eventos": TableSpec(
+        unique=("clave_origen",),
+        foreign_keys={"categoria": "categoriaEventos", "municipio_id": "Municipios"},
+    ),
+    "eventos_municipios": TableSpec(
+        unique=("clave_origen",),
+        foreign_keys={"event_id": "eventos", "municipio_id": "Municipios"},
+    ),
+    "eventoFechas": TableSpec(
+        unique=("clave_origen",),
+        foreign_keys={"evento_municipio_id": "eventos_municipios"},
+    ),
+}
+
+
+class PostgrestStubError(Exception):
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # nulls last, como el order por defecto de PostgREST en asc.
+    return (1, "") if value is None else (0, value)
+
+
+class PostgrestStub:
+    def __init__(self, schema: Optional[Dict[str, TableSpec]] = None) -> None:
+        self.schema = dict(DEFAULT_SCHEMA if schema is None else schema)
+        self.tables: Dict[str, List[dict]] = {name: [] for name in self.schema}
+        self.sequences: Dict[str, int] = {name: 0 for name in self.schema}
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_QuietServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- datos ----
+
+    def seed(self, table: str, rows: List[dict]) -> None:
+        with self._lock:
+            for row in rows:
+                self.tables[table].append(dict(row))
+                self.sequences[table] = max(self.sequences[table], int(row.get("id") or 0))
+
+    def seed_reference(self) -> "PostgrestStub":
+        self.seed("Municipios", synthetic.municipios_rows())
+        self.seed("categoriaEventos", synthetic.categorias_rows())
+        return self
+
+    def rows(self, table: str) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self.tables[table]]
+
+    def select(self, table: str, params: Dict[str, str]) -> List[dict]:
+        if table not in self.tables:
+            raise PostgrestStubError(404, "42P01", f'relation "public.{table}" does not exist')
+        with self._lock:
+            rows = [dict(row) for row in self.tables[table]]
+        for column, condition in params.items():
+            if column in {"select", "order", "limit", "offset", "on_conflict", "columns"}:
+                continue
+            op, _, value = condition.partition(".")
+            if op == "eq":
+                rows = [row for row in rows if str(row.get(column)) == value]
+            elif op == "is" and value == "null":
+                rows = [row for row in rows if row.get(column) is None]
+            elif op == "in" and value.startswith("(") and value.endswith(")"):
+                reader = csv.reader([value[1:-1]], quotechar='"', escapechar="\\", doublequote=False)
+                wanted = set(next(reader, []))
+                rows = [row for row in rows if row.get(column) is not None and str(row.get(column)) in wanted]
+            else:
+                raise PostgrestStubError(400, "PGRST100", f"operador no soportado por el stub: {op}")
+        for term in reversed([t for t in params.get("order", "").split(",") if t]):
+            column, _, direction = term.partition(".")
+            rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=direction.startswith("desc"))
+        if params.get("limit"):
+            rows = rows[: int(params["limit"])]
+        return self._project(rows, params.get("select", "*"))
+
+    @staticmethod
+    def _project(rows: List[dict], select: str) -> List[dict]:
+        if not select or select == "*":
+            return rows
+        columns = [c.strip() for c in select.split(",") if c.strip()]
+        return [{c: row.get(c) for c in columns} for row in rows]
+
+    def upsert(self, table: str, payload: List[dict], on_conflict: str, prefer: str) -> List[dict]:
+        """Aplica un POST completo o nada; devuelve las filas insertadas/actualizadas."""
+        spec = self.schema.get(table)
+        if spec is None:
+            raise PostgrestStubError(404, "42P01", f'relation "public.{table}" does not exist')
+        unique = ("id",) + spec.unique
+        if on_conflict and on_conflict not in unique:
+            raise PostgrestStubError(
+                400, "42P10", "there is no unique or exclusion constraint matching the ON CONFLICT specification"
+            )
+        ignore = "resolution=ignore-duplicates" in prefer
+        merge = "resolution=merge-duplicates" in prefer
+        with self._lock:
+            rows = copy.deepcopy(self.tables[table])
+            sequence = self.sequences[table]
+            touched: List[dict] = []
+            seen_keys = set()
+            for incoming in payload:
+                for column, target in spec.foreign_keys.items():
+                    value = incoming.get(column)
+                    if value is not None and not any(r.get("id") == value for r in self.tables[target]):
+                        raise PostgrestStubError(
+                            409, "23503", f'insert or update on table "{table}" violates foreign key constraint on {column}'
+                        )
+                conflict_value = incoming.get(on_conflict) if on_conflict else None
+                existing = None
+                if conflict_value is not None:
+                    if conflict_value in seen_keys and merge:
+                        raise PostgrestStubError(
+                            400, "21000", "ON CONFLICT DO UPDATE command cannot affect row a second time"
+                        )
+                    seen_keys.add(conflict_value)
+                    existing = next((r for r in rows if r.get(on_conflict) == conflict_value), None)
+                if existing is not None:
+                    if merge:
+                        existing.update({k: v for k, v in incoming.items() if k != "id"})
+                        touched.append(existing)
+                    elif not ignore:
+                        raise PostgrestStubError(409, "23505", f"duplicate key value violates unique constraint ({on_conflict})")
+                    continue
+                row = dict(incoming)
+                if row.get("id") is None:
+                    sequence += 1
+                    row["id"] = sequence
+                sequence = max(sequence, int(row["id"]))
+                for column in unique:
+                    value = row.get(column)
+                    if value is not None and any(r.get(column) == value for r in rows):
+                        raise PostgrestStubError(409, "23505", f"duplicate key value violates unique constraint ({column})")
+                rows.append(row)
+                touched.append(row)
+            self.tables[table] = rows
+            self.sequences[table] = sequence
+            return [dict(row) for row in touched]
+
+    # ---- servidor ----
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None, "PostgrestStub.start() no fue llamado"
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self, port: int = 0) -> "PostgrestStub":
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                owner._handle(self, "GET")
+
+            def do_POST(self) -> None:
+                owner._handle(self, "POST")
+
+        self._server = _QuietServer(("127.0.0.1", port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="postgrest-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "PostgrestStub":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        parsed = urllib.parse.urlsplit(handler.path)
+        params = dict(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+        table = urllib.parse.unquote(parsed.path.rsplit("/", 1)[-1])
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        with self._lock:
+            self.requests[f"{method} {table}"] = self.requests.get(f"{method} {table}", 0) + 1
+        status, payload = 200, None
+        try:
+            if not parsed.path.startswith("/rest/v1/"):
+                raise PostgrestStubError(404, "PGRST125", "ruta no soportada por el stub")
+            if not handler.headers.get("apikey"):
+                raise PostgrestStubError(401, "PGRST301", "falta apikey")
+            if method == "GET":
+                payload = self.select(table, params)
+            else:
+                body = json.loads(raw.decode("utf-8") or "[]")
+                rows = body if isinstance(body, list) else [body]
+                prefer = handler.headers.get("Prefer", "")
+                touched = self.upsert(table, rows, params.get("on_conflict", ""), prefer)
+                status = 201
+                if "return=representation" in prefer:
+                    payload = self._project(touched, params.get("select", "*"))
+        except PostgrestStubError as exc:
+            status, payload = exc.status, {"code": exc.code, "message": exc.message, "details": None, "hint": None}
+        except ValueError as exc:
+            status, payload = 400, {"code": "PGRST102", "message": f"JSON inválido: {exc}", "details": None, "hint": None}
+        data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            handler.send_response(status)
+            if data:
+                handler.send_header("Content-Type", "application/json; charset=utf-8")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except ConnectionError:
+            handler.close_connection = True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PostgREST en memoria para probar --push sin Supabase.")
+    parser.add_argument("--port", type=int, default=54321, help="Puerto local.")
+    args = parser.parse_args()
+
+    stub = PostgrestStub().seed_reference().start(args.port)
+    print(f"SUPABASE_URL={stub.base_url} (Ctrl-C para terminar)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    stub.stop()
+    for table in stub.tables:
+        print(f"{table}: {len(stub.tables[table])} filas")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
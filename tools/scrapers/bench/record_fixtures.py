@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Graba fixtures reales para bench_pipeline.py (una sola vez, con red).
+
+Guarda la frontpage de PRticket, las primeras --count páginas de eventos y,
+si hay SUPABASE_URL/key en el entorno, las tablas Municipios/categoriaEventos
+y los max id. Con --google N además resuelve los primeros N venues con Google
+Places (llamadas facturadas) y graba textsearch/details. Las claves de las
+fixtures no incluyen credenciales (key/apikey) y las de Supabase se guardan
+bajo el host ficticio del benchmark.
+
+Uso:
+  python3 tools/scrapers/bench/record_fixtures.py --out exports/prticket/fixtures --count 200
+  python3 tools/scrapers/bench/record_fixtures.py --out exports/prticket/fixtures --count 200 --google 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import urllib.parse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import fixtures  # noqa: E402
+from common import fill_venues_addresses as fva  # noqa: E402
+from common import reference_data  # noqa: E402
+from common.http_engine import HostPolicy  # noqa: E402
+from pipeline import stages  # noqa: E402
+from prticket import scrape_prticket as sp  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Grabar fixtures HTTP reales para los benchmarks.")
+    parser.add_argument("--out", required=True, help="Directorio de salida (index.json + bodies/).")
+    parser.add_argument("--count", type=int, default=200, help="Páginas de eventos a grabar.")
+    parser.add_argument("--google", type=int, default=0, help="Venues a resolver y grabar con Google Places.")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests/seg por host.")
+    args = parser.parse_args()
+
+    repo_root = stages.find_repo_root(Path(__file__).resolve().parent)
+    env = {}
+    env.update(stages.load_env_file(repo_root / ".env"))
+    env.update(stages.load_env_file(repo_root / ".env.local"))
+    env.update(os.environ)
+
+    store = fixtures.FixtureStore()
+    http = fixtures.RecordingHttpEngine(
+        store,
+        default_headers={"Accept-Language": "en-US,en;q=0.9,es;q=0.8"},
+        default_policy=HostPolicy(max_concurrency=2, rate=args.rate),
+        timeout=sp.REQUEST_TIMEOUT,
+    )
+
+    municipios_rows = []
+    supabase_url = env.get("SUPABASE_URL", "").strip()
+    supabase_key = (env.get("SUPABASE_SERVICE_ROLE_KEY") or env.get("SUPABASE_ANON_KEY") or "").strip()
+    if supabase_url and supabase_key:
+        reference = reference_data.ReferenceData(http=http, url=supabase_url, key=supabase_key).load(
+            max_id_tables=("eventos", "eventos_municipios", "eventoFechas")
+        )
+        municipios_rows = reference.tables["Municipios"]
+        # Las URLs de Supabase se re-indexan bajo el host ficticio que usa el benchmark.
+        real_host = urllib.parse.urlsplit(supabase_url).hostname or ""
+        for key in [k for k in store.entries if k.startswith(f"{real_host}/")]:
+            store.entries[fixtures.SUPABASE_HOST + key[len(real_host):]] = store.entries.pop(key)
+    else:
+        print("[WARN] Sin SUPABASE_URL/key: se usarán las tablas sintéticas al reproducir.")
+
+    event_urls = sp.extract_frontpage_event_urls(http.fetch_text(sp.FRONTPAGE_URL))[: max(0, args.count)]
+    futures = [http.submit(http.afetch_text(url)) for url in event_urls]
+    pages = []
+    for url, future in zip(event_urls, futures):
+        try:
+            pages.append((url, future.result()))
+        except Exception as exc:
+            print(f"[WARN] {url}: {exc}")
+
+    google_key = env.get("GOOGLE_MAPS_API_KEY", "").strip()
+    if args.google and google_key and municipios_rows:
+        municipios = stages.build_municipios(municipios_rows)
+        nombres = {str(r["id"]): r["nombre"] for r in municipios_rows}
+        venues = {}
+        for url, page in pages:
+            for venue in sp.parse_event_page(url, page, municipios).venues:
+                if venue.municipio_id:
+                    venues.setdefault((venue.lugar, str(venue.municipio_id)), None)
+        for lugar, municipio_id in list(venues)[: args.google]:
+            fva.google_places_resolve(http, google_key, lugar, nombres.get(municipio_id, ""))
+    elif args.google:
+        print("[WARN] --google requiere GOOGLE_MAPS_API_KEY y Municipios de Supabase; no se grabó Google.")
+
+    http.close()
+    out_dir = Path(args.out)
+    store.save(out_dir)
+    print(f"Fixtures: {len(store)} respuestas ({len(pages)} páginas de eventos) en {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+"""
+Corpus sintético de PRticket para benchmarks offline.
+
+Las páginas imitan la estructura que consume scrape_prticket (dataLayerP4,
+section.event-description-landing, meta og:*, picture/img, span.price-text)
+con el mismo volumen aproximado de HTML de relleno (scripts, estilos, menú).
+Cuando existe exports/prticket/eventos_prticket.csv se reutilizan sus
+descripciones reales; el resto se genera con plantillas. Todo es determinista
+a partir de la semilla.
+"""
+
+from __future__ import annotations
+
+import csv
+import html
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+BASE_EVENTS_URL = "https://boletos.prticket.com/events/en/"
+
+MUNICIPIOS = [
+    "Adjuntas", "Aguada", "Aguadilla", "Aguas Buenas", "Aibonito", "Añasco", "Arecibo", "Arroyo",
+    "Barceloneta", "Barranquitas", "Bayamón", "Cabo Rojo", "Caguas", "Camuy", "Canóvanas", "Carolina",
+    "Cataño", "Cayey", "Ceiba", "Ciales", "Cidra", "Coamo", "Comerío", "Corozal", "Culebra", "Dorado",
+    "Fajardo", "Florida", "Guánica", "Guayama", "Guayanilla", "Guaynabo", "Gurabo", "Hatillo",
+    "Hormigueros", "Humacao", "Isabela", "Jayuya", "Juana Díaz", "Juncos", "Lajas", "Lares",
+    "Las Marías", "Las Piedras", "Loíza", "Luquillo", "Manatí", "Maricao", "Maunabo", "Mayagüez",
+    "Moca", "Morovis", "Naguabo", "Naranjito", "Orocovis", "Patillas", "Peñuelas", "Ponce",
+    "Quebradillas", "Rincón", "Río Grande", "Sabana Grande", "Salinas", "San Germán", "San Juan",
+    "San Lorenzo", "San Sebastián", "Santa Isabel", "Toa Alta", "Toa Baja", "Trujillo Alto", "Utuado",
+    "Vega Alta", "Vega Baja", "Vieques", "Villalba", "Yabucoa", "Yauco",
+]
+
+CATEGORIES = ["Concert", "Theater", "Sports", "Family", "Comedy", "Festival", "Party", "Culture", "Food", "Other"]
+
+VENUE_KINDS = ["Teatro", "Coliseo", "Centro de Bellas Artes", "Anfiteatro", "Estadio", "Plaza", "Club", "Café", "Hotel", "Sala"]
+VENUE_NAMES = ["Tito Puente", "Luis A. Ferré", "Roberto Clemente", "La Perla", "Yagüez", "Victoria", "del Mar", "Central", "Municipal", "Santiago Iglesias"]
+
+MONTHS_ES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+MONTHS_EN = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+WEEKDAYS_ES = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+FILLER_SENTENCES = [
+    "Una noche inolvidable con los mejores artistas de la isla.",
+    "Los boletos están sujetos a cargos por servicio.",
+    "No se permiten cámaras profesionales ni grabaciones.",
+    "Evento apto para toda la familia.",
+    "Las puertas abren una hora antes del comienzo.",
+    "Estacionamiento disponible en las inmediaciones del lugar.",
+    "Un espectáculo lleno de música, humor y sorpresas.",
+    "Don't miss the show of the year!",
+]
+
+
+def municipios_rows() -> List[dict]:
+    """Filas como las devuelve Supabase para Municipios (id, nombre)."""
+    return [{"id": idx, "nombre": nombre} for idx, nombre in enumerate(MUNICIPIOS, start=1)]
+
+
+def categorias_rows() -> List[dict]:
+    names = ["Conciertos", "Festivales", "Deportes", "Ferias", "Familiar", "Fiestas", "Cultura", "Gastronomía", "Otro", "Comedia", "Otros", "Horror"]
+    return [{"id": idx, "nombre": nombre, "icono": ""} for idx, nombre in enumerate(names, start=1)]
+
+
+def find_repo_root(start: Path) -> Path:
+    current = start.resolve()
+    for candidate in [current] + list(current.parents):
+        if (candidate / "exports").is_dir() and (candidate / "tools").is_dir():
+            return candidate
+    return start.resolve()
+
+
+def load_real_descriptions(repo_root: Optional[Path] = None) -> List[dict]:
+    """Descripciones reales exportadas por el scraper (si existen en exports/prticket)."""
+    root = repo_root or find_repo_root(Path(__file__).parent)
+    path = root / "exports" / "prticket" / "eventos_prticket.csv"
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8", newline="") as f:
+        return [row for row in csv.DictReader(f) if row.get("descripcion")]
+
+
+def _date_line(rng: random.Random) -> str:
+    year = rng.choice([2025, 2026, 2027])
+    month = rng.randrange(12)
+    day = rng.randint(1, 28)
+    style = rng.randrange(4)
+    if style == 0:
+        return f"🗓️ {rng.choice(WEEKDAYS_ES)}, {day} de {MONTHS_ES[month]} de {year}"
+    if style == 1:
+        return f"{MONTHS_EN[month]} {day}, {year}"
+    if style == 2:
+        return f"Fecha: {day}/{month + 1}/{year}"
+    return f"{year}-{month + 1:02d}-{day:02d}"
+
+
+def _time_line(rng: random.Random) -> str:
+    hour = rng.randint(1, 11)
+    style = rng.randrange(3)
+    if style == 0:
+        return f"⏰ {hour}:{rng.choice(['00', '30'])} PM"
+    if style == 1:
+        return f"Hora: {hour + 12}:00"
+    return f"{hour}pm"
+
+
+def synthetic_description_lines(rng: random.Random, title: str) -> List[str]:
+    municipio = rng.choice(MUNICIPIOS)
+    venue = f"{rng.choice(VENUE_KINDS)} {rng.choice(VENUE_NAMES)}"
+    lines = [title]
+    lines.extend(rng.sample(FILLER_SENTENCES, k=rng.randint(1, 4)))
+    for _ in range(rng.choice([1, 1, 1, 2, 3])):
+        lines.append(_date_line(rng))
+    for _ in range(rng.choice([1, 1, 2])):
+        lines.append(_time_line(rng))
+    lines.append(f"📍 {venue}, {municipio}, Puerto Rico")
+    if rng.random() < 0.2:
+        lines.append("Entrada gratis")
+    else:
+        lines.append("Precios:")
+        for label in rng.sample(["General", "Preferencia", "VIP", "Palco", "Arena"], k=rng.randint(1, 3)):
+            lines.append(f"{label}: ${rng.randint(10, 150)}.00 + c.s.")
+    lines.append("Para más información llame al 787-555-0100")
+    return lines
+
+
+def _filler_script(rng: random.Random, size: int) -> str:
+    chunks = []
+    total = 0
+    while total < size:
+        name = f"fn{rng.randrange(10**6)}"
+        chunk = f"function {name}(a,b){{var x=a+b;if(x>{rng.randrange(999)}){{return '{name}';}}return x;}}\n"
+        chunks.append(chunk)
+        total += len(chunk)
+    return "".join(chunks)
+
+
+def build_event_page(
+    rng: random.Random,
+    slug: str,
+    title: str,
+    description_lines: List[str],
+    category: str,
+    data_layer: Dict[str, str],
+    price_text: str,
+) -> str:
+    image = f"https://boletos.prticket.com/images/{slug}.jpg"
+    nav = "".join(
+        f'<li><a href="/events/en/{rng.choice(["frontpage", "search", "packages"])}">Link {i}</a></li>'
+        for i in range(40)
+    )
+    description_html = "".join(f"<p>{html.escape(line)}</p>" for line in description_lines[1:])
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head>"
+        '<meta charset="utf-8">'
+        f"<title>{html.escape(title)} | PRticket</title>"
+        f'<meta property="og:title" content="{html.escape(title)}">'
+        f'<meta property="og:image" content="{image}">'
+        f'<meta name="description" content="{html.escape(description_lines[-1])}">'
+        f"<style>{'.c{color:#333;margin:0 auto;}' * 200}</style>"
+        f"<script>{_filler_script(rng, 20000)}</script>"
+        f"<script>var dataLayerP4 = {json.dumps(data_layer)};</script>"
+        "</head><body>"
+        f'<nav class="menu"><ul>{nav}</ul></nav>'
+        f'<span class="tag-event-info-orion">{html.escape(category)}</span>'
+        f'<picture><source srcset="{image}"><img class="hero" src="{image}" alt=""></picture>'
+        '<section class="event-description-landing container">'
+        '<div class="event-description-landing-col">'
+        f"<h1>{html.escape(title)}</h1>{description_html}"
+        "</div></section>"
+        f'<div class="price"><span class="price-text">{html.escape(price_text)}</span></div>'
+        f"<footer>{'<p>© PRticket. Todos los derechos reservados.</p>' * 20}</footer>"
+        f"<script>{_filler_script(rng, 8000)}</script>"
+        "</body></html>"
+    )
+
+
+def iter_event_pages(count: int, seed: int = 7, use_real: bool = True) -> Iterator[Tuple[str, str]]:
+    """Genera `count` páginas (url, html). Alterna descripciones reales y sintéticas."""
+    rng = random.Random(seed)
+    real = load_real_descriptions() if use_real else []
+    for idx in range(count):
+        slug = f"evento{idx:06d}"
+        category = rng.choice(CATEGORIES)
+        municipio = rng.choice(MUNICIPIOS)
+        if real and idx % 2 == 0:
+            row = real[(idx // 2) % len(real)]
+            title = row.get("nombre") or slug
+            lines = [ln.strip() for ln in row["descripcion"].split("\n") if ln.strip()]
+            venue = row.get("lugar", "")
+            price_text = row.get("costo", "")
+        else:
+            title = f"Evento sintético {idx}"
+            lines = synthetic_description_lines(rng, title)
+            venue = f"{rng.choice(VENUE_KINDS)} {rng.choice(VENUE_NAMES)}"
+            price_text = f"${rng.randint(10, 90)}.00"
+        data_layer = {
+            "eventName": title,
+            "category": category if rng.random() < 0.8 else "",
+            "venue": venue,
+            "venueCity": municipio,
+            "venueState": "PR",
+        }
+        page = build_event_page(rng, slug, title, lines or [title], category, data_layer, price_text)
+        yield f"{BASE_EVENTS_URL}{slug}", page
+
+
+def event_pages(count: int, seed: int = 7, use_real: bool = True) -> List[Tuple[str, str]]:
+    return list(iter_event_pages(count, seed=seed, use_real=use_real))
+
+
+def frontpage_html(event_urls: List[str]) -> str:
+    links = "".join(f'<a href="{url}">Evento</a>' for url in event_urls)
+    reserved = '<a href="/events/en/frontpage">Inicio</a><a href="/events/en/search">Buscar</a>'
+    return f"<html><body>{reserved}{links}</body></html>"
+
+
+def description_lines_corpus(count: int, seed: int = 11) -> List[str]:
+    """Líneas de descripción (reales + sintéticas) para benchmarks de matching/fechas."""
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for row in load_real_descriptions():
+        lines.extend(ln.strip() for ln in row["descripcion"].split("\n") if ln.strip())
+    while len(lines) < count:
+        lines.extend(synthetic_description_lines(rng, f"Evento {len(lines)}"))
+    return lines[:count]
+
+
+def load_pages_dir(pages_dir: Path) -> List[Tuple[str, str]]:
+    """Páginas guardadas (*.html); la URL se reconstruye con el nombre del archivo como slug."""
+    pages = []
+    for path in sorted(pages_dir.glob("*.html")):
+        pages.append((f"{BASE_EVENTS_URL}{path.stem}", path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def save_pages_dir(pages_dir: Path, pages: List[Tuple[str, str]]) -> None:
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    for url, page in pages:
+        slug = url.rstrip("/").split("/")[-1]
+        (pages_dir / f"{slug}.html").write_text(page, encoding="utf-8")
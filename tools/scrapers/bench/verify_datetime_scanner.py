@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Verifica el scanner combinado de fechas/horas (prticket/datetime_scanner.py)
+contra parse_date_candidates / parse_time_candidates (un findall por formato),
+las funciones de scrape_prticket.py que reemplazó.
+
+Referencia: la tabla dorada bench/golden/datetime_scanner.jsonl.gz. Cada
+registro es una descripción con, para cada línea y para el texto completo
+(respaldo de build_event_scraped), las fechas y horas que daban esas
+funciones. Cubre las descripciones reales exportadas en exports/prticket
+(eventos_prticket.csv y no_dated_items_prticket.csv) al generarla, líneas
+sintéticas y los casos borde de EDGE_CASES. Se verifica sin git ni red.
+
+Con --baseline-rev se cargan además las funciones de esa revisión
+(harness.load_module_at_rev) y se comparan también sobre las descripciones
+exportadas hoy, las de --pages-dir y --synthetic líneas sintéticas; se mide
+el camino de antes (fechas + horas por línea, respaldo y el chequeo por línea
+de infer_venues) frente a scan_lines, y "speedup" es el cociente de los dos
+totales tal como se midieron en esta corrida. --write-golden regenera la tabla
+con esa revisión (la base del repo antes del scanner, p. ej.
+`git merge-base HEAD main`).
+
+Uso:
+  python3 tools/scrapers/bench/verify_datetime_scanner.py
+  python3 tools/scrapers/bench/verify_datetime_scanner.py --baseline-rev <rev> --pages-dir exports/prticket/pages --synthetic 5000
+  python3 tools/scrapers/bench/verify_datetime_scanner.py --baseline-rev <rev> --write-golden
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.harness import load_module_at_rev, summarize, time_each  # noqa: E402
+from prticket import scrape_prticket as sp  # noqa: E402
+from prticket.datetime_scanner import scan_datetimes, scan_lines  # noqa: E402
+
+SCRAPER_RELPATH = "tools/scrapers/prticket/scrape_prticket.py"
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden" / "datetime_scanner.jsonl.gz"
+# Líneas sintéticas de la tabla dorada (además de las descripciones reales y EDGE_CASES).
+GOLDEN_SYNTHETIC = 2000
+
+# Formatos que se solapan o rozan los límites de los patrones.
+EDGE_CASES = {
+    "hora-dentro-de-hora": "8:10 PM",
+    "fecha-dentro-de-fecha": "1/2/26 de mayo de 2026",
+    "pm-con-puntos": "sábado, 28 de febrero de 2026 ⏰ 4:00 p. m.",
+    "medianoche": "12 am y 12:30 A.M.",
+    "fuera-de-rango": "24:00 13:60 0:15 pm 13pm 32/1/2026 1/1/1899",
+    "iso-y-en": "2026-05-03 · March 5, 2026 · Sat, Mar 7, 2026",
+    "partida-entre-lineas": "Viernes 5 de mayo\nde 2026 a las 8\npm",
+    "espacios-raros": "7:30 PM\n9\xa0pm",
+    "digitos-unicode": "١٢:٣٠ ٣ de mayo de ٢٠٢٦",
+    "repetidas": "5 de mayo de 2026 8:00 PM\n5 de mayo de 2026 8:00 PM",
+}
+
+
+def load_descriptions(repo_root: Path, pages_dir: str) -> List[str]:
+    descriptions = [row["descripcion"] for row in synthetic.load_real_descriptions(repo_root)]
+    no_dated = repo_root / "exports" / "prticket" / "no_dated_items_prticket.csv"
+    if no_dated.exists():
+        with no_dated.open("r", encoding="utf-8", newline="") as f:
+            descriptions.extend(row["descripcion_preview"] for row in csv.DictReader(f) if row.get("descripcion_preview"))
+    if pages_dir:
+        for _, page in synthetic.load_pages_dir(Path(pages_dir)):
+            descriptions.append(sp.html_to_text(sp.scan_event_page(page).description_html))
+    return descriptions
+
+
+def build_corpus(repo_root: Path, pages_dir: str, synthetic_lines: int) -> Tuple[List[str], int]:
+    """Descripciones a verificar (reales + EDGE_CASES + sintéticas de a 12 líneas) y cuántas son reales."""
+    real = load_descriptions(repo_root, pages_dir)
+    texts = real + list(EDGE_CASES.values())
+    if synthetic_lines:
+        lines = synthetic.description_lines_corpus(synthetic_lines)
+        texts += ["\n".join(lines[i : i + 12]) for i in range(0, len(lines), 12)]
+    return texts, len(real)
+
+
+def expected_lines(base, text: str) -> List[Dict]:
+    return [
+        {"line": line, "dates": base.parse_date_candidates(line), "times": base.parse_time_candidates(line)}
+        for line in sp.split_lines(text) + [text]
+    ]
+
+
+def load_golden(path: Path) -> List[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_golden(path: Path, base, texts: List[str]) -> int:
+    lines = [json.dumps({"text": text, "lines": expected_lines(base, text)}, ensure_ascii=False) + "\n" for text in texts]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # mtime=0: regenerar con la misma revisión y los mismos exports deja el archivo idéntico.
+    path.write_bytes(gzip.compress("".join(lines).encode("utf-8"), compresslevel=9, mtime=0))
+    return len(lines)
+
+
+def check_line(line: str, dates: List[str], times: List[str], source: str) -> Dict:
+    got = scan_datetimes(line)
+    if (got.dates, got.times) == (dates, times):
+        return {}
+    return {"text": line[:200], "scanner": [got.dates, got.times], source: [dates, times]}
+
+
+def reference_path(base, text: str) -> int:
+    """Camino de antes (funciones de `base`); devuelve las líneas sin fecha/hora (candidatas a venue)."""
+    lines = base.split_lines(text)
+    dates = [d for line in lines for d in base.parse_date_candidates(line)]
+    times_ = [t for line in lines for t in base.parse_time_candidates(line)]
+    if not dates:
+        base.parse_date_candidates(text)
+    if not times_:
+        base.parse_time_candidates(text)
+    return sum(1 for line in lines if not base.parse_date_candidates(line) and not base.parse_time_candidates(line))
+
+
+def scanner_path(text: str) -> int:
+    scans = scan_lines(sp.split_lines(text))
+    if not any(scan.dates for scan in scans) or not any(scan.times for scan in scans):
+        scan_datetimes(text)
+    return sum(1 for scan in scans if not scan.has_datetime)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verificación del scanner combinado de fechas/horas.")
+    parser.add_argument("--golden", default=str(GOLDEN_PATH), help="Tabla dorada (línea → fechas, horas).")
+    parser.add_argument("--baseline-rev", default="", help="Revisión git con las funciones de referencia (opcional).")
+    parser.add_argument("--write-golden", action="store_true", help="Regenera --golden con --baseline-rev y termina.")
+    parser.add_argument("--pages-dir", default="", help="Directorio con páginas guardadas (*.html), con --baseline-rev.")
+    parser.add_argument("--synthetic", type=int, default=GOLDEN_SYNTHETIC, help="Líneas sintéticas agregadas al corpus.")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas de la medición (se toma la mejor).")
+    args = parser.parse_args()
+
+    golden_path = Path(args.golden)
+    if args.write_golden and not args.baseline_rev:
+        parser.error("--write-golden necesita --baseline-rev (la revisión con parse_date_candidates / parse_time_candidates)")
+    base = load_module_at_rev(args.baseline_rev, SCRAPER_RELPATH, "scrape_prticket_baseline") if args.baseline_rev else None
+    repo_root = synthetic.find_repo_root(Path(__file__).parent)
+    if args.write_golden:
+        texts, _ = build_corpus(repo_root, "", args.synthetic)
+        written = write_golden(golden_path, base, texts)
+        print(f"[OK] {written} descripciones de {args.baseline_rev} en {golden_path}")
+        return 0
+
+    golden = load_golden(golden_path)
+    texts = [record["text"] for record in golden]
+    mismatches = []
+    checked_lines = 0
+    for record in golden:
+        for expected in record["lines"]:
+            checked_lines += 1
+            mismatch = check_line(expected["line"], expected["dates"], expected["times"], "golden")
+            if mismatch:
+                mismatches.append(mismatch)
+    result: Dict[str, object] = {"golden_descriptions": len(golden), "golden_checked": checked_lines, "golden_mismatches": len(mismatches)}
+
+    if base is not None:
+        current, real_count = build_corpus(repo_root, args.pages_dir, args.synthetic)
+        checked_lines = 0
+        baseline_mismatches = 0
+        for text in current:
+            for expected in expected_lines(base, text):
+                checked_lines += 1
+                mismatch = check_line(expected["line"], expected["dates"], expected["times"], "reference")
+                if mismatch:
+                    baseline_mismatches += 1
+                    mismatches.append(mismatch)
+        texts = current
+        result.update(
+            {
+                "descriptions": len(current),
+                "real_descriptions": real_count,
+                "baseline_rev": args.baseline_rev,
+                "checked": checked_lines,
+                "baseline_mismatches": baseline_mismatches,
+                "reference": summarize(time_each(lambda text: reference_path(base, text), texts, repeat=args.repeat)),
+            }
+        )
+
+    result["scanner"] = summarize(time_each(scanner_path, texts, repeat=args.repeat))
+    if base is not None and result["scanner"]["total_ms"]:
+        result["speedup"] = round(result["reference"]["total_ms"] / result["scanner"]["total_ms"], 3)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    for item in mismatches[:10]:
+        print(json.dumps(item, ensure_ascii=False), file=sys.stderr)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Verifica que el scanner de una pasada (parse_event_page) produzca el mismo
+EventScraped que la extracción con un re.search por campo de scrape_prticket.py.
+
+Referencia: el corpus dorado bench/golden/page_parser.jsonl.gz, con cada
+página y el EventScraped (como JSON) que dio la extracción por re.search, sin
+y con INLINE_MARKUP: <script>/<style> con etiquetas dentro (document.write,
+JSON-LD, plantillas) al principio del <head> y al final del <body>, que los
+re.search de antes también veían. Se verifica sin git ni red.
+
+Con --baseline-rev se carga además scrape_prticket.py de esa revisión
+(harness.load_module_at_rev) y se compara también contra ella:
+- páginas reales grabadas: --fixtures-dir (bench/record_fixtures.py),
+  --archive-dir (archivo de --archive; por defecto exports/prticket/archive si
+  existe) y --pages-dir (*.html sueltos);
+- páginas sintéticas (--count) y los casos borde de EDGE_CASES;
+- cada página otra vez con INLINE_MARKUP;
+y se mide el speedup. --write-golden regenera el corpus dorado con esa
+revisión (la base del repo antes del scanner, p. ej. `git merge-base HEAD main`).
+
+Uso:
+  python3 tools/scrapers/bench/verify_page_parser.py
+  python3 tools/scrapers/bench/verify_page_parser.py --baseline-rev <rev> --fixtures-dir exports/prticket/fixtures
+  python3 tools/scrapers/bench/verify_page_parser.py --baseline-rev <rev> --write-golden
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import fixtures, synthetic  # noqa: E402
+from bench.harness import event_page_parser, load_module_at_rev, summarize, time_each  # noqa: E402
+from common.page_archive import PageArchive  # noqa: E402
+from pipeline.stages import ExportFiles  # noqa: E402
+from prticket import scrape_prticket  # noqa: E402
+
+SCRAPER_RELPATH = "tools/scrapers/prticket/scrape_prticket.py"
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden" / "page_parser.jsonl.gz"
+# Páginas sintéticas del corpus dorado (además de EDGE_CASES).
+GOLDEN_COUNT = 60
+# Las funciones de relleno de las páginas sintéticas (solo tamaño): en el corpus dorado quedan 3 por script.
+FILLER_RE = re.compile(r"<script>((?:function fn\d+[^\n]*\n){3})(?:function fn\d+[^\n]*\n)*</script>")
+
+# Variantes de marcado que ejercitan las reglas de coincidencia de los re.search originales.
+EDGE_CASES = {
+    "meta-content-primero": '<meta content="Titulo &amp; Co" property="og:title"><title>T</title>',
+    "img-data-src": '<img data-src="/lazy.jpg" src="/real.jpg"><img src="/otra.jpg">',
+    "picture-sin-cierre": '<picture><img src="/a.jpg"><img src="/b.jpg">',
+    "picture-cierre-lejano": '<picture></picture><img src="/x.jpg"><p>..</p></picture>',
+    "span-anidado": '<span class="tag-event-info-orion"><b>Mú</b><span>x</span>sica</span>',
+    "mayusculas": (
+        '<SECTION CLASS="event-description-landing"><DIV class="event-description-landing-col">'
+        "<H1>Grande</H1><P>5 de mayo de 2026</P><P>8:00 PM</P>"
+        "<P>Teatro Tapia, San Juan</P></DIV></SECTION>"
+    ),
+    "col-sin-cierre-en-seccion": (
+        '<section class="event-description-landing"><div class="event-description-landing-col">'
+        "<p>Marzo 3, 2026 7pm</p></section></div>"
+    ),
+    "h1-fuera-de-descripcion": (
+        '<h1>Cabecera</h1><section class="event-description-landing"><p>Sin titulo</p></section>'
+        '<meta property="og:title" content="">'
+    ),
+    "sin-nada": "<html><body><p>nada</p></body></html>",
+    "datalayer-dos-scripts": (
+        '<script>var x = 1;</script><script>var dataLayerP4 = {"category": "Comedy", "venue": "Sala"};</script>'
+        '<span class="price-text">$ 12</span>'
+    ),
+    "datalayer-mayusculas": '<script>VAR\n\t DATALAYERP4={"category": "Party"};</script>',
+    "datalayer-sin-espacio": '<script>var dataLayerP4x = {}; vardataLayerP4 = {}; xvar dataLayerP4 = {"category": "Food"};</script>',
+    "datalayer-sin-llave": '<script>var dataLayerP4 = null; var dataLayerP4 = {"category": "Sports"};</script>',
+    "p4-al-principio": 'P4 p4<script>var dataLayerP4 = {"category": "Culture"}</script>',
+    "datalayer-fuera-de-script": '<p>var dataLayerP4 = {"category": "Family"};</p><script>var dataLayerP4 = {};</script>',
+    "descripcion-con-script": (
+        '<section class="event-description-landing"><script>var s = "</section>";</script>'
+        "<p>5 de mayo de 2026 8:00 PM</p></section>"
+    ),
+    "script-sin-cierre": '<title>Antes</title><script>document.write("<img src=/p.gif>")',
+}
+
+# Marcado dentro de <script>/<style> como el de las páginas reales (pixel de analytics, JSON-LD, plantillas).
+INLINE_MARKUP = (
+    "<script>document.write('<img src=\"https://px.example.com/p.gif\" width=\"1\"><title>Pixel</title>');</script>"
+    '<script type="application/ld+json">{"@type": "Event", "description": '
+    '"<h1>JSON-LD</h1><span class=\\"price-text\\">$ 1.00</span>"}</script>'
+    "<style>/* <picture><img src=\"/css.jpg\"></picture> */ .hero{display:block}</style>"
+    "<script>var tpl = \"<section class='event-description-landing'><p>plantilla</p></section>"
+    "<span class='tag-event-info-orion'>Plantilla</span>\";</script>"
+)
+
+
+def with_inline_markup(page: str) -> str:
+    head = page.lower().find("<head>")
+    at = head + len("<head>") if head != -1 else 0
+    page = page[:at] + INLINE_MARKUP + page[at:]
+    body_end = page.lower().rfind("</body>")
+    at = body_end if body_end != -1 else len(page)
+    return page[:at] + INLINE_MARKUP + page[at:]
+
+
+def as_plain(value: object) -> object:
+    """EventScraped (NamedTuple ahora, dataclass en revisiones viejas) → dicts y listas, comparable con el JSON."""
+    if hasattr(value, "_asdict"):
+        return {key: as_plain(item) for key, item in value._asdict().items()}
+    if dataclasses.is_dataclass(value):
+        return {field.name: as_plain(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [as_plain(item) for item in value]
+    return value
+
+
+def load_golden(path: Path) -> List[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_golden(path: Path, ref, count: int) -> int:
+    pages = [(url, FILLER_RE.sub(r"<script>\1</script>", page)) for url, page in synthetic.event_pages(count)]
+    pages += [(f"{synthetic.BASE_EVENTS_URL}edge-{name}", body) for name, body in EDGE_CASES.items()]
+    lines = []
+    for url, page in pages:
+        record = {
+            "url": url,
+            "html": page,
+            "expected": as_plain(ref((url, page))),
+            "expected_inline": as_plain(ref((url, with_inline_markup(page)))),
+        }
+        lines.append(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # mtime=0: regenerar con la misma revisión deja el archivo idéntico.
+    path.write_bytes(gzip.compress("".join(lines).encode("utf-8"), compresslevel=9, mtime=0))
+    return len(lines)
+
+
+def check_golden(records: List[Dict], fast) -> Tuple[List[Tuple[str, str]], List[Dict]]:
+    pages: List[Tuple[str, str]] = []
+    mismatches = []
+    for record in records:
+        for page, expected in (
+            (record["html"], record["expected"]),
+            (with_inline_markup(record["html"]), record["expected_inline"]),
+        ):
+            item = (record["url"], page)
+            pages.append(item)
+            got = as_plain(fast(item))
+            if got != expected:
+                mismatches.append({"url": item[0], "scanner": repr(got)[:400], "golden": repr(expected)[:400]})
+    return pages, mismatches
+
+
+def load_recorded(args: argparse.Namespace, repo_root: Path) -> List[Tuple[str, str]]:
+    pages: List[Tuple[str, str]] = []
+    if args.fixtures_dir:
+        store = fixtures.FixtureStore.load(Path(args.fixtures_dir))
+        pages += [(url, store.text(url)) for url in fixtures.iter_event_urls(store)]
+    archive_dir = Path(args.archive_dir) if args.archive_dir else None
+    if archive_dir is None:
+        archive_dir = repo_root / "exports" / "prticket" / ExportFiles.for_source("prticket").archive_dir
+    if archive_dir.exists():
+        archive = PageArchive(archive_dir)
+        try:
+            pages += [(url, archive.read_text(url)) for url in sorted(archive.latest)]
+        finally:
+            archive.close()
+    if args.pages_dir:
+        pages += synthetic.load_pages_dir(Path(args.pages_dir))
+    return pages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verificación del scanner de una pasada contra el re.search por campo.")
+    parser.add_argument("--golden", default=str(GOLDEN_PATH), help="Corpus dorado (páginas + EventScraped esperado).")
+    parser.add_argument("--baseline-rev", default="", help="Revisión git con la extracción por re.search (opcional).")
+    parser.add_argument("--write-golden", action="store_true", help="Regenera --golden con --baseline-rev y termina.")
+    parser.add_argument("--golden-count", type=int, default=GOLDEN_COUNT, help="Páginas sintéticas de --write-golden.")
+    parser.add_argument("--fixtures-dir", default="", help="Fixtures grabadas con bench/record_fixtures.py.")
+    parser.add_argument("--archive-dir", default="", help="Archivo de páginas de --archive (por defecto el de prticket si existe).")
+    parser.add_argument("--pages-dir", default="", help="Directorio con páginas guardadas (*.html).")
+    parser.add_argument("--count", type=int, default=300, help="Páginas sintéticas comparadas con --baseline-rev.")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas de la medición (se toma la mejor).")
+    args = parser.parse_args()
+
+    golden_path = Path(args.golden)
+    if args.write_golden and not args.baseline_rev:
+        parser.error("--write-golden necesita --baseline-rev (la revisión con la extracción por re.search)")
+    baseline = load_module_at_rev(args.baseline_rev, SCRAPER_RELPATH, "scrape_prticket_baseline") if args.baseline_rev else None
+    ref = event_page_parser(baseline, synthetic.municipios_rows()) if baseline is not None else None
+    if args.write_golden:
+        written = write_golden(golden_path, ref, args.golden_count)
+        print(f"[OK] {written} páginas de {args.baseline_rev} en {golden_path}")
+        return 0
+
+    fast = event_page_parser(scrape_prticket, synthetic.municipios_rows())
+    pages, mismatches = check_golden(load_golden(golden_path), fast)
+    result = {"golden_pages": len(pages), "golden_mismatches": len(mismatches)}
+
+    if ref is not None:
+        repo_root = synthetic.find_repo_root(Path(__file__).parent)
+        recorded = load_recorded(args, repo_root)
+        extra = recorded + synthetic.event_pages(args.count)
+        extra += [(f"{synthetic.BASE_EVENTS_URL}edge-{name}", body) for name, body in EDGE_CASES.items()]
+        pages += extra + [(url, with_inline_markup(page)) for url, page in extra]
+        baseline_mismatches = 0
+        for item in pages:
+            got, expected = fast(item), ref(item)
+            # Otra revisión, otras clases (dataclass antes, NamedTuple ahora): se compara el repr, como bench_extraction.
+            if repr(got) != repr(expected):
+                baseline_mismatches += 1
+                mismatches.append({"url": item[0], "scanner": repr(got)[:400], "baseline": repr(expected)[:400]})
+        result.update(
+            {
+                "pages": len(pages),
+                "recorded_pages": len(recorded),
+                "baseline_rev": args.baseline_rev,
+                "baseline_mismatches": baseline_mismatches,
+            }
+        )
+        if not recorded:
+            print("[WARN] Sin páginas reales grabadas (--fixtures-dir / --archive-dir / --pages-dir).", file=sys.stderr)
+
+    result["scanner"] = summarize(time_each(fast, pages, repeat=args.repeat))
+    if ref is not None:
+        result["baseline"] = summarize(time_each(ref, pages, repeat=args.repeat))
+        if result["scanner"]["total_ms"]:
+            result["speedup"] = round(result["baseline"]["total_ms"] / result["scanner"]["total_ms"], 3)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    for item in mismatches[:10]:
+        print(json.dumps(item, ensure_ascii=False), file=sys.stderr)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Verifica --push (pipeline/push.py) contra el PostgREST en memoria de postgrest_stub.py.
+
+Escenarios sobre filas reales de append_event_rows (páginas sintéticas):
+- push inicial: una fila por clave natural y foreign keys válidas;
+- segundo push idéntico: no crea filas y conserva los ids remotos;
+- dos scrapers a la vez, cada uno con su propio IdAllocator (ids locales
+  que se pisan) y eventos en común: sin duplicados ni filas huérfanas;
+- chunk_size pequeño vs uno solo: mismo resultado;
+- categorías nuevas (faltan varias en Supabase) desde dos scrapers a la vez, con
+  los mismos ids locales para nombres distintos: una fila por nombre y cada
+  evento apunta a la categoría de su nombre.
+- filas cargadas antes desde los CSV (clave_origen en null, horas HH:MM:SS
+  como las devuelve Postgres) para parte de los eventos, más un evento cargado
+  a mano: el push las adopta con sus ids, no duplica nada y no toca la manual.
+
+Uso:
+  python3 tools/scrapers/bench/verify_push.py --count 300 --chunk-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import synthetic  # noqa: E402
+from bench.postgrest_stub import PostgrestStub  # noqa: E402
+from common.http_engine import HostPolicy, HttpEngine  # noqa: E402
+from common.id_allocator import IdAllocator  # noqa: E402
+from common.postgrest import PostgrestClient  # noqa: E402
+from pipeline import keys, push, stages  # noqa: E402
+from prticket import scrape_prticket as sp  # noqa: E402
+
+PUSH_TABLES = ("eventos", "eventos_municipios", "eventoFechas")
+
+
+def categorias_reducidas() -> List[dict]:
+    # Sin Cultura, Gastronomía ni Otro/Otros, map_category_id crea categorías nuevas (Culture, Theater, Food...).
+    return [row for row in synthetic.categorias_rows() if row["id"] not in {7, 8, 9, 11}]
+
+
+def build_state(pages: List[Tuple[str, str]], categorias: Optional[List[dict]] = None) -> stages.ExportState:
+    municipios = stages.build_municipios(synthetic.municipios_rows())
+    categorias = synthetic.categorias_rows() if categorias is None else categorias
+    state = stages.ExportState(
+        source="prticket",
+        ids=IdAllocator(None, stages.ID_TABLES),
+        next_new_category_id=max(13, max(int(r["id"]) for r in categorias) + 1),
+    )
+    for url, page in pages:
+        stages.append_event_rows(state, url, sp.parse_event_page(url, page, municipios), None, categorias)
+    return state
+
+
+def run_push(stub: PostgrestStub, state: stages.ExportState, chunk_size: int) -> push.PushResult:
+    http = HttpEngine(default_policy=HostPolicy(max_concurrency=4, rate=0))
+    try:
+        client = PostgrestClient(http=http, url=stub.base_url, key="verify")
+        return push.push_export(
+            client,
+            "prticket",
+            state.eventos_rows,
+            state.eventos_municipios_rows,
+            state.evento_fechas_rows,
+            categorias_rows=stages.new_category_rows(state.categories_new),
+            chunk_size=chunk_size,
+        )
+    finally:
+        http.close()
+
+
+def expected_keys(*states: stages.ExportState) -> Dict[str, set]:
+    expected: Dict[str, set] = {table: set() for table in PUSH_TABLES}
+    for state in states:
+        eventos = {row.id: keys.event_key(row.enlaceboletos, "prticket") for row in state.eventos_rows}
+        venues = {}
+        for row in state.eventos_municipios_rows:
+            venues[row.id] = keys.venue_key(eventos[row.event_id], row.municipio_id, row.lugar, row.direccion)
+        expected["eventos"].update(eventos.values())
+        expected["eventos_municipios"].update(venues.values())
+        expected["eventoFechas"].update(
+            keys.fecha_key(venues[r.evento_municipio_id], r.fecha, r.horainicio) for r in state.evento_fechas_rows
+        )
+    return expected
+
+
+def check(stub: PostgrestStub, expected: Dict[str, set]) -> List[str]:
+    problems = []
+    for table in PUSH_TABLES:
+        rows = stub.rows(table)
+        claves = [row[push.KEY_COLUMN] for row in rows]
+        if len(claves) != len(set(claves)):
+            problems.append(f"{table}: claves duplicadas")
+        if set(claves) != expected[table]:
+            problems.append(f"{table}: {len(set(claves))} claves, se esperaban {len(expected[table])}")
+    eventos = {row["id"] for row in stub.rows("eventos")}
+    venues = {row["id"] for row in stub.rows("eventos_municipios")}
+    if any(row["event_id"] not in eventos for row in stub.rows("eventos_municipios")):
+        problems.append("eventos_municipios huérfanos")
+    if any(row["evento_municipio_id"] not in venues for row in stub.rows("eventoFechas")):
+        problems.append("eventoFechas huérfanas")
+    return problems
+
+
+def category_names(state: stages.ExportState, categorias: List[dict]) -> Dict[str, str]:
+    """Clave de evento → nombre normalizado de su categoría (existente o nueva)."""
+    names = {int(row["id"]): keys.category_key(row["nombre"]) for row in categorias}
+    names.update({cid: norm for norm, cid in state.categories_new.items()})
+    return {keys.event_key(row.enlaceboletos, "prticket"): names[row.categoria] for row in state.eventos_rows}
+
+
+def check_categories(stub: PostgrestStub, expected: Dict[str, str]) -> List[str]:
+    categorias = stub.rows("categoriaEventos")
+    by_id = {row["id"]: keys.category_key(row["nombre"]) for row in categorias}
+    problems = []
+    if len(set(by_id.values())) != len(by_id):
+        problems.append("categoriaEventos: nombres duplicados")
+    wrong = [row for row in stub.rows("eventos") if by_id.get(row["categoria"]) != expected[row[push.KEY_COLUMN]]]
+    if wrong:
+        problems.append(f"eventos: {len(wrong)} con la categoría equivocada")
+    return problems
+
+
+def seed_legacy(stub: PostgrestStub, state: stages.ExportState, pages: int) -> Dict[str, set]:
+    """Carga como lo hacía el handoff por CSV (ids locales, sin clave) las filas de los primeros `pages` eventos."""
+    eventos = [row for row in state.eventos_rows[:pages]]
+    event_ids = {row.id for row in eventos}
+    venues = [row for row in state.eventos_municipios_rows if row.event_id in event_ids]
+    venue_ids = {row.id for row in venues}
+    fechas = [row for row in state.evento_fechas_rows if row.evento_municipio_id in venue_ids]
+    stub.seed("eventos", [row._asdict() for row in eventos])
+    stub.seed("eventos_municipios", [row._asdict() for row in venues])
+    stub.seed("eventoFechas", [dict(row._asdict(), horainicio=f"{row.horainicio}:00") for row in fechas])
+    return {"eventos": event_ids, "eventos_municipios": venue_ids, "eventoFechas": {row.id for row in fechas}}
+
+
+def check_legacy(stub: PostgrestStub, expected: Dict[str, set], legacy: Dict[str, set], manual_id: int) -> List[str]:
+    problems = []
+    for table in PUSH_TABLES:
+        rows = stub.rows(table)
+        keyed = [row for row in rows if row.get(push.KEY_COLUMN)]
+        if sorted(row[push.KEY_COLUMN] for row in keyed) != sorted(expected[table]):
+            problems.append(f"{table}: {len(keyed)} filas con clave, se esperaban {len(expected[table])}")
+        if len(rows) != len(expected[table]) + (table == "eventos"):
+            problems.append(f"{table}: {len(rows)} filas, se esperaban {len(expected[table])} (duplicados)")
+        adopted = {row["id"] for row in keyed}
+        if not legacy[table] <= adopted:
+            problems.append(f"{table}: {len(legacy[table] - adopted)} filas de los CSV sin adoptar")
+    eventos = {row["id"] for row in stub.rows("eventos")}
+    if any(row["event_id"] not in eventos for row in stub.rows("eventos_municipios")):
+        problems.append("eventos_municipios huérfanos")
+    manual = [row for row in stub.rows("eventos") if row["id"] == manual_id]
+    if not manual or manual[0].get(push.KEY_COLUMN) is not None:
+        problems.append("eventos: la fila cargada a mano cambió")
+    return problems
+
+
+def remote_ids(stub: PostgrestStub) -> Dict[str, Dict[str, int]]:
+    return {table: {row.get(push.KEY_COLUMN): row["id"] for row in stub.rows(table)} for table in PUSH_TABLES}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verificación del upsert --push contra un PostgREST local.")
+    parser.add_argument("--count", type=int, default=300, help="Páginas sintéticas.")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Filas por request del upsert.")
+    args = parser.parse_args()
+
+    pages = synthetic.event_pages(args.count)
+    state = build_state(pages)
+    expected = expected_keys(state)
+    results: Dict[str, object] = {"pages": len(pages)}
+    problems: List[str] = []
+
+    with PostgrestStub().seed_reference() as stub:
+        t0 = time.perf_counter()
+        results["primer_push"] = run_push(stub, state, args.chunk_size).rows
+        results["primer_push_s"] = round(time.perf_counter() - t0, 3)
+        problems += [f"primer push: {p}" for p in check(stub, expected)]
+        before = remote_ids(stub)
+        run_push(stub, state, args.chunk_size)
+        if remote_ids(stub) != before:
+            problems.append("segundo push: cambiaron filas o ids")
+        results["requests"] = dict(stub.requests)
+
+    # Dos corridas simultáneas: ids locales que chocarían en los CSV y la mitad de los eventos en común.
+    half = len(pages) // 2
+    state_a = build_state(pages[: half + half // 2])
+    state_b = build_state(pages[half // 2 :])
+    with PostgrestStub().seed_reference() as stub:
+        errors: List[BaseException] = []
+
+        def worker(worker_state: stages.ExportState) -> None:
+            try:
+                run_push(stub, worker_state, args.chunk_size)
+            except BaseException as exc:  # noqa: BLE001 - se reporta abajo
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in (state_a, state_b)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        problems += [f"concurrente: {exc}" for exc in errors]
+        problems += [f"concurrente: {p}" for p in check(stub, expected_keys(state_a, state_b))]
+        results["concurrente"] = {table: len(stub.rows(table)) for table in PUSH_TABLES}
+
+    with PostgrestStub().seed_reference() as stub:
+        run_push(stub, state, max(1, len(state.evento_fechas_rows)))
+        problems += [f"un solo lote: {p}" for p in check(stub, expected)]
+
+    # Categorías nuevas: cada scraper numera las suyas desde el mismo max+1 y en distinto orden.
+    categorias = categorias_reducidas()
+    state_a = build_state(pages[: half + half // 2], categorias)
+    state_b = build_state(list(reversed(pages[half // 2 :])), categorias)
+    stub = PostgrestStub()
+    stub.seed("Municipios", synthetic.municipios_rows())
+    stub.seed("categoriaEventos", categorias)
+    with stub:
+        errors = []
+        threads = [threading.Thread(target=worker, args=(s,)) for s in (state_a, state_b)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        problems += [f"categorías nuevas: {exc}" for exc in errors]
+        expected_names = category_names(state_a, categorias)
+        expected_names.update(category_names(state_b, categorias))
+        problems += [f"categorías nuevas: {p}" for p in check_categories(stub, expected_names)]
+        results["categorias_nuevas"] = {
+            "locales": sorted(set(state_a.categories_new) | set(state_b.categories_new)),
+            "filas": len(stub.rows("categoriaEventos")),
+        }
+
+    # Supabase con filas de los CSV de antes (clave_origen null) para dos tercios de los eventos.
+    stub = PostgrestStub().seed_reference()
+    legacy = seed_legacy(stub, state, len(state.eventos_rows) * 2 // 3)
+    manual_id = max(row.id for row in state.eventos_rows) + 1000
+    stub.seed("eventos", [{"id": manual_id, "nombre": "Evento manual", "enlaceboletos": None, "categoria": 1}])
+    with stub:
+        run_push(stub, state, args.chunk_size)
+        problems += [f"filas de los CSV: {p}" for p in check_legacy(stub, expected, legacy, manual_id)]
+        before = remote_ids(stub)
+        run_push(stub, state, args.chunk_size)
+        if remote_ids(stub) != before:
+            problems.append("filas de los CSV: el segundo push cambió filas o ids")
+        results["filas_csv"] = {table: len(ids) for table, ids in legacy.items()}
+
+    results["problems"] = problems
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
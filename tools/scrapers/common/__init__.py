@@ -0,0 +1 @@
+"""Utilidades compartidas por los scrapers (HTTP, caches, normalización)."""
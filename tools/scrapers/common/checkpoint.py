@@ -0,0 +1,107 @@
+"""
+Journal de checkpoints (JSON Lines, solo append) para retomar corridas largas con --resume.
+
+La primera línea es un encabezado que identifica la corrida (tipo, versión,
+entrada); cada línea siguiente es un registro con el avance desde el anterior.
+Cada registro se escribe con flush y cada `sync_every` registros se hace fsync.
+Al leer se ignora una última línea truncada (corte a mitad de escritura). Si el
+encabezado guardado no coincide con el de la corrida actual, el journal se
+descarta y se empieza de cero.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import IO, List, Optional, Tuple
+
+
+DEFAULT_SYNC_EVERY = 10
+
+
+def read_journal(path: Path) -> Tuple[Optional[dict], List[dict]]:
+    """Devuelve (encabezado, registros) o (None, []) si no existe o no se puede leer."""
+    if not path.exists():
+        return None, []
+    header: Optional[dict] = None
+    records: List[dict] = []
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    break
+                if header is None:
+                    header = item
+                else:
+                    records.append(item)
+    except OSError:
+        return None, []
+    return header, records
+
+
+class CheckpointJournal:
+    def __init__(self, path: Path, header: dict, sync_every: int = DEFAULT_SYNC_EVERY) -> None:
+        self.path = path
+        self.header = header
+        self.sync_every = max(1, sync_every)
+        self.resumed_records: List[dict] = []
+        self._file: Optional[IO[str]] = None
+        self._pending_sync = 0
+
+    def open(self, resume: bool) -> List[dict]:
+        """Abre el journal; con `resume` devuelve los registros previos si el encabezado coincide."""
+        if resume:
+            header, records = read_journal(self.path)
+            if header == self.header:
+                self.resumed_records = records
+                # Reescribe sin la posible línea truncada y sigue en modo append.
+                self._rewrite([self.header] + records)
+                self._file = self.path.open("a", encoding="utf-8")
+                return records
+            if header is not None:
+                print(f"[WARN] Checkpoint {self.path.name} es de otra corrida; se empieza de cero.")
+        self._rewrite([self.header])
+        self._file = self.path.open("a", encoding="utf-8")
+        return []
+
+    def _rewrite(self, items: List[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def append(self, record: dict) -> None:
+        assert self._file is not None, "CheckpointJournal.open() no fue llamado"
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending_sync += 1
+        if self._pending_sync >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._file is not None and self._pending_sync:
+            os.fsync(self._file.fileno())
+            self._pending_sync = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """Corrida completa: el checkpoint ya no hace falta."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -6,36 +6,64 @@ Uso:
   python3 tools/scrapers/common/fill_venues_addresses.py \
     --input exports/prticket/eventos_municipios_prticket.csv \
     --source prticket
+
+  # Resolver en paralelo las claves sin cache (mismo límite de QPS):
+  python3 tools/scrapers/common/fill_venues_addresses.py \
+    --input exports/prticket/eventos_municipios_prticket.csv \
+    --source prticket --workers 8
+
+  # Retomar una corrida interrumpida desde el último bloque escrito:
+  python3 tools/scrapers/common/fill_venues_addresses.py \
+    --input exports/prticket/eventos_municipios_prticket.csv \
+    --source prticket --resume
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 import datetime as dt
-import json
+import itertools
 import os
-import re
 import sys
 import time
-import unicodedata
 import urllib.parse
-import urllib.request
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
-
-
-CACHE_HEADERS = [
-    "key",
-    "nombre_lugar",
-    "municipio_id",
-    "direccion",
-    "place_id",
-    "latitud",
-    "longitud",
-    "fuente",
-    "updated_at",
-]
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+SCRAPERS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRAPERS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRAPERS_DIR))
+
+from common import metrics, reference_data  # noqa: E402
+from common.checkpoint import CheckpointJournal  # noqa: E402
+from common.http_engine import HostPolicy, HttpEngine  # noqa: E402
+from common.no_resueltos_store import NoResueltosStore  # noqa: E402
+from common.text import clean_spaces, normalize_cache_stats, normalize_cache_summary, normalize_text  # noqa: E402
+from common.venue_cache_store import CACHE_HEADERS, VenueCacheStore  # noqa: E402
+
+GOOGLE_MAPS_HOST = "maps.googleapis.com"
+DEFAULT_GOOGLE_HOST_LIMIT = 4
+DEFAULT_WORKERS = 1
+DETAILS_CANDIDATES = 3
+# Place Details se factura por request aunque se cancele: por defecto un candidato a la vez.
+DEFAULT_DETAILS_FANOUT = 1
+# Con --details-fanout > 1, segundos que se espera al candidato actual antes de pedir los siguientes.
+DEFAULT_DETAILS_HEDGE = 1.0
+# Cache negativo: clase de fallo -> (TTL inicial, TTL máximo) en horas. El TTL se
+# multiplica por NEGATIVE_BACKOFF_FACTOR en cada fallo consecutivo del mismo venue.
+NEGATIVE_TTL_HOURS: Dict[str, Tuple[float, float]] = {
+    "cuota": (1.0, 24.0),
+    "http": (1.0, 12.0),
+    "zero_results": (7 * 24.0, 60 * 24.0),
+    "sin_direccion": (7 * 24.0, 60 * 24.0),
+    "otro": (24.0, 7 * 24.0),
+}
+NEGATIVE_BACKOFF_FACTOR = 2.0
+DEFAULT_CHUNK_ROWS = 500
+CACHE_CSV_NAME = "event_venues_cache.csv"
+CACHE_DB_NAME = "event_venues_cache.sqlite"
 
 NO_RESUELTOS_HEADERS = [
     "nombre_lugar",
@@ -70,19 +98,6 @@ def load_env_file(path: Path) -> Dict[str, str]:
     return out
 
 
-def normalize_text(value: str) -> str:
-    value = unicodedata.normalize("NFKD", value or "")
-    value = "".join(ch for ch in value if not unicodedata.combining(ch))
-    value = value.lower().strip()
-    value = re.sub(r"[^a-z0-9\s]+", " ", value)
-    value = re.sub(r"\s+", " ", value).strip()
-    return value
-
-
-def clean_spaces(value: str) -> str:
-    return re.sub(r"\s+", " ", (value or "")).strip()
-
-
 def make_key(nombre_lugar: str, municipio_id: str) -> str:
     return f"{normalize_text(nombre_lugar)}|{str(municipio_id).strip()}"
 
@@ -91,23 +106,6 @@ def now_iso() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat()
 
 
-class HttpClient:
-    def __init__(self) -> None:
-        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor())
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
-            )
-        }
-
-    def get_json(self, url: str, timeout: int = 30) -> dict:
-        req = urllib.request.Request(url=url, headers=self.headers)
-        with self.opener.open(req, timeout=timeout) as response:
-            data = response.read().decode("utf-8", errors="replace")
-            return json.loads(data or "{}")
-
-
 def read_csv_rows(path: Path) -> Tuple[List[dict], List[str]]:
     if not path.exists():
         return [], []
@@ -118,13 +116,76 @@ def read_csv_rows(path: Path) -> Tuple[List[dict], List[str]]:
     return rows, headers
 
 
+def read_csv_headers(path: Path) -> List[str]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f).fieldnames or [])
+
+
+def iter_csv_rows(path: Path) -> Iterator[dict]:
+    """Filas del CSV una a una (el archivo queda abierto mientras se consume)."""
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def write_csv_stream(
+    path: Path,
+    headers: List[str],
+    rows: Iterable[dict],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_flush: Optional[Callable[[int, int], None]] = None,
+    resume_bytes: int = 0,
+) -> int:
+    """Escribe a medida que llegan las filas, con flush cada `chunk_rows`.
+
+    Se escribe sobre `<nombre>.partial` y se renombra al terminar, así una
+    corrida interrumpida no deja un CSV final a medias. Tras cada flush se llama
+    `on_flush(filas_escritas, bytes_en_disco)`; con `resume_bytes` se continúa un
+    .partial previo truncado a ese largo (sin reescribir el encabezado).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = partial_path(path)
+    count = 0
+    if resume_bytes:
+        with partial.open("r+b") as fb:
+            fb.truncate(resume_bytes)
+    with partial.open("a" if resume_bytes else "w", encoding="utf-8", newline="") as f:
+        # csv.writer con listas en orden de `headers`: sin un dict intermedio por fila.
+        writer = csv.writer(f)
+        if not resume_bytes:
+            writer.writerow(headers)
+        chunk: List[List[object]] = []
+        for row in rows:
+            chunk.append([row.get(h, "") for h in headers])
+            if len(chunk) >= chunk_rows:
+                writer.writerows(chunk)
+                f.flush()
+                count += len(chunk)
+                chunk = []
+                if on_flush is not None:
+                    on_flush(count, f.tell())
+        writer.writerows(chunk)
+        f.flush()
+        count += len(chunk)
+        if on_flush is not None and chunk:
+            on_flush(count, f.tell())
+    os.replace(partial, path)
+    return count
+
+
+def partial_path(path: Path) -> Path:
+    return path.with_name(path.name + ".partial")
+
+
 def write_csv_rows(path: Path, headers: List[str], rows: Iterable[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow({h: row.get(h, "") for h in headers})
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows([row.get(h, "") for h in headers] for row in rows)
 
 
 def load_cache(cache_path: Path) -> Dict[str, dict]:
@@ -151,47 +212,51 @@ def keep_google_places_cache_only(cache: Dict[str, dict]) -> Dict[str, dict]:
     return filtered
 
 
-def save_cache(cache_path: Path, cache: Dict[str, dict]) -> None:
-    rows_sorted = [cache[k] for k in sorted(cache.keys())]
-    write_csv_rows(cache_path, CACHE_HEADERS, rows_sorted)
+def open_venue_cache(db_path: Path, csv_path: Path) -> VenueCacheStore:
+    """Abre el cache SQLite; si es nuevo, lo siembra con el CSV histórico (solo filas de Google Places)."""
+    store = VenueCacheStore(db_path)
+    if len(store) == 0 and csv_path.exists():
+        imported = store.upsert_many(keep_google_places_cache_only(load_cache(csv_path)).values())
+        print(f"Cache importado desde {csv_path}: {imported} venues")
+    return store
 
 
-def load_no_resueltos(path: Path) -> Dict[str, dict]:
+def load_no_resueltos(path: Path) -> NoResueltosStore:
     rows, _ = read_csv_rows(path)
-    out: Dict[str, dict] = {}
+    store = NoResueltosStore(NO_RESUELTOS_HEADERS)
     for row in rows:
         normalized = {h: clean_spaces(row.get(h, "")) for h in NO_RESUELTOS_HEADERS}
-        key = "|".join(normalized.get(h, "") for h in NO_RESUELTOS_HEADERS)
-        if key.strip("|"):
-            out[key] = normalized
-    return out
+        if store.row_key(normalized).strip("|"):
+            store.add(normalized)
+    return store
 
 
-def save_no_resueltos(path: Path, rows_map: Dict[str, dict]) -> None:
-    rows_sorted = list(rows_map.values())
-    write_csv_rows(path, NO_RESUELTOS_HEADERS, rows_sorted)
+def save_no_resueltos(path: Path, store: NoResueltosStore) -> None:
+    write_csv_rows(path, NO_RESUELTOS_HEADERS, store.rows())
 
 
-def fetch_municipios_map(http: HttpClient, env: Dict[str, str]) -> Dict[str, str]:
+def fetch_municipios_map(
+    http: HttpEngine,
+    env: Dict[str, str],
+    snapshot_path: Optional[Path] = None,
+    ttl_seconds: float = reference_data.DEFAULT_TTL_SECONDS,
+    refresh: bool = False,
+) -> Dict[str, str]:
+    """id → nombre de Municipios (del snapshot compartido con scrape_prticket si está vigente)."""
     supabase_url = clean_spaces(env.get("SUPABASE_URL", ""))
     supabase_key = clean_spaces(env.get("SUPABASE_SERVICE_ROLE_KEY") or env.get("SUPABASE_ANON_KEY") or "")
     if not supabase_url or not supabase_key:
         return {}
-    query = "select=id,nombre&order=nombre.asc"
-    url = f"{supabase_url.rstrip('/')}/rest/v1/Municipios?{query}"
-    req = urllib.request.Request(
-        url,
-        headers={
-            **http.headers,
-            "apikey": supabase_key,
-            "Authorization": f"Bearer {supabase_key}",
-            "Accept": "application/json",
-        },
+    reference = reference_data.ReferenceData(
+        http=http,
+        url=supabase_url,
+        key=supabase_key,
+        snapshot_path=snapshot_path,
+        ttl_seconds=ttl_seconds,
+        refresh=refresh,
     )
     try:
-        with http.opener.open(req, timeout=30) as response:
-            data = response.read().decode("utf-8", errors="replace")
-            rows = json.loads(data or "[]")
+        rows = reference.load(tables=(reference_data.MUNICIPIOS,)).tables["Municipios"]
     except Exception:
         return {}
     mapping: Dict[str, str] = {}
@@ -235,7 +300,46 @@ def parse_google_error(status: str, error_message: str) -> str:
     return error_message or "unknown_google_error"
 
 
-def google_places_text_search(http: HttpClient, api_key: str, query_text: str) -> Tuple[List[dict], Optional[str]]:
+def failure_class(error: Optional[str]) -> Optional[str]:
+    """Clase de fallo para el cache negativo; None si no se debe cachear (errores de key/permisos)."""
+    error = clean_spaces(error or "")
+    if not error:
+        return None
+    if "missing GOOGLE_MAPS_API_KEY" in error or "REQUEST_DENIED" in error or "billing not enabled" in error:
+        return None
+    if "OVER_QUERY_LIMIT" in error or "RESOURCE_EXHAUSTED" in error:
+        return "cuota"
+    if "_http_error" in error:
+        return "http"
+    if error == "ZERO_RESULTS":
+        return "zero_results"
+    if error == "Google no devolvió dirección útil":
+        return "sin_direccion"
+    return "otro"
+
+
+def negative_ttl_seconds(clase: str, intentos: int, schedule: Dict[str, Tuple[float, float]]) -> float:
+    base_hours, max_hours = schedule.get(clase) or schedule.get("otro") or NEGATIVE_TTL_HOURS["otro"]
+    hours = base_hours * NEGATIVE_BACKOFF_FACTOR ** max(0, intentos - 1)
+    return min(hours, max_hours) * 3600
+
+
+def parse_negative_ttl(values: List[str]) -> Dict[str, Tuple[float, float]]:
+    """Aplica overrides `clase=horas[:max_horas]` sobre NEGATIVE_TTL_HOURS."""
+    schedule = dict(NEGATIVE_TTL_HOURS)
+    for value in values:
+        clase, sep, spec = value.partition("=")
+        clase = clase.strip().lower()
+        if not sep or clase not in schedule:
+            raise ValueError(f"--negative-ttl inválido: {value!r} (clases: {', '.join(sorted(schedule))})")
+        base_text, _, max_text = spec.partition(":")
+        base_hours = float(base_text)
+        max_hours = float(max_text) if max_text else max(base_hours, schedule[clase][1])
+        schedule[clase] = (base_hours, max_hours)
+    return schedule
+
+
+async def agoogle_places_text_search(http: HttpEngine, api_key: str, query_text: str) -> Tuple[List[dict], Optional[str]]:
     params = urllib.parse.urlencode(
         {
             "query": query_text,
@@ -246,7 +350,7 @@ def google_places_text_search(http: HttpClient, api_key: str, query_text: str) -
     )
     url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?{params}"
     try:
-        payload = http.get_json(url)
+        payload = (await http.arequest("GET", url)).json(default={})
     except Exception as exc:
         return [], f"google_textsearch_http_error: {exc}"
 
@@ -259,7 +363,7 @@ def google_places_text_search(http: HttpClient, api_key: str, query_text: str) -
     return [], parse_google_error(status, error_message)
 
 
-def google_place_details(http: HttpClient, api_key: str, place_id: str) -> Tuple[Optional[dict], Optional[str]]:
+async def agoogle_place_details(http: HttpEngine, api_key: str, place_id: str) -> Tuple[Optional[dict], Optional[str]]:
     params = urllib.parse.urlencode(
         {
             "place_id": place_id,
@@ -270,7 +374,7 @@ def google_place_details(http: HttpClient, api_key: str, place_id: str) -> Tuple
     )
     url = f"https://maps.googleapis.com/maps/api/place/details/json?{params}"
     try:
-        payload = http.get_json(url)
+        payload = (await http.arequest("GET", url)).json(default={})
     except Exception as exc:
         return None, f"google_details_http_error: {exc}"
 
@@ -292,55 +396,451 @@ def google_place_details(http: HttpClient, api_key: str, place_id: str) -> Tuple
     }, None
 
 
-def google_places_resolve(
-    http: HttpClient,
+def usable_place(nombre_lugar: str, place: dict) -> Optional[dict]:
+    """Resultado final si la dirección sigue siendo útil tras quitarle el nombre del lugar."""
+    formatted = clean_spaces(str(place.get("formatted_address", "")))
+    cleaned_address = remove_place_from_address(nombre_lugar, formatted)
+    if not cleaned_address:
+        return None
+    if normalize_text(cleaned_address) == normalize_text(nombre_lugar):
+        return None
+    return {
+        "direccion": cleaned_address,
+        "place_id": clean_spaces(place.get("place_id", "")),
+        "latitud": clean_spaces(place.get("latitud", "")),
+        "longitud": clean_spaces(place.get("longitud", "")),
+        "fuente": "google_places",
+    }
+
+
+def place_from_search_result(result: dict) -> dict:
+    """Mismos campos que agoogle_place_details, tomados del resultado de textsearch."""
+    loc = (result.get("geometry") or {}).get("location") or {}
+    return {
+        "formatted_address": clean_spaces(str(result.get("formatted_address", ""))),
+        "place_id": clean_spaces(str(result.get("place_id", ""))),
+        "latitud": str(loc.get("lat", "")) if loc.get("lat") is not None else "",
+        "longitud": str(loc.get("lng", "")) if loc.get("lng") is not None else "",
+    }
+
+
+def _count(stats: Optional[Dict[str, int]], name: str, amount: int = 1) -> None:
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + amount
+
+
+async def agoogle_places_resolve(
+    http: HttpEngine,
     api_key: str,
     nombre_lugar: str,
     municipio_nombre: str,
-    rate_sleep: float,
+    details_fanout: int = DEFAULT_DETAILS_FANOUT,
+    use_search_address: bool = False,
+    stats: Optional[Dict[str, int]] = None,
+    details_hedge: float = DEFAULT_DETAILS_HEDGE,
 ) -> Tuple[Optional[dict], Optional[str]]:
+    """Text search + place details de los mejores candidatos.
+
+    Los details se aceptan en orden de ranking: gana el primer candidato útil
+    (o el primer REQUEST_DENIED). Con `details_fanout` > 1, si el candidato
+    actual no respondió en `details_hedge` segundos se piden también los
+    siguientes (hasta `details_fanout` en vuelo); lo que sigue en vuelo al
+    aceptar uno se cancela, pero Google ya lo facturó. Con
+    `use_search_address`, un candidato cuya dirección de textsearch ya es útil
+    se acepta sin pedir details.
+    """
     if not api_key:
         return None, "missing GOOGLE_MAPS_API_KEY"
 
     # Regla solicitada: "{lugar}, {nombre_municipio}, Puerto Rico"
     query_text = f"{nombre_lugar}, {municipio_nombre}, Puerto Rico" if municipio_nombre else f"{nombre_lugar}, Puerto Rico"
-    results, search_error = google_places_text_search(http=http, api_key=api_key, query_text=query_text)
+    _count(stats, "textsearch")
+    results, search_error = await agoogle_places_text_search(http=http, api_key=api_key, query_text=query_text)
     if search_error:
         return None, search_error
 
-    if rate_sleep > 0:
-        time.sleep(rate_sleep)
-
     # Probar hasta top 3 para maximizar match útil.
-    for result in results[:3]:
-        place_id = clean_spaces(str(result.get("place_id", "")))
-        if not place_id:
-            continue
-        details, details_error = google_place_details(http=http, api_key=api_key, place_id=place_id)
-        if details_error:
-            # Error de permisos/billing debe devolverse directamente.
-            if "REQUEST_DENIED" in details_error or "billing not enabled" in details_error:
-                return None, details_error
-            continue
-
-        formatted = clean_spaces(str(details.get("formatted_address", "")))
-        cleaned_address = remove_place_from_address(nombre_lugar, formatted)
-        if not cleaned_address:
-            continue
-        if normalize_text(cleaned_address) == normalize_text(nombre_lugar):
-            continue
+    candidates = [r for r in results[:DETAILS_CANDIDATES] if clean_spaces(str(r.get("place_id", "")))]
+    search_match: Optional[dict] = None
+    if use_search_address:
+        for rank, result in enumerate(candidates):
+            search_match = usable_place(nombre_lugar, place_from_search_result(result))
+            if search_match:
+                # Solo los candidatos mejor rankeados pueden ganarle; del resto no se piden details.
+                _count(stats, "details_evitados", len(candidates) - rank)
+                candidates = candidates[:rank]
+                break
+
+    fanout = max(1, details_fanout)
+    tasks: List[Optional[asyncio.Task]] = [None] * len(candidates)
+    cancelled: Set[int] = set()
+
+    def launch(idx: int) -> None:
+        if idx < len(candidates) and tasks[idx] is None:
+            place_id = clean_spaces(str(candidates[idx].get("place_id", "")))
+            _count(stats, "details")
+            tasks[idx] = asyncio.ensure_future(agoogle_place_details(http=http, api_key=api_key, place_id=place_id))
+
+    def cancel_from(start: int) -> None:
+        for idx in range(start, len(tasks)):
+            task = tasks[idx]
+            if task is not None and not task.done() and idx not in cancelled:
+                task.cancel()
+                cancelled.add(idx)
+                _count(stats, "details_cancelados")
 
-        return {
-            "direccion": cleaned_address,
-            "place_id": clean_spaces(details.get("place_id", "")),
-            "latitud": clean_spaces(details.get("latitud", "")),
-            "longitud": clean_spaces(details.get("longitud", "")),
-            "fuente": "google_places",
-        }, None
+    try:
+        for idx in range(len(candidates)):
+            launch(idx)
+            ahead = range(idx + 1, min(idx + fanout, len(candidates)))
+            if ahead:
+                # Hedge: los siguientes solo salen si el actual tarda; si responde antes, no se facturan.
+                await asyncio.wait({tasks[idx]}, timeout=max(0.0, details_hedge))  # type: ignore[arg-type]
+                if not tasks[idx].done():  # type: ignore[union-attr]
+                    _count(stats, "details_hedge")
+                    for nxt in ahead:
+                        launch(nxt)
+            details, details_error = await tasks[idx]  # type: ignore[misc]
+            if details_error:
+                # Error de permisos/billing debe devolverse directamente.
+                if "REQUEST_DENIED" in details_error or "billing not enabled" in details_error:
+                    cancel_from(idx + 1)
+                    return None, details_error
+                continue
+            resolved = usable_place(nombre_lugar, details)
+            if resolved:
+                cancel_from(idx + 1)
+                return resolved, None
+    finally:
+        cancel_from(0)
 
+    if search_match:
+        return search_match, None
     return None, "Google no devolvió dirección útil"
 
 
+def google_places_resolve(
+    http: HttpEngine,
+    api_key: str,
+    nombre_lugar: str,
+    municipio_nombre: str,
+    **options: Any,
+) -> Tuple[Optional[dict], Optional[str]]:
+    return http.submit(agoogle_places_resolve(http, api_key, nombre_lugar, municipio_nombre, **options)).result()
+
+
+def cache_row(key: str, lugar: str, municipio_id: str, resolved: dict) -> Dict[str, str]:
+    return {
+        "key": key,
+        "nombre_lugar": lugar,
+        "municipio_id": municipio_id,
+        "direccion": clean_spaces(resolved.get("direccion", "")),
+        "place_id": clean_spaces(resolved.get("place_id", "")),
+        "latitud": clean_spaces(resolved.get("latitud", "")),
+        "longitud": clean_spaces(resolved.get("longitud", "")),
+        "fuente": clean_spaces(resolved.get("fuente", "")) or "google_places",
+        "updated_at": now_iso(),
+    }
+
+
+class GoogleResolver:
+    """Resuelve venues contra Google Places con memo por corrida y corte ante errores de key/permisos."""
+
+    def __init__(
+        self,
+        http: HttpEngine,
+        api_key: str,
+        municipios_map: Dict[str, str],
+        details_fanout: int = DEFAULT_DETAILS_FANOUT,
+        use_search_address: bool = False,
+        details_hedge: float = DEFAULT_DETAILS_HEDGE,
+        cache: Optional[VenueCacheStore] = None,
+        negative_schedule: Optional[Dict[str, Tuple[float, float]]] = None,
+        retry_negatives: bool = False,
+    ) -> None:
+        self.http = http
+        self.api_key = api_key
+        self.municipios_map = municipios_map
+        self.details_fanout = details_fanout
+        self.details_hedge = details_hedge
+        self.use_search_address = use_search_address
+        # Llamadas facturables a Google: textsearch, details, details cancelados/evitados, hedges disparados.
+        self.google_stats: Dict[str, int] = {}
+        self.api_calls = 0
+        self.cancelled = 0
+        self.fatal_api_error = ""
+        # Cada resolución (dirección o fallo) se guarda aquí apenas llega, también durante prefetch.
+        self.cache = cache
+        self.negative_schedule = negative_schedule or NEGATIVE_TTL_HOURS
+        self.retry_negatives = retry_negatives
+        self.negative_hits = 0
+        self.negatives_written = 0
+        self._local: Dict[str, Tuple[Optional[dict], Optional[str]]] = {}
+        self._missing_key_reported = False
+        self._request_denied_reported = False
+
+    def _negative_hit(self, key: str) -> bool:
+        """Si el venue tiene un fallo reciente vigente, lo memoiza con el mismo motivo sin llamar a Google."""
+        if self.cache is None or self.retry_negatives:
+            return False
+        entry = self.cache.active_negative(key)
+        if entry is None:
+            return False
+        self.negative_hits += 1
+        self._local[key] = (None, entry["motivo"])
+        return True
+
+    def _remember_failure(self, key: str, lugar: str, municipio_id: str, error: Optional[str]) -> None:
+        if self.cache is None:
+            return
+        clase = failure_class(error)
+        if clase is None:
+            return
+        previous = self.cache.get_negative(key)
+        intentos = int(previous["intentos"]) + 1 if previous else 1
+        now = time.time()
+        self.cache.put_negative(
+            {
+                "key": key,
+                "nombre_lugar": lugar,
+                "municipio_id": municipio_id,
+                "motivo": error,
+                "clase": clase,
+                "intentos": intentos,
+                "first_failed_at": float(previous["first_failed_at"]) if previous else now,
+                "last_failed_at": now,
+                "retry_after": now + negative_ttl_seconds(clase, intentos, self.negative_schedule),
+            }
+        )
+        self.negatives_written += 1
+
+    def _record(self, key: str, lugar: str, municipio_id: str, resolved: Optional[dict], error: Optional[str]) -> None:
+        self._local[key] = (resolved, error)
+        if resolved and self.cache is not None:
+            self.cache.upsert(cache_row(key, lugar, municipio_id, resolved))
+            self.cache.clear_negative(key)
+        elif not resolved:
+            self._remember_failure(key, lugar, municipio_id, error)
+
+        # Si hay error estructural de key/permisos, evitar 40 llamadas fallidas repetidas.
+        if error and "missing GOOGLE_MAPS_API_KEY" in error:
+            self.fatal_api_error = "missing GOOGLE_MAPS_API_KEY"
+            if not self._missing_key_reported:
+                print("ERROR: missing GOOGLE_MAPS_API_KEY", file=sys.stderr)
+                self._missing_key_reported = True
+        elif error and ("REQUEST_DENIED" in error or "billing not enabled" in error):
+            self.fatal_api_error = error
+            if not self._request_denied_reported:
+                print(f"ERROR: {error}", file=sys.stderr)
+                self._request_denied_reported = True
+
+    def resolve(self, key: str, lugar: str, municipio_id: str) -> Tuple[Optional[dict], Optional[str]]:
+        if key in self._local:
+            return self._local[key]
+        if self._negative_hit(key):
+            return self._local[key]
+        if self.fatal_api_error:
+            return None, self.fatal_api_error
+
+        self.api_calls += 1
+        resolved, error = google_places_resolve(
+            http=self.http,
+            api_key=self.api_key,
+            nombre_lugar=lugar,
+            municipio_nombre=self.municipios_map.get(municipio_id, ""),
+            details_fanout=self.details_fanout,
+            use_search_address=self.use_search_address,
+            stats=self.google_stats,
+            details_hedge=self.details_hedge,
+        )
+        self._record(key, lugar, municipio_id, resolved, error)
+        return resolved, error
+
+    def prefetch(self, pending: List[Tuple[str, str, str]], workers: int) -> None:
+        """Resuelve en paralelo (hasta `workers` a la vez) las claves aún no resueltas.
+
+        Cada clave se resuelve una sola vez aunque aparezca repetida. Ante un
+        error fatal (falta la key, REQUEST_DENIED) se cancela todo lo pendiente;
+        esas claves quedan sin memo y resolve() devuelve el error fatal. Si se
+        interrumpe (Ctrl-C), se cancela lo que falta: lo ya resuelto quedó en el cache.
+        """
+        pending = [item for item in pending if item[0] not in self._local and not self._negative_hit(item[0])]
+        if pending and not self.fatal_api_error:
+            future = self.http.submit(self._aprefetch(pending, max(1, workers)))
+            try:
+                future.result()
+            except BaseException:
+                # Que no salgan más llamadas facturables mientras se cierra la corrida.
+                future.cancel()
+                raise
+
+    async def _aprefetch(self, pending: List[Tuple[str, str, str]], workers: int) -> None:
+        semaphore = asyncio.Semaphore(workers)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(key: str, lugar: str, municipio_id: str) -> None:
+            async with semaphore:
+                if self.fatal_api_error:
+                    return
+                self.api_calls += 1
+                resolved, error = await agoogle_places_resolve(
+                    http=self.http,
+                    api_key=self.api_key,
+                    nombre_lugar=lugar,
+                    municipio_nombre=self.municipios_map.get(municipio_id, ""),
+                    details_fanout=self.details_fanout,
+                    use_search_address=self.use_search_address,
+                    stats=self.google_stats,
+                    details_hedge=self.details_hedge,
+                )
+                self._record(key, lugar, municipio_id, resolved, error)
+                if self.fatal_api_error:
+                    for other in tasks.values():
+                        if not other.done() and other is not asyncio.current_task():
+                            other.cancel()
+
+        for key, lugar, municipio_id in pending:
+            if key not in tasks and key not in self._local:
+                tasks[key] = asyncio.ensure_future(run(key, lugar, municipio_id))
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        self.cancelled += sum(1 for key in tasks if key not in self._local)
+
+
+def cached_address(cache_entry: Optional[dict]) -> str:
+    """Dirección del cache solo si es una dirección real desde Google Places."""
+    if not cache_entry:
+        return ""
+    if clean_spaces(cache_entry.get("fuente", "")).lower() != "google_places":
+        return ""
+    if not clean_spaces(cache_entry.get("place_id", "")):
+        return ""
+    return clean_spaces(cache_entry.get("direccion", ""))
+
+
+def collect_cache_misses(input_rows: Iterable[dict], cache: VenueCacheStore) -> List[Tuple[str, str, str]]:
+    """Claves únicas (key, lugar, municipio_id) que no tienen dirección en cache, en orden de aparición."""
+    pending: Dict[str, Tuple[str, str, str]] = {}
+    for row in input_rows:
+        lugar = clean_spaces(row.get("lugar", ""))
+        municipio_id = clean_spaces(str(row.get("municipio_id", "")))
+        key = make_key(lugar, municipio_id)
+        if key not in pending and not cached_address(cache.get(key)):
+            pending[key] = (key, lugar, municipio_id)
+    return list(pending.values())
+
+
+def new_enrich_stats() -> Dict[str, int]:
+    return {"processed": 0, "cache_hits": 0, "fails": 0}
+
+
+def iter_enriched_rows(
+    input_rows: Iterable[dict],
+    cache: VenueCacheStore,
+    no_resueltos: NoResueltosStore,
+    resolver: GoogleResolver,
+    source_name: str,
+    stats: Dict[str, int],
+) -> Iterator[dict]:
+    """Agrega `direccion` a cada fila a medida que se consume; actualiza no_resueltos y stats en sitio.
+
+    `cache` solo se lee aquí: las resoluciones nuevas las guarda el resolver al recibirlas.
+
+    La fila se completa en sitio (sin copiarla): csv.DictReader entrega un dict nuevo por línea.
+    """
+    for row in input_rows:
+        stats["processed"] += 1
+        lugar = clean_spaces(row.get("lugar", ""))
+        municipio_id = clean_spaces(str(row.get("municipio_id", "")))
+        enlaceboletos = clean_spaces(row.get("enlaceboletos", ""))
+        key = make_key(lugar, municipio_id)
+
+        resolved_address = ""
+
+        # Solo cache de direcciones reales desde Google Places.
+        cache_address = cached_address(cache.get(key))
+        if cache_address:
+            stats["cache_hits"] += 1
+            resolved_address = cache_address
+        else:
+            resolved, error = resolver.resolve(key, lugar, municipio_id)
+
+            if resolved:
+                # El resolver ya la guardó en el cache al recibirla.
+                resolved_address = clean_spaces(resolved.get("direccion", ""))
+            else:
+                stats["fails"] += 1
+                motivo = error or "No se pudo resolver dirección"
+                no_resueltos.add(
+                    {
+                        "nombre_lugar": lugar,
+                        "municipio_id": municipio_id,
+                        "fuente_scraper": source_name,
+                        "enlaceboletos": enlaceboletos,
+                        "motivo": motivo,
+                    }
+                )
+
+        # Regla: direccion no debe ser igual a lugar.
+        if normalize_text(resolved_address) == normalize_text(lugar):
+            resolved_address = ""
+
+        # Limpieza de pendientes antiguos: si ya resolvimos, removemos entradas previas del mismo venue/fuente.
+        if resolved_address:
+            no_resueltos.discard_venue(lugar, municipio_id, source_name)
+
+        row["direccion"] = resolved_address
+        yield row
+
+
+def enrich_rows(
+    input_rows: Iterable[dict],
+    cache: VenueCacheStore,
+    no_resueltos: NoResueltosStore,
+    resolver: GoogleResolver,
+    source_name: str,
+) -> Tuple[List[dict], Dict[str, int]]:
+    """Versión en memoria de iter_enriched_rows (devuelve todas las filas; las de entrada se completan en sitio)."""
+    stats = new_enrich_stats()
+    output_rows = list(iter_enriched_rows(input_rows, cache, no_resueltos, resolver, source_name, stats))
+    return output_rows, stats
+
+
+RESOLVER_COUNTERS = ("api_calls", "negative_hits", "negatives_written")
+
+
+def resume_enrichment(
+    journal: CheckpointJournal,
+    resume: bool,
+    partial: Path,
+    stats: Dict[str, int],
+    no_resueltos: NoResueltosStore,
+    resolver: GoogleResolver,
+) -> Tuple[int, int]:
+    """Abre el journal y, si hay checkpoint válido, restaura el estado.
+
+    Devuelve (filas ya escritas, bytes del .partial a conservar). El checkpoint
+    solo sirve si el .partial sigue ahí con al menos esos bytes; si no, se
+    empieza de cero. Un checkpoint de prefetch sin filas escritas no necesita
+    .partial (solo restaura los contadores).
+    """
+    records = journal.open(resume=resume)
+    if not records:
+        return 0, 0
+    last = records[-1]
+    if int(last["rows"]) and (not partial.exists() or partial.stat().st_size < int(last["bytes"])):
+        print(f"[WARN] {partial.name} no coincide con el checkpoint; se empieza de cero.")
+        journal.close()
+        journal.open(resume=False)
+        return 0, 0
+    for record in records:
+        no_resueltos.apply_ops(record.get("no_resueltos_ops", []))
+    stats.update(last.get("stats", {}))
+    for name, value in last.get("resolver", {}).items():
+        if name in RESOLVER_COUNTERS:
+            setattr(resolver, name, int(value))
+    return int(last["rows"]), int(last["bytes"])
+
+
 def infer_source_name(input_path: Path, explicit: Optional[str]) -> str:
     if explicit:
         return explicit.strip().lower()
@@ -352,8 +852,99 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="Enriquecer direcciones de venues con cache global.")
     parser.add_argument("--input", required=True, help="Ruta del CSV eventos_municipios a enriquecer.")
     parser.add_argument("--source", default="", help="Nombre del scraper fuente (ej. prticket, pietix).")
-    parser.add_argument("--rate-sleep", type=float, default=0.35, help="Pausa entre llamadas API.")
+    parser.add_argument(
+        "--rate-sleep",
+        type=float,
+        default=0.35,
+        help="Pausa mínima entre llamadas API (se aplica como token bucket del host de Google).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Resoluciones de Google Places en paralelo (1 = una fila a la vez). Con N>1 se juntan primero "
+            "las claves únicas sin cache y se resuelven a la vez, respetando el mismo límite de --rate-sleep."
+        ),
+    )
+    parser.add_argument(
+        "--details-fanout",
+        type=int,
+        default=DEFAULT_DETAILS_FANOUT,
+        help=(
+            "Place details de candidatos en vuelo a la vez por venue (1 = uno tras otro). Con N>1, si el "
+            "candidato actual tarda más de --details-hedge se piden también los siguientes: ahorra latencia "
+            "pero cada request extra se factura aunque después se cancele (hasta N details por venue en "
+            "vez de 1 cuando el primero resulta útil)."
+        ),
+    )
+    parser.add_argument(
+        "--details-hedge",
+        type=float,
+        default=DEFAULT_DETAILS_HEDGE,
+        help=(
+            "Segundos que se espera al candidato actual antes de pedir los siguientes (solo con "
+            "--details-fanout > 1; 0 = pedirlos todos de entrada, lo más caro)."
+        ),
+    )
+    parser.add_argument(
+        "--use-search-address",
+        action="store_true",
+        help="Usar formatted_address/geometry del text search cuando ya es útil y no pedir place details.",
+    )
+    parser.add_argument(
+        "--retry-negatives",
+        action="store_true",
+        help="Ignorar el cache negativo y volver a consultar a Google los venues que fallaron antes.",
+    )
+    parser.add_argument(
+        "--negative-ttl",
+        action="append",
+        default=[],
+        metavar="CLASE=HORAS[:MAX_HORAS]",
+        help=(
+            "TTL del cache negativo por clase de fallo (repetible). Clases: "
+            + ", ".join(f"{k} ({v[0]:g}h→{v[1]:g}h)" for k, v in NEGATIVE_TTL_HOURS.items())
+            + ". El TTL se duplica por cada fallo consecutivo hasta el máximo."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="Filas enriquecidas por bloque escrito (y flush) al CSV de salida; cada bloque es un checkpoint.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continuar una corrida interrumpida desde el último bloque escrito (journal junto al CSV de "
+            "salida). Lo ya resuelto está en el cache SQLite, así que no se vuelve a facturar a Google."
+        ),
+    )
+    parser.add_argument(
+        "--cache-db",
+        default=f"exports/{CACHE_DB_NAME}",
+        help="Cache global SQLite (se siembra con exports/event_venues_cache.csv si está vacío).",
+    )
+    parser.add_argument(
+        "--import-cache-csv",
+        default="",
+        help="CSV con el esquema de event_venues_cache.csv a fusionar (upsert) en el cache antes de procesar.",
+    )
+    parser.add_argument(
+        "--no-export-cache-csv",
+        action="store_true",
+        help="No reescribir exports/event_venues_cache.csv al terminar (por defecto se exporta si hubo cambios).",
+    )
+    reference_data.add_arguments(parser)
+    metrics.add_arguments(parser)
     args = parser.parse_args()
+    run_metrics = metrics.install_from_args(args)
+    try:
+        negative_schedule = parse_negative_ttl(args.negative_ttl)
+    except ValueError as exc:
+        parser.error(str(exc))
 
     script_path = Path(__file__).resolve()
     repo_root = find_repo_root(script_path.parent)
@@ -365,21 +956,13 @@ def main() -> int:
 
     source_name = infer_source_name(input_path, args.source)
     output_path = input_path.with_name(f"{input_path.stem}_con_direcciones.csv")
-    cache_path = repo_root / "exports" / "event_venues_cache.csv"
+    cache_path = repo_root / "exports" / CACHE_CSV_NAME
+    cache_db_path = Path(args.cache_db) if Path(args.cache_db).is_absolute() else repo_root / args.cache_db
     no_resueltos_path = repo_root / "exports" / "venues_no_resueltos.csv"
 
-    env = {}
-    env.update(load_env_file(repo_root / ".env"))
-    env.update(load_env_file(repo_root / ".env.local"))
-    env.update(os.environ)
-
-    google_key = clean_spaces(env.get("GOOGLE_MAPS_API_KEY", ""))
-
-    http = HttpClient()
-    municipios_map = fetch_municipios_map(http=http, env=env)
-
-    input_rows, input_headers = read_csv_rows(input_path)
-    if not input_rows:
+    # Antes de abrir el motor HTTP: la salida vacía no necesita red.
+    input_headers = read_csv_headers(input_path)
+    if next(iter_csv_rows(input_path), None) is None:
         if not input_headers:
             print(f"ERROR: CSV vacío o inválido: {input_path}", file=sys.stderr)
             return 1
@@ -391,135 +974,154 @@ def main() -> int:
         print(f"Procesado: 0 filas en {output_path}")
         return 0
 
+    env = {}
+    env.update(load_env_file(repo_root / ".env"))
+    env.update(load_env_file(repo_root / ".env.local"))
+    env.update(os.environ)
+
+    google_key = clean_spaces(env.get("GOOGLE_MAPS_API_KEY", ""))
+
+    rate_sleep = max(0.0, float(args.rate_sleep))
+    http = HttpEngine(
+        host_policies={
+            GOOGLE_MAPS_HOST: HostPolicy(
+                max_concurrency=max(DEFAULT_GOOGLE_HOST_LIMIT, args.workers * max(1, args.details_fanout)),
+                rate=1.0 / rate_sleep if rate_sleep > 0 else 0.0,
+            ),
+        },
+        timeout=30,
+    )
+    with metrics.stage("reference_data"):
+        municipios_map = fetch_municipios_map(
+            http=http,
+            env=env,
+            snapshot_path=repo_root / "exports" / reference_data.SNAPSHOT_NAME,
+            ttl_seconds=args.reference_ttl_hours * 3600,
+            refresh=args.refresh_reference,
+        )
+
     out_headers = list(input_headers)
     if "direccion" not in out_headers:
         out_headers.append("direccion")
 
-    cache = keep_google_places_cache_only(load_cache(cache_path))
+    cache = open_venue_cache(cache_db_path, cache_path)
+    if args.import_cache_csv:
+        imported = cache.import_csv(Path(args.import_cache_csv).resolve())
+        print(f"Cache importado desde {args.import_cache_csv}: {imported} venues")
     no_resueltos = load_no_resueltos(no_resueltos_path)
 
-    processed = 0
-    cache_hits = 0
-    api_calls = 0
-    fails = 0
-    fatal_api_error = ""
-    missing_key_reported = False
-    request_denied_reported = False
-
-    output_rows: List[dict] = []
-    local_resolution_cache: Dict[str, Tuple[Optional[dict], Optional[str]]] = {}
-
-    for row in input_rows:
-        processed += 1
-        lugar = clean_spaces(row.get("lugar", ""))
-        municipio_id = clean_spaces(str(row.get("municipio_id", "")))
-        enlaceboletos = clean_spaces(row.get("enlaceboletos", ""))
-        key = make_key(lugar, municipio_id)
-
-        enriched_row = dict(row)
-        resolved_address = ""
-
-        cache_entry = cache.get(key)
-        cache_entry_fuente = clean_spaces((cache_entry or {}).get("fuente", "")).lower()
-        # Solo cache de direcciones reales desde Google Places.
-        if (
-            cache_entry
-            and cache_entry_fuente == "google_places"
-            and clean_spaces(cache_entry.get("direccion", ""))
-            and clean_spaces(cache_entry.get("place_id", ""))
-        ):
-            cache_hits += 1
-            resolved_address = clean_spaces(cache_entry.get("direccion", ""))
-        else:
-            if key in local_resolution_cache:
-                resolved, error = local_resolution_cache[key]
-            else:
-                municipio_nombre = municipios_map.get(municipio_id, "")
-                if fatal_api_error:
-                    resolved, error = None, fatal_api_error
-                else:
-                    api_calls += 1
-                    resolved, error = google_places_resolve(
-                        http=http,
-                        api_key=google_key,
-                        nombre_lugar=lugar,
-                        municipio_nombre=municipio_nombre,
-                        rate_sleep=max(0.0, float(args.rate_sleep)),
-                    )
-                    local_resolution_cache[key] = (resolved, error)
-
-                    # Si hay error estructural de key/permisos, evitar 40 llamadas fallidas repetidas.
-                    if error and "missing GOOGLE_MAPS_API_KEY" in error:
-                        fatal_api_error = "missing GOOGLE_MAPS_API_KEY"
-                        if not missing_key_reported:
-                            print("ERROR: missing GOOGLE_MAPS_API_KEY", file=sys.stderr)
-                            missing_key_reported = True
-                    elif error and ("REQUEST_DENIED" in error or "billing not enabled" in error):
-                        fatal_api_error = error
-                        if not request_denied_reported:
-                            print(f"ERROR: {error}", file=sys.stderr)
-                            request_denied_reported = True
-
-            if resolved:
-                resolved_address = clean_spaces(resolved.get("direccion", ""))
-                cache[key] = {
-                    "key": key,
-                    "nombre_lugar": lugar,
-                    "municipio_id": municipio_id,
-                    "direccion": resolved_address,
-                    "place_id": clean_spaces(resolved.get("place_id", "")),
-                    "latitud": clean_spaces(resolved.get("latitud", "")),
-                    "longitud": clean_spaces(resolved.get("longitud", "")),
-                    "fuente": clean_spaces(resolved.get("fuente", "")) or "google_places",
-                    "updated_at": now_iso(),
-                }
-            else:
-                fails += 1
-                motivo = error or "No se pudo resolver dirección"
-                unresolved_row = {
-                    "nombre_lugar": lugar,
-                    "municipio_id": municipio_id,
-                    "fuente_scraper": source_name,
-                    "enlaceboletos": enlaceboletos,
-                    "motivo": motivo,
-                }
-                unresolved_key = "|".join(unresolved_row[h] for h in NO_RESUELTOS_HEADERS)
-                no_resueltos[unresolved_key] = unresolved_row
-
-        # Regla: direccion no debe ser igual a lugar.
-        if normalize_text(resolved_address) == normalize_text(lugar):
-            resolved_address = ""
+    resolver = GoogleResolver(
+        http=http,
+        api_key=google_key,
+        municipios_map=municipios_map,
+        details_fanout=args.details_fanout,
+        use_search_address=args.use_search_address,
+        details_hedge=args.details_hedge,
+        cache=cache,
+        negative_schedule=negative_schedule,
+        retry_negatives=args.retry_negatives,
+    )
+    stats = new_enrich_stats()
+    journal = CheckpointJournal(
+        output_path.with_name(output_path.name + ".journal.jsonl"),
+        header={
+            "kind": "fill_venues_addresses",
+            "input": str(input_path),
+            "input_size": input_path.stat().st_size,
+            "input_mtime_ns": input_path.stat().st_mtime_ns,
+            "source": source_name,
+            "headers": out_headers,
+        },
+        sync_every=1,
+    )
+    done_rows, resume_bytes = resume_enrichment(
+        journal, args.resume, partial_path(output_path), stats, no_resueltos, resolver
+    )
+    if done_rows:
+        print(f"Retomando desde checkpoint: {done_rows} filas ya escritas en {partial_path(output_path).name}")
+    no_resueltos.ops = []
+
+    def checkpoint(rows_written: int, bytes_written: int) -> None:
+        journal.append(
+            {
+                "rows": done_rows + rows_written,
+                "bytes": bytes_written,
+                "stats": dict(stats),
+                "no_resueltos_ops": no_resueltos.drain_ops(),
+                "resolver": {name: getattr(resolver, name) for name in RESOLVER_COUNTERS},
+            }
+        )
 
-        # Limpieza de pendientes antiguos: si ya resolvimos, removemos entradas previas del mismo venue/fuente.
-        if resolved_address:
-            to_delete = []
-            for unresolved_key, unresolved_row in no_resueltos.items():
-                if (
-                    normalize_text(unresolved_row.get("nombre_lugar", "")) == normalize_text(lugar)
-                    and clean_spaces(unresolved_row.get("municipio_id", "")) == municipio_id
-                    and clean_spaces(unresolved_row.get("fuente_scraper", "")).lower() == source_name.lower()
-                ):
-                    to_delete.append(unresolved_key)
-            for unresolved_key in to_delete:
-                no_resueltos.pop(unresolved_key, None)
-
-        enriched_row["direccion"] = resolved_address
-        output_rows.append(enriched_row)
-
-    # Guardar cache persistente (merge: conserva existente + nuevos/actualizados).
-    save_cache(cache_path, cache)
+    try:
+        if args.workers > 1:
+            # Primera pasada en streaming: solo se retienen las claves únicas sin cache.
+            # Cada resolución queda en el cache al llegar; el checkpoint del prefetch (terminado o
+            # interrumpido) guarda los contadores, y --resume salta lo ya resuelto sin volver a pagarlo.
+            with metrics.stage("prefetch"):
+                pending = collect_cache_misses(itertools.islice(iter_csv_rows(input_path), done_rows, None), cache)
+                try:
+                    resolver.prefetch(pending, workers=args.workers)
+                finally:
+                    checkpoint(0, resume_bytes)
+        enriched = iter_enriched_rows(
+            itertools.islice(iter_csv_rows(input_path), done_rows, None),
+            cache,
+            no_resueltos,
+            resolver,
+            source_name,
+            stats,
+        )
+        with metrics.stage("enrich"):
+            write_csv_stream(
+                output_path,
+                out_headers,
+                enriched,
+                chunk_rows=max(1, args.chunk_rows),
+                on_flush=checkpoint,
+                resume_bytes=resume_bytes,
+            )
+    except KeyboardInterrupt:
+        journal.close()
+        http.close()
+        cache.close()
+        print("\nInterrumpido: vuelve a correr con --resume para continuar desde el último bloque.", file=sys.stderr)
+        return 130
+
+    # El cache SQLite ya quedó al día fila a fila; el CSV es solo exportación de compatibilidad.
+    http.close()
+    if cache.writes and not args.no_export_cache_csv:
+        with metrics.stage("cache_export"):
+            cache.export_csv(cache_path)
     save_no_resueltos(no_resueltos_path, no_resueltos)
-    write_csv_rows(output_path, out_headers, output_rows)
+    journal.finish()
 
     print(f"Input: {input_path}")
     print(f"Output enriquecido: {output_path}")
-    print(f"Cache global: {cache_path}")
+    print(f"Cache global: {cache_db_path}")
     print(f"No resueltos: {no_resueltos_path}")
-    print(f"total venues procesados: {processed}")
-    print(f"cache hits: {cache_hits}")
-    print(f"api calls: {api_calls}")
-    print(f"fallos: {fails}")
+    print(f"total venues procesados: {stats['processed']}")
+    print(f"cache hits: {stats['cache_hits']}")
+    print(f"api calls: {resolver.api_calls}")
+    if resolver.google_stats:
+        print("llamadas google: " + ", ".join(f"{k} {v}" for k, v in sorted(resolver.google_stats.items())))
+    if resolver.cancelled:
+        print(f"resoluciones canceladas por error fatal: {resolver.cancelled}")
+    print(f"fallos: {stats['fails']}")
+    print(
+        f"cache negativo: {resolver.negative_hits} omitidos, {resolver.negatives_written} registrados, "
+        f"{cache.count_negatives(active_only=True)} vigentes"
+    )
     print(f"cache size total: {len(cache)}")
+    cache.close()
+    print(f"cache normalize_text: {normalize_cache_summary()}")
+
+    if run_metrics is not None:
+        run_metrics.record_cache("venues", stats["cache_hits"], stats["processed"] - stats["cache_hits"])
+        for kind, count in sorted(resolver.google_stats.items()):
+            run_metrics.inc("google_calls_total", count, kind=kind)
+        normalize_stats = normalize_cache_stats()
+        run_metrics.record_cache("normalize_text", normalize_stats["hits"], normalize_stats["misses"])
+        metrics.export_from_args(run_metrics, args)
 
     return 0
 
@@ -0,0 +1,202 @@
+"""
+Cache HTTP persistente en disco con GET condicional.
+
+Cada URL se guarda como dos archivos (cuerpo + metadatos JSON) bajo un prefijo
+sha256 de la URL. En la siguiente corrida se envía If-None-Match /
+If-Modified-Since; un 304 reutiliza el cuerpo guardado. La evicción es por
+edad (última validación) y por tamaño total (LRU por última validación).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from common.http_engine import HttpEngine, HttpResponse
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: str
+    last_modified: str
+    content_type: str
+    stored_at: float
+    validated_at: float
+    size: int
+    body_path: Path
+    meta_path: Path
+
+    def read_body(self) -> bytes:
+        return self.body_path.read_bytes()
+
+
+class DiskHttpCache:
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        fresh_seconds: float = 0.0,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fresh_seconds = fresh_seconds
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "not_modified": 0, "evicted": 0}
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = self.root / digest[:2]
+        return folder / f"{digest}.body", folder / f"{digest}.json"
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return CacheEntry(
+            url=url,
+            etag=meta.get("etag", ""),
+            last_modified=meta.get("last_modified", ""),
+            content_type=meta.get("content_type", ""),
+            stored_at=float(meta.get("stored_at", 0)),
+            validated_at=float(meta.get("validated_at", 0)),
+            size=int(meta.get("size", 0)),
+            body_path=body_path,
+            meta_path=meta_path,
+        )
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _write_meta(self, entry: CacheEntry) -> None:
+        meta = {
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "content_type": entry.content_type,
+            "stored_at": entry.stored_at,
+            "validated_at": entry.validated_at,
+            "size": entry.size,
+        }
+        tmp = entry.meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, entry.meta_path)
+
+    def store(self, url: str, response: HttpResponse) -> CacheEntry:
+        body_path, meta_path = self._paths(url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = body_path.with_suffix(".body.tmp")
+        tmp.write_bytes(response.body)
+        os.replace(tmp, body_path)
+        now = time.time()
+        entry = CacheEntry(
+            url=url,
+            etag=response.headers.get("etag", ""),
+            last_modified=response.headers.get("last-modified", ""),
+            content_type=response.headers.get("content-type", ""),
+            stored_at=now,
+            validated_at=now,
+            size=len(response.body),
+            body_path=body_path,
+            meta_path=meta_path,
+        )
+        self._write_meta(entry)
+        return entry
+
+    def _as_response(self, entry: CacheEntry, status: int = 200) -> HttpResponse:
+        headers = {"content-type": entry.content_type, "etag": entry.etag, "last-modified": entry.last_modified}
+        return HttpResponse(entry.url, status, "OK", headers, entry.read_body())
+
+    async def afetch(self, http: HttpEngine, url: str, extra_headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        entry = self.lookup(url)
+        if entry is not None and self.fresh_seconds > 0 and time.time() - entry.validated_at < self.fresh_seconds:
+            self.stats["hits"] += 1
+            return self._as_response(entry)
+
+        headers = dict(extra_headers or {})
+        headers.update(self.conditional_headers(entry))
+        response = await http.arequest("GET", url, headers=headers)
+        if response.status == 304 and entry is not None:
+            self.stats["not_modified"] += 1
+            entry.validated_at = time.time()
+            self._write_meta(entry)
+            return self._as_response(entry)
+
+        self.stats["misses"] += 1
+        self.store(url, response)
+        return response
+
+    async def afetch_text(self, http: HttpEngine, url: str, extra_headers: Optional[Dict[str, str]] = None) -> str:
+        return (await self.afetch(http, url, extra_headers=extra_headers)).text()
+
+    def fetch_text(self, http: HttpEngine, url: str, extra_headers: Optional[Dict[str, str]] = None) -> str:
+        return http.submit(self.afetch_text(http, url, extra_headers=extra_headers)).result()
+
+    def evict(self) -> int:
+        """Elimina entradas vencidas por edad y luego las menos validadas hasta cumplir max_bytes."""
+        entries = []
+        for meta_path in self.root.glob("*/*.json"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                meta = {}
+            entries.append((float(meta.get("validated_at", 0)), int(meta.get("size", 0)), meta_path))
+
+        now = time.time()
+        removed = 0
+        total = 0
+        kept = []
+        for validated_at, size, meta_path in entries:
+            if self.max_age_seconds > 0 and now - validated_at > self.max_age_seconds:
+                removed += self._remove(meta_path)
+            else:
+                kept.append((validated_at, size, meta_path))
+                total += size
+
+        if self.max_bytes > 0 and total > self.max_bytes:
+            for validated_at, size, meta_path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                removed += self._remove(meta_path)
+                total -= size
+
+        self.stats["evicted"] += removed
+        return removed
+
+    @staticmethod
+    def _remove(meta_path: Path) -> int:
+        for path in (meta_path, meta_path.with_suffix(".body")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        return 1
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"hits {s['hits']}, misses {s['misses']}, 304 {s['not_modified']}, eliminadas {s['evicted']}"
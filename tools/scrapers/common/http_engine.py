@@ -0,0 +1,655 @@
+"""
+Motor HTTP asíncrono compartido por los scrapers.
+
+- HTTP/1.1 sobre asyncio streams con conexiones keep-alive reutilizadas por host.
+- Semáforo por host para acotar requests simultáneos.
+- Token bucket por host (reemplaza los time.sleep ad-hoc entre llamadas).
+- Reintentos con backoff exponencial + jitter para errores de red, 429 y 5xx,
+  solo en métodos idempotentes (GET, HEAD, PUT, DELETE...): un POST que
+  falló a mitad de camino pudo haberse aplicado. arequest(..., retry=True)
+  los activa para un POST que sí se puede repetir (upsert por clave natural).
+- Proxies de HTTP_PROXY / HTTPS_PROXY / NO_PROXY (urllib.request.getproxies,
+  lo mismo que respetaba build_opener): http:// por el proxy con la URL
+  absoluta, https:// con un túnel CONNECT. Solo proxies http://; uno de otro
+  esquema (https://, socks5://) se ignora con un aviso y ese tráfico va directo.
+- Si hay un registro de common.metrics instalado: latencia por host, status,
+  bytes recibidos y reintentos.
+
+Los scripts siguen siendo síncronos: HttpEngine corre su propio event loop en un
+hilo de fondo y expone corutinas (arequest), futures (submit) y llamadas
+bloqueantes (request, fetch_text, fetch_json, get_json).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import concurrent.futures
+import gzip
+import json
+import random
+import re
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from common.metrics import current as current_metrics
+
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+)
+DEFAULT_TIMEOUT = 35.0
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+NO_BODY_STATUSES = {204, 304}
+
+_CHARSET_RE = re.compile(r"charset=([^\s;]+)", re.I)
+
+
+class HttpError(Exception):
+    """Respuesta HTTP >= 400 (mismo mensaje que urllib.error.HTTPError)."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes) -> None:
+        super().__init__(f"HTTP Error {status}: {reason}")
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+class _StaleConnection(Exception):
+    """La conexión keep-alive reutilizada fue cerrada por el servidor antes de responder."""
+
+
+@dataclass
+class HttpResponse:
+    url: str
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+    set_cookies: List[str] = field(default_factory=list)
+
+    @property
+    def charset(self) -> str:
+        m = _CHARSET_RE.search(self.headers.get("content-type", ""))
+        return m.group(1).strip().strip("'\"") if m else "utf-8"
+
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def json(self, default: Any = None) -> Any:
+        text = self.text()
+        if not text.strip():
+            return default
+        return json.loads(text)
+
+
+@dataclass
+class HostPolicy:
+    """Límites por host: requests simultáneos, requests/seg y ráfaga permitida."""
+
+    max_concurrency: int = 4
+    rate: float = 5.0
+    burst: int = 1
+
+
+class TokenBucket:
+    """Token bucket asíncrono: `rate` tokens/seg con capacidad `burst` (rate <= 0 desactiva)."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def is_usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class _HostState:
+    def __init__(self, policy: HostPolicy, proxy: Optional[urllib.parse.SplitResult] = None) -> None:
+        self.semaphore = asyncio.Semaphore(max(1, policy.max_concurrency))
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.idle: List[_Connection] = []
+        self.cookies: Dict[str, str] = {}
+        # Proxy por el que salen las conexiones de este host (None: conexión directa).
+        self.proxy = proxy
+
+
+class HttpEngine:
+    def __init__(
+        self,
+        default_headers: Optional[Dict[str, str]] = None,
+        default_policy: Optional[HostPolicy] = None,
+        host_policies: Optional[Dict[str, HostPolicy]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.headers: Dict[str, str] = {"User-Agent": DEFAULT_USER_AGENT}
+        if default_headers:
+            self.headers.update(default_headers)
+        self.default_policy = default_policy or HostPolicy()
+        self.host_policies = {k.lower(): v for k, v in (host_policies or {}).items()}
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Mismo formato que urllib.request.getproxies ({"http": ..., "https": ..., "no": ...}); {} desactiva.
+        self.proxies = dict(urllib.request.getproxies() if proxies is None else proxies)
+        for scheme in ("http", "https"):
+            if scheme in self.proxies:
+                proxy = self._parse_proxy(self.proxies[scheme])
+                if proxy.scheme != "http" or not proxy.hostname:
+                    print(
+                        f"[WARN] Proxy {scheme} no soportado (solo http://host:puerto), se conecta directo: "
+                        f"{self.proxies.pop(scheme)}",
+                        file=sys.stderr,
+                    )
+        self._hosts: Dict[str, _HostState] = {}
+        self._ssl_context = ssl.create_default_context()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # ---- ciclo de vida del loop de fondo ----
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="http-engine", daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Agenda una corutina en el loop del engine; cancelar el future cancela la tarea."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        loop.close()
+        self._loop = None
+        self._thread = None
+        self._hosts.clear()
+
+    async def _aclose(self) -> None:
+        for state in self._hosts.values():
+            while state.idle:
+                state.idle.pop().close()
+
+    def __enter__(self) -> "HttpEngine":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ---- API bloqueante (compatible con SimpleHttp/HttpClient) ----
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[bool] = None,
+    ) -> HttpResponse:
+        return self.submit(self.arequest(method, url, headers=headers, body=body, timeout=timeout, retry=retry)).result()
+
+    def fetch_text(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> str:
+        return self.request("GET", url, headers=extra_headers).text()
+
+    def fetch_json(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        return self.request("GET", url, headers=headers).json(default=[])
+
+    def get_json(self, url: str, timeout: Optional[float] = None) -> Any:
+        return self.request("GET", url, timeout=timeout).json(default={})
+
+    # ---- API asíncrona ----
+
+    async def afetch_text(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> str:
+        return (await self.arequest("GET", url, headers=extra_headers)).text()
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[bool] = None,
+    ) -> HttpResponse:
+        """`retry`: reintentar errores de red, 429 y 5xx; por defecto solo si el método es idempotente."""
+        metrics = current_metrics()
+        if metrics is None:
+            return await self._arequest(method, url, headers, body, timeout, retry)
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        start = time.perf_counter()
+        try:
+            response = await self._arequest(method, url, headers, body, timeout, retry)
+        except HttpError as exc:
+            metrics.observe_request(host, time.perf_counter() - start, exc.status, len(exc.body))
+            raise
+        except Exception:
+            metrics.observe_request(host, time.perf_counter() - start, "error", 0)
+            raise
+        metrics.observe_request(host, time.perf_counter() - start, response.status, len(response.body))
+        return response
+
+    async def _arequest(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        body: Optional[bytes],
+        timeout: Optional[float],
+        retry: Optional[bool] = None,
+    ) -> HttpResponse:
+        method = method.upper()
+        current_url = url
+        for _ in range(MAX_REDIRECTS + 1):
+            retries = self.max_retries if (method in IDEMPOTENT_METHODS if retry is None else retry) else 0
+            response = await self._request_with_retries(method, current_url, headers, body, timeout, retries)
+            location = response.headers.get("location", "")
+            if response.status in REDIRECT_STATUSES and location:
+                current_url = urllib.parse.urljoin(current_url, location)
+                if response.status == 303 or (response.status in {301, 302} and method == "POST"):
+                    method, body = "GET", None
+                continue
+            if response.status >= 400:
+                raise HttpError(current_url, response.status, response.reason, response.headers, response.body)
+            return response
+        raise HttpError(current_url, 310, "Too many redirects", {}, b"")
+
+    def _host_state(self, parsed: urllib.parse.SplitResult) -> _HostState:
+        # Las conexiones keep-alive son por esquema, host y puerto (dos servidores locales comparten 127.0.0.1).
+        host = (parsed.hostname or "").lower()
+        key = f"{parsed.scheme}://{host}:{parsed.port or ''}"
+        state = self._hosts.get(key)
+        if state is None:
+            state = _HostState(self.host_policies.get(host, self.default_policy), self._proxy_for(parsed))
+            self._hosts[key] = state
+        return state
+
+    @staticmethod
+    def _parse_proxy(value: str) -> urllib.parse.SplitResult:
+        # Como urllib: "proxy:3128" sin esquema es un proxy http.
+        return urllib.parse.urlsplit(value if "://" in value else f"http://{value}")
+
+    def _proxy_for(self, parsed: urllib.parse.SplitResult) -> Optional[urllib.parse.SplitResult]:
+        value = self.proxies.get(parsed.scheme)
+        if not value:
+            return None
+        netloc = f"{parsed.hostname}:{parsed.port}" if parsed.port else (parsed.hostname or "")
+        if urllib.request.proxy_bypass_environment(netloc, self.proxies):
+            return None
+        return self._parse_proxy(value)
+
+    @staticmethod
+    def _proxy_authorization(proxy: urllib.parse.SplitResult) -> str:
+        if proxy.username is None:
+            return ""
+        user = urllib.parse.unquote(proxy.username)
+        password = urllib.parse.unquote(proxy.password or "")
+        return "Basic " + base64.b64encode(f"{user}:{password}".encode("utf-8")).decode("ascii")
+
+    def _backoff_delay(self, attempt: int, retry_after: str = "") -> float:
+        try:
+            if retry_after:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def _count_retry(host: str, reason: str) -> None:
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.record_retry(host, reason)
+
+    async def _request_with_retries(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        body: Optional[bytes],
+        timeout: Optional[float],
+        max_retries: int,
+    ) -> HttpResponse:
+        parsed = urllib.parse.urlsplit(url)
+        host = (parsed.hostname or "").lower()
+        state = self._host_state(parsed)
+        attempt = 0
+        while True:
+            try:
+                async with state.semaphore:
+                    await state.bucket.acquire()
+                    response = await asyncio.wait_for(
+                        self._send(state, parsed, method, headers, body),
+                        timeout=timeout or self.timeout,
+                    )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                if attempt >= max_retries:
+                    raise
+                self._count_retry(host, type(exc).__name__)
+                await asyncio.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+            if response.status in RETRY_STATUSES and attempt < max_retries:
+                self._count_retry(host, f"status_{response.status}")
+                await asyncio.sleep(self._backoff_delay(attempt, response.headers.get("retry-after", "")))
+                attempt += 1
+                continue
+            return response
+
+    async def _open(self, state: _HostState, parsed: urllib.parse.SplitResult) -> _Connection:
+        secure = parsed.scheme == "https"
+        port = parsed.port or (443 if secure else 80)
+        proxy = state.proxy
+        if proxy is None:
+            reader, writer = await asyncio.open_connection(
+                parsed.hostname,
+                port,
+                ssl=self._ssl_context if secure else None,
+                server_hostname=parsed.hostname if secure else None,
+            )
+        elif not secure:
+            reader, writer = await asyncio.open_connection(proxy.hostname, proxy.port or 80)
+        else:
+            sock = await self._tunnel(proxy, parsed.hostname or "", port)
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=self._ssl_context, server_hostname=parsed.hostname
+            )
+        return _Connection(reader, writer)
+
+    async def _tunnel(self, proxy: urllib.parse.SplitResult, host: str, port: int) -> socket.socket:
+        """Socket conectado al proxy con un túnel CONNECT abierto hacia host:port (el TLS va encima)."""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(proxy.hostname, proxy.port or 80, type=socket.SOCK_STREAM)
+        last_exc: Optional[OSError] = None
+        for family, kind, proto, _, address in infos:
+            sock = socket.socket(family, kind, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                break
+            except OSError as exc:
+                sock.close()
+                last_exc = exc
+        else:
+            raise last_exc or OSError(f"No se pudo resolver el proxy {proxy.hostname}")
+        try:
+            lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+            authorization = self._proxy_authorization(proxy)
+            if authorization:
+                lines.append(f"Proxy-Authorization: {authorization}")
+            await loop.sock_sendall(sock, ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            # El proxy no manda nada después de sus cabeceras hasta que empieza el TLS.
+            head = b""
+            while b"\r\n\r\n" not in head:
+                data = await loop.sock_recv(sock, 4096)
+                if not data:
+                    raise ConnectionResetError(f"El proxy {proxy.hostname} cerró el túnel CONNECT")
+                head += data
+            _, status, reason = self._parse_status_line(head.split(b"\r\n", 1)[0])
+            if status != 200:
+                raise HttpError(f"https://{host}:{port}", status, f"Tunnel connection failed: {reason}", {}, b"")
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _checkout(self, state: _HostState) -> Optional[_Connection]:
+        while state.idle:
+            conn = state.idle.pop()
+            if conn.is_usable():
+                conn.reused = True
+                return conn
+            conn.close()
+        return None
+
+    def _checkin(self, state: _HostState, conn: _Connection) -> None:
+        if conn.is_usable() and len(state.idle) < MAX_IDLE_PER_HOST:
+            state.idle.append(conn)
+        else:
+            conn.close()
+
+    async def _send(
+        self,
+        state: _HostState,
+        parsed: urllib.parse.SplitResult,
+        method: str,
+        headers: Optional[Dict[str, str]],
+        body: Optional[bytes],
+    ) -> HttpResponse:
+        payload = self._build_request(state, parsed, method, headers, body)
+        conn = self._checkout(state)
+        if conn is not None:
+            try:
+                return await self._exchange(state, conn, parsed, method, payload)
+            except _StaleConnection:
+                pass
+        conn = await self._open(state, parsed)
+        try:
+            return await self._exchange(state, conn, parsed, method, payload)
+        except _StaleConnection as exc:
+            raise ConnectionResetError(str(exc)) from None
+
+    def _build_request(
+        self,
+        state: _HostState,
+        parsed: urllib.parse.SplitResult,
+        method: str,
+        headers: Optional[Dict[str, str]],
+        body: Optional[bytes],
+    ) -> bytes:
+        merged: Dict[str, str] = {}
+        default_port = 443 if parsed.scheme == "https" else 80
+        host_header = parsed.hostname or ""
+        if parsed.port and parsed.port != default_port:
+            host_header = f"{host_header}:{parsed.port}"
+        merged["Host"] = host_header
+        merged.update(self.headers)
+        merged.setdefault("Accept-Encoding", "gzip, deflate")
+        merged["Connection"] = "keep-alive"
+        if headers:
+            merged.update(headers)
+        if state.cookies and "Cookie" not in merged:
+            merged["Cookie"] = "; ".join(f"{k}={v}" for k, v in state.cookies.items())
+        if body is not None or method in {"POST", "PUT", "PATCH"}:
+            merged["Content-Length"] = str(len(body or b""))
+        target = parsed.path or "/"
+        if parsed.query:
+            target = f"{target}?{parsed.query}"
+        if state.proxy is not None and parsed.scheme == "http":
+            # Por el proxy (sin túnel) va la URL absoluta.
+            target = urllib.parse.urlunsplit((parsed.scheme, parsed.netloc, target, "", ""))
+            authorization = self._proxy_authorization(state.proxy)
+            if authorization:
+                merged["Proxy-Authorization"] = authorization
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{k}: {v}" for k, v in merged.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+    async def _exchange(
+        self,
+        state: _HostState,
+        conn: _Connection,
+        parsed: urllib.parse.SplitResult,
+        method: str,
+        payload: bytes,
+    ) -> HttpResponse:
+        try:
+            conn.writer.write(payload)
+            await conn.writer.drain()
+            status_line = await conn.reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            conn.close()
+            raise _StaleConnection(str(exc)) from None
+        except BaseException:
+            conn.close()
+            raise
+        if not status_line:
+            conn.close()
+            raise _StaleConnection("conexión cerrada por el servidor")
+
+        try:
+            response, keep_alive = await self._read_response(conn, parsed, method, status_line)
+        except BaseException:
+            conn.close()
+            raise
+
+        for cookie in response.set_cookies:
+            name, _, value = cookie.split(";", 1)[0].partition("=")
+            if name.strip():
+                state.cookies[name.strip()] = value.strip()
+
+        if keep_alive:
+            self._checkin(state, conn)
+        else:
+            conn.close()
+        return response
+
+    async def _read_response(
+        self,
+        conn: _Connection,
+        parsed: urllib.parse.SplitResult,
+        method: str,
+        status_line: bytes,
+    ) -> Tuple[HttpResponse, bool]:
+        while True:
+            version, status, reason = self._parse_status_line(status_line)
+            headers, set_cookies = await self._read_headers(conn.reader)
+            if status != 100:
+                break
+            status_line = await conn.reader.readline()
+
+        connection_header = headers.get("connection", "").lower()
+        keep_alive = version == "HTTP/1.1" and connection_header != "close"
+        keep_alive = keep_alive or (version == "HTTP/1.0" and connection_header == "keep-alive")
+
+        if method == "HEAD" or 100 <= status < 200 or status in NO_BODY_STATUSES:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked(conn.reader)
+        elif headers.get("content-length", "").strip().isdigit():
+            body = await conn.reader.readexactly(int(headers["content-length"].strip()))
+        else:
+            body = await conn.reader.read()
+            keep_alive = False
+
+        body = self._decode_body(body, headers.get("content-encoding", "").lower())
+        url = urllib.parse.urlunsplit(parsed)
+        return HttpResponse(url, status, reason, headers, body, set_cookies), keep_alive
+
+    @staticmethod
+    def _parse_status_line(line: bytes) -> Tuple[str, int, str]:
+        parts = line.decode("latin-1").strip().split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+            raise ValueError(f"Respuesta HTTP inválida: {line[:80]!r}")
+        return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Tuple[Dict[str, str], List[str]]:
+        headers: Dict[str, str] = {}
+        set_cookies: List[str] = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            if line in (b"\r\n", b"\n"):
+                return headers, set_cookies
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            if name == "set-cookie":
+                set_cookies.append(value)
+            elif name in headers:
+                headers[name] = f"{headers[name]}, {value}"
+            else:
+                headers[name] = value
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise asyncio.IncompleteReadError(b"", None)
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailers opcionales hasta línea vacía.
+                while True:
+                    trailer = await reader.readline()
+                    if trailer in (b"\r\n", b"\n", b""):
+                        return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    @staticmethod
+    def _decode_body(body: bytes, encoding: str) -> bytes:
+        if not body:
+            return body
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        return body
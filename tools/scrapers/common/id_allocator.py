@@ -0,0 +1,103 @@
+"""
+IDs estables por clave natural, persistidos entre corridas (clave → id por tabla).
+
+Antes cada corrida pedía max(id) de eventos/eventos_municipios/eventoFechas y
+numeraba desde ahí: el mismo evento salía con otro id en cada corrida y los CSV
+no se podían comparar. IdAllocator devuelve siempre el mismo id para la misma
+clave (ver pipeline/keys.py) y solo numera claves nuevas, a partir de un
+contador por tabla que también se guarda.
+
+El contador guardado puede quedar atrás: entre corridas entran filas por
+otras vías (la app, cargas manuales de CSV/SQL, otro scraper). Por eso, antes
+de numerar la primera clave nueva de la corrida se consulta max(id) en vivo
+(`floor_loader`, una ronda concurrente) y se sube el contador con raise_floor;
+una corrida que solo reutiliza ids no hace esa consulta. Las claves no se
+podan: un evento que reaparece recupera su id.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+FORMAT_VERSION = 1
+
+
+class IdAllocator:
+    def __init__(
+        self,
+        path: Optional[Path],
+        tables: Sequence[str],
+        floor_loader: Optional[Callable[[], Dict[str, int]]] = None,
+    ) -> None:
+        self.path = path
+        # Devuelve max(id) en vivo por tabla; se llama una vez, al aparecer la primera clave nueva.
+        self.floor_loader = floor_loader
+        self.floor_synced = floor_loader is None
+        self.ids: Dict[str, Dict[str, int]] = {table: {} for table in tables}
+        self.next_ids: Dict[str, int] = {table: 1 for table in tables}
+        # Asignaciones nuevas de esta corrida, en orden (las reaplica el checkpoint).
+        self.assigned: List[Tuple[str, str, int]] = []
+        self.reused = 0
+        self.loaded = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == FORMAT_VERSION:
+                for table in tables:
+                    self.ids[table] = {str(k): int(v) for k, v in (data.get("ids", {}).get(table) or {}).items()}
+                    self.next_ids[table] = max(1, int((data.get("next") or {}).get(table, 1)))
+                self.loaded = True
+
+    def raise_floor(self, table: str, max_id: int) -> None:
+        self.next_ids[table] = max(self.next_ids[table], max_id + 1)
+
+    def sync_floor(self, max_ids: Optional[Dict[str, int]] = None) -> None:
+        """Sube los contadores a max(id) + 1 (de `max_ids` o de floor_loader); solo la primera vez."""
+        if self.floor_synced:
+            return
+        if max_ids is None and self.floor_loader is not None:
+            max_ids = self.floor_loader()
+        for table, max_id in (max_ids or {}).items():
+            if table in self.next_ids:
+                self.raise_floor(table, max_id)
+        self.floor_synced = True
+
+    def get(self, table: str, key: str) -> int:
+        known = self.ids[table].get(key)
+        if known is not None:
+            self.reused += 1
+            return known
+        if not self.floor_synced:
+            self.sync_floor()
+        new_id = self.next_ids[table]
+        self.next_ids[table] = new_id + 1
+        self.ids[table][key] = new_id
+        self.assigned.append((table, key, new_id))
+        return new_id
+
+    def register(self, table: str, key: str, value: int) -> None:
+        """Reaplica una asignación hecha antes de un corte (checkpoint)."""
+        self.ids[table][key] = value
+        self.next_ids[table] = max(self.next_ids[table], value + 1)
+        self.assigned.append((table, key, value))
+
+    def counters(self) -> Dict[str, int]:
+        return dict(self.next_ids)
+
+    def summary(self) -> str:
+        return f"{self.reused} reutilizados, {len(self.assigned)} nuevos"
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        payload = {"version": FORMAT_VERSION, "next": self.next_ids, "ids": self.ids}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,85 @@
+"""
+Estado persistente para corridas incrementales: hash de contenido + resultado parseado por slug.
+
+El estado se invalida completo si cambia la huella del parser (versión del
+parser + tablas de referencia usadas al parsear), para no reutilizar
+resultados calculados con reglas viejas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+
+ESTADO_NUEVO = "nuevo"
+ESTADO_CAMBIADO = "cambiado"
+ESTADO_ELIMINADO = "eliminado"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+class IncrementalStore:
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.previous: Dict[str, dict] = {}
+        self.current: Dict[str, dict] = {}
+        self.seen: Set[str] = set()
+        self.reused = 0
+        self.parsed = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("fingerprint") == fingerprint:
+                self.previous = dict(data.get("items") or {})
+
+    def mark_seen(self, slug: str) -> None:
+        self.seen.add(slug)
+
+    def lookup(self, slug: str, page_hash: str) -> Optional[dict]:
+        """Devuelve el resultado guardado si el hash no cambió (y lo conserva para la próxima corrida)."""
+        item = self.previous.get(slug)
+        if item and item.get("hash") == page_hash:
+            self.current[slug] = item
+            self.reused += 1
+            return item.get("event")
+        return None
+
+    def put(self, slug: str, url: str, page_hash: str, event: dict) -> None:
+        self.current[slug] = {"hash": page_hash, "url": url, "event": event}
+        self.parsed += 1
+
+    def delta(self) -> List[dict]:
+        rows: List[dict] = []
+        for slug in sorted(self.current):
+            item = self.current[slug]
+            before = self.previous.get(slug)
+            if before is None:
+                rows.append({"slug": slug, "url": item.get("url", ""), "estado": ESTADO_NUEVO})
+            elif before.get("hash") != item.get("hash"):
+                rows.append({"slug": slug, "url": item.get("url", ""), "estado": ESTADO_CAMBIADO})
+        for slug in sorted(set(self.previous) - self.seen):
+            rows.append({"slug": slug, "url": self.previous[slug].get("url", ""), "estado": ESTADO_ELIMINADO})
+        return rows
+
+    def save(self) -> None:
+        # Slugs vistos que fallaron al descargar conservan su estado anterior.
+        items = dict(self.current)
+        for slug in self.seen:
+            if slug not in items and slug in self.previous:
+                items[slug] = self.previous[slug]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"fingerprint": self.fingerprint, "items": items}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
@@ -0,0 +1,316 @@
+"""
+Métricas de ejecución compartidas por los scrapers (latencias, etapas, bytes, reintentos, caches).
+
+Un registro Metrics acumula contadores e histogramas con etiquetas y los
+exporta como JSON o en formato de texto de Prometheus. Los scripts instalan un
+registro con install() solo si se pidió --metrics-out/--metrics-prom; sin
+registro instalado, stage() devuelve un contexto vacío y HttpEngine no mide
+nada, así que el costo desactivado es una comparación con None.
+
+Métricas:
+- http_request_duration_seconds{host}    histograma por request (incluye reintentos)
+- http_requests_total{host,status}       requests terminados (status "error" si no hubo respuesta)
+- http_response_bytes_total{host}        bytes de cuerpo recibidos (ya descomprimidos)
+- http_retries_total{host,reason}        reintentos (red o status 429/5xx)
+- stage_cpu_seconds_total{stage}         CPU del hilo dentro de la etapa
+- stage_wall_seconds_total{stage}        tiempo real dentro de la etapa
+- stage_calls_total{stage}
+- cache_lookups_total{cache,result}      result = hit | miss (+ tasa de aciertos en el JSON)
+- google_calls_total{kind}               llamadas a Google Places (fill_venues_addresses)
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_PREFIX = "findixi_scraper_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_HELP = {
+    "http_request_duration_seconds": "Latencia por request HTTP, incluyendo reintentos.",
+    "http_requests_total": "Requests HTTP terminados por host y status.",
+    "http_response_bytes_total": "Bytes de cuerpo recibidos por host.",
+    "http_retries_total": "Reintentos HTTP por host y motivo.",
+    "stage_cpu_seconds_total": "Tiempo de CPU del hilo por etapa.",
+    "stage_wall_seconds_total": "Tiempo real por etapa.",
+    "stage_calls_total": "Veces que se ejecutó cada etapa.",
+    "cache_lookups_total": "Consultas a caches por resultado (hit/miss).",
+    "google_calls_total": "Llamadas a Google Places por tipo.",
+}
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _json_bound(bound: float) -> object:
+    return "+Inf" if bound == float("inf") else bound
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Cota superior del bucket que contiene el cuantil `q` (inf si cae en el último)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[idx] if idx < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        cumulative = []
+        seen = 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            seen += count
+            cumulative.append([_json_bound(bound), seen])
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50_le": _json_bound(self.quantile(0.5)),
+            "p95_le": _json_bound(self.quantile(0.95)),
+            "buckets": cumulative,
+        }
+
+
+class Metrics:
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.latency_buckets = tuple(latency_buckets)
+        self.started_at = time.time()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    # ---- registro ----
+
+    def inc(self, name: str, amount: float = 1, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.latency_buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: object) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def histogram(self, name: str, **labels: object) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def counter_items(self) -> List[Tuple[str, LabelKey, float]]:
+        """Contadores como tuplas (nombre, etiquetas, valor); se pueden enviar entre procesos."""
+        with self._lock:
+            return [(name, key, value) for name, series in self._counters.items() for key, value in series.items()]
+
+    def merge_counters(self, items: Sequence[Tuple[str, LabelKey, float]]) -> None:
+        """Suma contadores medidos en otro proceso (ver pipeline.parse_pool)."""
+        for name, key, value in items:
+            self.inc(name, value, **dict(key))
+
+    # ---- helpers de dominio ----
+
+    def observe_request(self, host: str, seconds: float, status: object, nbytes: int) -> None:
+        self.observe("http_request_duration_seconds", seconds, host=host)
+        self.inc("http_requests_total", host=host, status=status)
+        if nbytes:
+            self.inc("http_response_bytes_total", nbytes, host=host)
+
+    def record_retry(self, host: str, reason: str) -> None:
+        self.inc("http_retries_total", host=host, reason=reason)
+
+    def record_cache(self, cache: str, hits: int, misses: int) -> None:
+        """Vuelca los contadores que ya lleva cada cache (DiskHttpCache, IncrementalStore, SQLite...)."""
+        if hits:
+            self.inc("cache_lookups_total", hits, cache=cache, result="hit")
+        if misses:
+            self.inc("cache_lookups_total", misses, cache=cache, result="miss")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        cpu0 = time.thread_time()
+        wall0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.inc("stage_cpu_seconds_total", time.thread_time() - cpu0, stage=name)
+            self.inc("stage_wall_seconds_total", time.perf_counter() - wall0, stage=name)
+            self.inc("stage_calls_total", stage=name)
+
+    # ---- exportación ----
+
+    def cache_hit_rates(self) -> Dict[str, float]:
+        totals: Dict[str, List[float]] = {}
+        for key, value in self._counters.get("cache_lookups_total", {}).items():
+            labels = dict(key)
+            pair = totals.setdefault(labels.get("cache", ""), [0.0, 0.0])
+            pair[0 if labels.get("result") == "hit" else 1] += value
+        return {cache: round(h / (h + m), 4) if h + m else 0.0 for cache, (h, m) in sorted(totals.items())}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": round(value, 6)} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [{"labels": dict(key), **hist.to_dict()} for key, hist in sorted(series.items())]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "counters": counters,
+            "histograms": histograms,
+            "cache_hit_rate": self.cache_hit_rates(),
+        }
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = prefix + name
+                lines.append(f"# HELP {full} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full = prefix + name
+                lines.append(f"# HELP {full} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, hist in sorted(series.items()):
+                    seen = 0
+                    for bound, count in zip(list(hist.buckets) + [float("inf")], hist.counts):
+                        seen += count
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        lines.append(f"{full}_bucket{_format_labels(key + (('le', le),))} {seen}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{full}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path) -> None:
+        _atomic_write(path, json.dumps(self.snapshot(), indent=2, ensure_ascii=False))
+
+    def write_prometheus(self, path: Path, prefix: str = PROMETHEUS_PREFIX) -> None:
+        _atomic_write(path, self.to_prometheus(prefix))
+
+    def summary_lines(self) -> List[str]:
+        """Resumen legible: latencia por host, etapas por CPU y tasas de cache."""
+        lines = []
+        for key, hist in sorted(self._histograms.get("http_request_duration_seconds", {}).items()):
+            host = dict(key).get("host", "")
+            mb = self.counter("http_response_bytes_total", host=host) / 1e6
+            retries = sum(v for k, v in self._counters.get("http_retries_total", {}).items() if dict(k).get("host") == host)
+            lines.append(
+                f"{host}: {hist.count} requests, media {hist.sum / max(1, hist.count) * 1000:.0f} ms, "
+                f"p95 ≤ {hist.quantile(0.95) * 1000:.0f} ms, {mb:.1f} MB, {retries:.0f} reintentos"
+            )
+        cpu = self._counters.get("stage_cpu_seconds_total", {})
+        for key, value in sorted(cpu.items(), key=lambda item: -item[1]):
+            stage = dict(key).get("stage", "")
+            lines.append(f"etapa {stage}: CPU {value:.2f} s, real {self.counter('stage_wall_seconds_total', stage=stage):.2f} s")
+        for cache, rate in self.cache_hit_rates().items():
+            lines.append(f"cache {cache}: {rate * 100:.1f}% aciertos")
+        return lines
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in key) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---- Registro activo del proceso ----
+
+_active: Optional[Metrics] = None
+
+
+def install(metrics: Optional[Metrics]) -> Optional[Metrics]:
+    """Activa `metrics` como registro del proceso (None lo desactiva); devuelve el anterior."""
+    global _active
+    previous, _active = _active, metrics
+    return previous
+
+
+def current() -> Optional[Metrics]:
+    return _active
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Cronometra una etapa en el registro activo; sin registro no hace nada."""
+    return _active.stage(name) if _active is not None else nullcontext()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics-out", default="", help="Guardar métricas de la corrida (latencias, etapas, caches) en JSON.")
+    parser.add_argument("--metrics-prom", default="", help="Guardar las mismas métricas en formato de texto de Prometheus.")
+
+
+def install_from_args(args: argparse.Namespace) -> Optional[Metrics]:
+    """Instala un registro nuevo si se pidió alguna salida de métricas."""
+    if not (args.metrics_out or args.metrics_prom):
+        install(None)
+        return None
+    metrics = Metrics()
+    install(metrics)
+    return metrics
+
+
+def export_from_args(metrics: Optional[Metrics], args: argparse.Namespace) -> None:
+    if metrics is None:
+        return
+    if args.metrics_out:
+        metrics.write_json(Path(args.metrics_out))
+    if args.metrics_prom:
+        metrics.write_prometheus(Path(args.metrics_prom))
+    print("\nMétricas:")
+    for line in metrics.summary_lines():
+        print(f"  {line}")
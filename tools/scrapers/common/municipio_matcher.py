@@ -0,0 +1,67 @@
+"""
+Matcher de municipios por tokens sobre texto ya normalizado.
+
+Equivale a probar `f" {nombre_norm} " in f" {texto_norm} "` para cada municipio
+(el texto normalizado tiene un solo espacio entre tokens), pero en una sola
+pasada: se indexan los nombres en un trie de tokens y por cada posición del
+texto se sigue el trie mientras coincida. Gana el municipio con menor índice en
+la lista recibida, que viene ordenada por largo (nombres compuestos primero),
+igual que el recorrido lineal original.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+Municipio = Tuple[int, str, str]
+
+# Clave de fin de nombre dentro de un nodo del trie (split() nunca produce tokens vacíos).
+_END = ""
+
+
+class MunicipioMatcher:
+    def __init__(self, municipios: Sequence[Municipio]) -> None:
+        self.municipios: List[Municipio] = [tuple(m) for m in municipios]  # type: ignore[misc]
+        self._trie: Dict[str, dict] = {}
+        for priority, (_, _, nombre_norm) in enumerate(self.municipios):
+            tokens = nombre_norm.split()
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, priority)
+
+    def __iter__(self) -> Iterator[Municipio]:
+        return iter(self.municipios)
+
+    def __len__(self) -> int:
+        return len(self.municipios)
+
+    def best_priority(self, text_norm: str, first_only: bool = False) -> Optional[int]:
+        tokens = text_norm.split()
+        trie = self._trie
+        best: Optional[int] = None
+        for start in range(len(tokens)):
+            node = trie.get(tokens[start])
+            pos = start + 1
+            while node is not None:
+                priority = node.get(_END)
+                if priority is not None and (best is None or priority < best):
+                    best = priority
+                    if first_only or best == 0:
+                        return best
+                if pos >= len(tokens):
+                    break
+                node = node.get(tokens[pos])
+                pos += 1
+        return best
+
+    def find(self, text_norm: str) -> Optional[Municipio]:
+        """Municipio de mayor prioridad contenido en `text_norm` (texto ya normalizado)."""
+        priority = self.best_priority(text_norm)
+        return self.municipios[priority] if priority is not None else None
+
+    def contains(self, text_norm: str) -> bool:
+        return self.best_priority(text_norm, first_only=True) is not None
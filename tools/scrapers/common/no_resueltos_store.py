@@ -0,0 +1,76 @@
+"""
+Registro de venues no resueltos (exports/venues_no_resueltos.csv) indexado por venue.
+
+Las filas se guardan por su clave completa (todas las columnas), igual que el
+CSV, y además en un índice (nombre_lugar normalizado, municipio_id, fuente) →
+claves, para que limpiar los pendientes de un venue recién resuelto cueste O(1)
+por fila en vez de recorrer todo el registro.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from common.text import clean_spaces, normalize_text
+
+
+VenueKey = Tuple[str, str, str]
+
+
+def venue_key(nombre_lugar: str, municipio_id: str, fuente: str) -> VenueKey:
+    return normalize_text(nombre_lugar), clean_spaces(municipio_id), clean_spaces(fuente).lower()
+
+
+class NoResueltosStore:
+    def __init__(self, headers: Sequence[str]) -> None:
+        self.headers = list(headers)
+        self._rows: Dict[str, dict] = {}
+        self._by_venue: Dict[VenueKey, Dict[str, None]] = {}
+        # Si no es None, registra las operaciones (para el journal de checkpoint).
+        self.ops: Optional[List[list]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, row_key: str) -> bool:
+        return row_key in self._rows
+
+    def rows(self) -> Iterator[dict]:
+        return iter(self._rows.values())
+
+    def row_key(self, row: dict) -> str:
+        return "|".join(row.get(h, "") for h in self.headers)
+
+    def add(self, row: dict) -> str:
+        key = self.row_key(row)
+        self._rows[key] = row
+        vkey = venue_key(row.get("nombre_lugar", ""), row.get("municipio_id", ""), row.get("fuente_scraper", ""))
+        self._by_venue.setdefault(vkey, {})[key] = None
+        if self.ops is not None:
+            self.ops.append(["add", row])
+        return key
+
+    def discard_venue(self, nombre_lugar: str, municipio_id: str, fuente: str) -> List[dict]:
+        """Quita todas las filas del venue/municipio/fuente y las devuelve."""
+        keys = self._by_venue.pop(venue_key(nombre_lugar, municipio_id, fuente), None)
+        if not keys:
+            return []
+        if self.ops is not None:
+            self.ops.append(["discard", nombre_lugar, municipio_id, fuente])
+        return [self._rows.pop(key) for key in keys]
+
+    def drain_ops(self) -> List[list]:
+        """Devuelve y vacía las operaciones registradas desde la última llamada."""
+        if self.ops is None:
+            return []
+        ops = self.ops
+        self.ops = []
+        return ops
+
+    def apply_ops(self, ops: List[list]) -> None:
+        """Reaplica operaciones registradas (add/discard) sobre este registro."""
+        for op in ops:
+            if op[0] == "add":
+                self.add(dict(op[1]))
+            elif op[0] == "discard":
+                self.discard_venue(op[1], op[2], op[3])
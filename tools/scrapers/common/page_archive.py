@@ -0,0 +1,221 @@
+"""
+Archivo append-only de páginas descargadas (gzip por registro + índice JSONL).
+
+Para ver el efecto de un cambio en el parser había que volver a descargar
+todo de la fuente. Con --archive cada página que llega se agrega a shards
+pages-NNNNN.gz (uno o más miembros gzip concatenados, como un .warc.gz: cada
+registro se descomprime solo) y una línea a index.jsonl con
+url, shard, offset, length, sha256 y corrida. Cada corrida deja además en
+runs.jsonl la lista de URLs que descubrió. Con --from-archive el runner toma
+la lista de la última corrida y, para cada URL, el HTML que esa misma corrida
+archivó, sin red. Una URL sin registro en esa corrida (su descarga falló) es
+el error de descarga que fue: no se reemplaza por una página más vieja.
+
+- La lectura mapea cada shard con mmap y descomprime solo el registro pedido;
+  el archivo nunca se carga entero.
+- Una página idéntica a la última archivada para esa URL no se vuelve a
+  escribir: la línea del índice apunta al registro existente.
+- El registro lleva una cabecera JSON (url, fecha) antes del HTML, así el
+  shard se entiende sin el índice.
+- Se escribe primero el registro y después la línea del índice; al abrir se
+  descartan líneas incompletas o que apuntan más allá del final del shard
+  (corte a mitad de escritura).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, TextIO
+
+
+INDEX_NAME = "index.jsonl"
+RUNS_NAME = "runs.jsonl"
+SHARD_PATTERN = "pages-{:05d}.gz"
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    url: str
+    shard: str
+    offset: int
+    length: int
+    sha256: str
+    run: str
+    fetched_at: float
+
+
+class PageArchive:
+    def __init__(self, root: Path, max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES) -> None:
+        self.root = root
+        self.max_shard_bytes = max_shard_bytes
+        self.latest: Dict[str, ArchiveEntry] = {}
+        # URLs descubiertas por la última corrida archivada, en su orden.
+        self.last_run = ""
+        self.last_run_urls: List[str] = []
+        # Entradas archivadas por esa misma corrida (las que lee --from-archive).
+        self.last_run_entries: Dict[str, ArchiveEntry] = {}
+        self.appended = 0
+        self.deduplicated = 0
+        self.read_count = 0
+        self._run = ""
+        self._index: Optional[TextIO] = None
+        self._shard: Optional[BinaryIO] = None
+        self._shard_name = ""
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._files: Dict[str, BinaryIO] = {}
+        self._load_index()
+
+    # ---- índice ----
+
+    def _load_index(self) -> None:
+        runs_path = self.root / RUNS_NAME
+        if runs_path.exists():
+            with runs_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                        self.last_run, self.last_run_urls = str(data["run"]), list(data["urls"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        index_path = self.root / INDEX_NAME
+        if not index_path.exists():
+            return
+        shard_sizes: Dict[str, int] = {}
+        with index_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    entry = ArchiveEntry(**data)
+                except (ValueError, TypeError):
+                    continue
+                if entry.shard not in shard_sizes:
+                    shard_path = self.root / entry.shard
+                    shard_sizes[entry.shard] = shard_path.stat().st_size if shard_path.exists() else 0
+                if entry.offset + entry.length > shard_sizes[entry.shard]:
+                    continue
+                self.latest[entry.url] = entry
+                if entry.run == self.last_run:
+                    self.last_run_entries[entry.url] = entry
+
+    # ---- escritura ----
+
+    def _open_shard(self) -> BinaryIO:
+        if self._shard is not None and self._shard.tell() < self.max_shard_bytes:
+            return self._shard
+        if self._shard is not None:
+            self._shard.close()
+        existing = sorted(self.root.glob("pages-*.gz"))
+        number = int(existing[-1].name[6:11]) if existing else 0
+        if existing and existing[-1].stat().st_size >= self.max_shard_bytes:
+            number += 1
+        self._shard_name = SHARD_PATTERN.format(number)
+        self._shard = (self.root / self._shard_name).open("ab")
+        return self._shard
+
+    def begin_run(self, urls: List[str]) -> str:
+        """Abre el archivo para escribir y registra las URLs descubiertas por esta corrida."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._run = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        with (self.root / RUNS_NAME).open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"run": self._run, "started_at": time.time(), "urls": urls}, ensure_ascii=False) + "\n")
+        self.last_run, self.last_run_urls = self._run, list(urls)
+        self.last_run_entries = {}
+        self._index = (self.root / INDEX_NAME).open("a", encoding="utf-8")
+        return self._run
+
+    def append(self, url: str, text: str) -> ArchiveEntry:
+        if self._index is None:
+            raise RuntimeError("PageArchive.append sin begin_run")
+        body = text.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        previous = self.latest.get(url)
+        if previous is not None and previous.sha256 == digest:
+            entry = ArchiveEntry(url, previous.shard, previous.offset, previous.length, digest, self._run, now)
+            self.deduplicated += 1
+        else:
+            shard = self._open_shard()
+            header = json.dumps({"url": url, "fetched_at": now}, ensure_ascii=False).encode("utf-8")
+            record = gzip.compress(header + b"\n" + body, compresslevel=COMPRESS_LEVEL, mtime=0)
+            offset = shard.tell()
+            shard.write(record)
+            shard.flush()
+            entry = ArchiveEntry(url, self._shard_name, offset, len(record), digest, self._run, now)
+            self.appended += 1
+        self._index.write(json.dumps(entry.__dict__, ensure_ascii=False) + "\n")
+        self._index.flush()
+        self.latest[url] = entry
+        self.last_run_entries[url] = entry
+        return entry
+
+    # ---- lectura ----
+
+    def _map(self, shard: str, end: int) -> mmap.mmap:
+        mapped = self._maps.get(shard)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            f = self._files.get(shard)
+            if f is None:
+                f = self._files[shard] = (self.root / shard).open("rb")
+            mapped = self._maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def read_text(self, url: str) -> str:
+        """Última página archivada para `url`, de cualquier corrida."""
+        entry = self.latest.get(url)
+        if entry is None:
+            raise KeyError(f"{url} no está en el archivo {self.root}")
+        return self._read_entry(entry)
+
+    def read_last_run(self, url: str) -> str:
+        """Página que archivó la última corrida para `url`; LookupError si esa corrida no la descargó."""
+        entry = self.last_run_entries.get(url)
+        if entry is None:
+            raise LookupError(f"{url} no se archivó en la corrida {self.last_run} (falló su descarga)")
+        return self._read_entry(entry)
+
+    def _read_entry(self, entry: ArchiveEntry) -> str:
+        if self._shard is not None:
+            self._shard.flush()
+        mapped = self._map(entry.shard, entry.offset + entry.length)
+        data = gzip.decompress(mapped[entry.offset : entry.offset + entry.length])
+        self.read_count += 1
+        return data[data.index(b"\n") + 1 :].decode("utf-8")
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.latest
+
+    # ---- cierre ----
+
+    def close(self) -> None:
+        for handle in (self._shard, self._index):
+            if handle is not None:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+        self._shard = None
+        self._index = None
+        for mapped in self._maps.values():
+            mapped.close()
+        for f in self._files.values():
+            f.close()
+        self._maps.clear()
+        self._files.clear()
+
+    def summary(self) -> str:
+        shards = sorted(self.root.glob("pages-*.gz")) if self.root.exists() else []
+        size_mb = sum(p.stat().st_size for p in shards) / 1e6
+        return (
+            f"{self.appended} páginas nuevas, {self.deduplicated} sin cambios, {self.read_count} leídas; "
+            f"{len(self.latest)} URLs en {len(shards)} shards ({size_mb:.1f} MB)"
+        )
@@ -0,0 +1,167 @@
+"""
+Cliente mínimo de PostgREST (Supabase) sobre el HttpEngine compartido.
+
+- aselect / select: GET /rest/v1/<tabla>?<query>.
+- aselect_in / select_in: GET por lotes con el filtro col=in.(...) (va en la URL).
+- aupsert: POST por lotes (chunk_size filas) con `on_conflict` sobre una clave
+  natural única y `Prefer: resolution=merge-duplicates` (o ignore-duplicates).
+  Los lotes de una misma tabla salen concurrentes (el HostPolicy del motor los
+  limita) y devuelven las columnas de `returning` para resolver ids remotos.
+
+Como el upsert es idempotente, reintentar un lote no duplica filas: aupsert
+le pide al motor que reintente el POST (retry=True) ante 5xx y errores de red.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import urllib.parse
+from typing import Dict, List, Optional, Sequence
+
+from common.http_engine import HttpEngine
+
+
+DEFAULT_CHUNK_SIZE = 500
+# Valores por GET en select_in: el filtro in.(...) va en la URL.
+DEFAULT_IN_CHUNK_SIZE = 100
+
+
+def _chunks(rows: Sequence, size: int) -> List[Sequence]:
+    size = max(1, size)
+    return [rows[i : i + size] for i in range(0, len(rows), size)]
+
+
+class PostgrestClient:
+    def __init__(self, http: HttpEngine, url: str, key: str) -> None:
+        self.http = http
+        self.url = url.rstrip("/")
+        self.headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Accept": "application/json",
+        }
+
+    def endpoint(self, table: str, query: str = "") -> str:
+        base = f"{self.url}/rest/v1/{urllib.parse.quote(table)}"
+        return f"{base}?{query}" if query else base
+
+    async def aselect(self, table: str, query: str) -> List[dict]:
+        response = await self.http.arequest("GET", self.endpoint(table, query), headers=self.headers)
+        rows = response.json(default=[])
+        return rows if isinstance(rows, list) else []
+
+    def select(self, table: str, query: str) -> List[dict]:
+        return self.http.submit(self.aselect(table, query)).result()
+
+    async def aselect_in(
+        self,
+        table: str,
+        columns: str,
+        column: str,
+        values: Sequence[object],
+        extra: str = "",
+        chunk_size: int = DEFAULT_IN_CHUNK_SIZE,
+    ) -> List[dict]:
+        """Filas de `table` con `column` en `values` (lotes concurrentes); `extra` agrega filtros a cada GET."""
+        values = list(dict.fromkeys(values))
+        if not values:
+            return []
+        queries = []
+        for chunk in _chunks(values, chunk_size):
+            # Entre comillas dobles: las URLs y los nombres pueden traer comas o paréntesis.
+            quoted = ",".join('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in chunk)
+            query = urllib.parse.urlencode({"select": columns, column: f"in.({quoted})"}, safe=",()")
+            queries.append(f"{query}&{extra}" if extra else query)
+        results = await asyncio.gather(*(self.aselect(table, query) for query in queries))
+        return [row for rows in results for row in rows]
+
+    def select_in(
+        self,
+        table: str,
+        columns: str,
+        column: str,
+        values: Sequence[object],
+        extra: str = "",
+        chunk_size: int = DEFAULT_IN_CHUNK_SIZE,
+    ) -> List[dict]:
+        return self.http.submit(self.aselect_in(table, columns, column, values, extra, chunk_size)).result()
+
+    async def _apost_chunk(
+        self,
+        table: str,
+        rows: Sequence[dict],
+        on_conflict: str,
+        returning: str,
+        ignore_duplicates: bool,
+    ) -> List[dict]:
+        params = {"on_conflict": on_conflict}
+        prefer = ["resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates"]
+        if returning:
+            params["select"] = returning
+            prefer.append("return=representation")
+        else:
+            prefer.append("return=minimal")
+        headers = dict(self.headers)
+        headers["Content-Type"] = "application/json"
+        headers["Prefer"] = ",".join(prefer)
+        body = json.dumps(list(rows), ensure_ascii=False).encode("utf-8")
+        response = await self.http.arequest(
+            "POST",
+            self.endpoint(table, urllib.parse.urlencode(params, safe=",")),
+            headers=headers,
+            body=body,
+            retry=True,
+        )
+        result = response.json(default=[]) if returning else []
+        return result if isinstance(result, list) else []
+
+    async def aupsert(
+        self,
+        table: str,
+        rows: Sequence[dict],
+        on_conflict: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        returning: str = "",
+        ignore_duplicates: bool = False,
+    ) -> List[dict]:
+        """Upsert por lotes; devuelve las filas `returning` de todos los lotes (vacío si no se pidió)."""
+        if not rows:
+            return []
+        # Se espera a todos los lotes antes de fallar: ninguno queda en vuelo si el llamador cierra el motor.
+        results = await asyncio.gather(
+            *(
+                self._apost_chunk(table, chunk, on_conflict, returning, ignore_duplicates)
+                for chunk in _chunks(rows, chunk_size)
+            ),
+            return_exceptions=True,
+        )
+        for chunk_rows in results:
+            if isinstance(chunk_rows, BaseException):
+                raise chunk_rows
+        return [row for chunk_rows in results for row in chunk_rows]
+
+    def upsert(
+        self,
+        table: str,
+        rows: Sequence[dict],
+        on_conflict: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        returning: str = "",
+        ignore_duplicates: bool = False,
+    ) -> List[dict]:
+        return self.http.submit(
+            self.aupsert(table, rows, on_conflict, chunk_size, returning, ignore_duplicates)
+        ).result()
+
+
+def postgrest_error_detail(exc: Exception) -> Optional[Dict[str, object]]:
+    """Cuerpo JSON de error de PostgREST ({code, message, details, hint}) si lo hay."""
+    body = getattr(exc, "body", b"")
+    if not body:
+        return None
+    try:
+        detail = json.loads(body.decode("utf-8", errors="replace"))
+    except ValueError:
+        return None
+    return detail if isinstance(detail, dict) else None
@@ -0,0 +1,192 @@
+"""
+Tablas de referencia de Supabase (Municipios, categoriaEventos, max id) con snapshot local.
+
+Ambos scrapers arrancaban con varios GET secuenciales a PostgREST (y el
+enriquecedor volvía a pedir Municipios). ReferenceData los pide todos a la vez
+en una sola ronda (asyncio.gather sobre el HttpEngine) y guarda las tablas en
+exports/supabase_reference.json con la hora de descarga: mientras el snapshot
+no venza (TTL, 24 h por defecto) las tablas salen del disco. Los max id no se
+guardan: cambian con cada carga, así que siempre se piden en vivo, en la misma
+ronda que las tablas vencidas.
+
+Si Supabase falla y hay snapshot (aunque esté vencido) se usa con un aviso.
+Sin url (re-corridas offline, --from-archive sin credenciales) solo se lee
+el snapshot, sea del proyecto que sea; si le falta una tabla, SnapshotMissing.
+Tras escribir en una tabla de referencia (categorías nuevas de --push) hay que
+descartarla con forget(): si no, la próxima corrida dentro del TTL las vería
+como nuevas otra vez.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from common.http_engine import HttpEngine
+from common.postgrest import PostgrestClient
+
+
+SNAPSHOT_NAME = "supabase_reference.json"
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+# (tabla, query PostgREST) tal como las piden los scrapers.
+MUNICIPIOS = ("Municipios", "select=id,nombre&order=nombre.asc")
+CATEGORIAS = ("categoriaEventos", "select=id,nombre,icono&order=id.asc")
+MAX_ID_QUERY = "select=id&order=id.desc&limit=1"
+
+
+class SnapshotMissing(LookupError):
+    """Sin url de Supabase y el snapshot no tiene lo pedido."""
+
+
+@dataclass
+class ReferenceResult:
+    tables: Dict[str, List[dict]] = field(default_factory=dict)
+    max_ids: Dict[str, int] = field(default_factory=dict)
+    from_snapshot: List[str] = field(default_factory=list)
+    fetched: List[str] = field(default_factory=list)
+    stale: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        parts = []
+        if self.from_snapshot:
+            parts.append(f"snapshot: {', '.join(self.from_snapshot)}")
+        if self.fetched:
+            parts.append(f"Supabase: {', '.join(self.fetched)}")
+        if self.stale:
+            parts.append(f"snapshot vencido (Supabase falló): {', '.join(self.stale)}")
+        if self.max_ids:
+            parts.append(f"max id en vivo: {', '.join(self.max_ids)}")
+        return "; ".join(parts) or "sin tablas"
+
+
+def _safe_int(value: Any) -> int:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+
+
+class ReferenceData:
+    def __init__(
+        self,
+        http: HttpEngine,
+        url: str,
+        key: str,
+        snapshot_path: Optional[Path] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        refresh: bool = False,
+    ) -> None:
+        self.http = http
+        self.rest = PostgrestClient(http, url, key)
+        self.url = self.rest.url
+        self.snapshot_path = snapshot_path
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+
+    # ---- snapshot en disco ----
+
+    def _read_snapshot(self) -> Dict[str, dict]:
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return {}
+        try:
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or (self.url and data.get("url") != self.url):
+            return {}
+        tables = data.get("tables")
+        return tables if isinstance(tables, dict) else {}
+
+    def _write_snapshot(self, tables: Dict[str, dict]) -> None:
+        if self.snapshot_path is None:
+            return
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_suffix(self.snapshot_path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"url": self.url, "tables": tables}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.snapshot_path)
+
+    def forget(self, *tables: str) -> None:
+        """Descarta esas tablas del snapshot: la próxima carga las pide a Supabase."""
+        snapshot = self._read_snapshot()
+        removed = [table for table in tables if snapshot.pop(table, None) is not None]
+        if removed:
+            self._write_snapshot(snapshot)
+
+    def _is_fresh(self, entry: Optional[dict], query: str, now: float) -> bool:
+        if self.refresh or not entry or entry.get("query") != query:
+            return False
+        return now - float(entry.get("fetched_at", 0)) < self.ttl_seconds
+
+    # ---- carga ----
+
+    async def _afetch(self, requests: List[Tuple[str, str]]) -> List[Any]:
+        return await asyncio.gather(
+            *(self.rest.aselect(table, query) for table, query in requests), return_exceptions=True
+        )
+
+    def load(
+        self,
+        tables: Sequence[Tuple[str, str]] = (MUNICIPIOS, CATEGORIAS),
+        max_id_tables: Sequence[str] = (),
+    ) -> ReferenceResult:
+        """Tablas (del snapshot si está vigente) + max id en vivo, en una sola ronda concurrente."""
+        now = time.time()
+        snapshot = self._read_snapshot()
+        result = ReferenceResult()
+        requests: List[Tuple[str, str]] = []
+        for table, query in tables:
+            entry = snapshot.get(table)
+            if self._is_fresh(entry, query, now):
+                result.tables[table] = list(entry["rows"])
+                result.from_snapshot.append(table)
+            else:
+                requests.append((table, query))
+        requests.extend((table, MAX_ID_QUERY) for table in max_id_tables)
+        if requests and not self.url:
+            missing = ", ".join(dict.fromkeys(table for table, _ in requests))
+            raise SnapshotMissing(f"sin url de Supabase y {self.snapshot_path} no tiene: {missing}")
+
+        responses = self.http.submit(self._afetch(requests)).result() if requests else []
+        changed = False
+        for (table, query), rows in zip(requests, responses):
+            if query == MAX_ID_QUERY:
+                if isinstance(rows, BaseException):
+                    raise rows
+                result.max_ids[table] = _safe_int(rows[0].get("id", 0)) if rows else 0
+                continue
+            if isinstance(rows, BaseException):
+                entry = snapshot.get(table)
+                if not entry or entry.get("query") != query:
+                    raise rows
+                print(f"[WARN] Supabase {table}: {rows}; usando snapshot del {time.ctime(float(entry.get('fetched_at', 0)))}.")
+                result.tables[table] = list(entry["rows"])
+                result.stale.append(table)
+                continue
+            result.tables[table] = rows
+            result.fetched.append(table)
+            snapshot[table] = {"query": query, "fetched_at": now, "rows": rows}
+            changed = True
+        if changed:
+            self._write_snapshot(snapshot)
+        return result
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--reference-ttl-hours",
+        type=float,
+        default=DEFAULT_TTL_SECONDS / 3600,
+        help=f"Horas de vigencia del snapshot local de Municipios/categorías (exports/{SNAPSHOT_NAME}).",
+    )
+    parser.add_argument(
+        "--refresh-reference",
+        action="store_true",
+        help="Ignorar el snapshot local y volver a pedir las tablas de referencia a Supabase.",
+    )
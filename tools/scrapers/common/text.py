@@ -0,0 +1,65 @@
+"""
+Normalización de texto compartida por los scrapers, con memoización LRU.
+
+normalize_text se llama muchas veces sobre los mismos strings (venues,
+municipios, categorías, claves de cache), así que el resultado se memoiza en un
+lru_cache acotado. Hay dos variantes históricas: PRticket conserva "/" (fechas
+d/m/y) y el enriquecedor de direcciones no; ambas comparten cache y se
+distinguen por `keep_slash`.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+NORMALIZE_CACHE_SIZE = 65536
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]+")
+_NON_ALNUM_SLASH_RE = re.compile(r"[^a-z0-9\s/]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(value: str, keep_slash: bool) -> str:
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    value = value.lower().strip()
+    value = (_NON_ALNUM_SLASH_RE if keep_slash else _NON_ALNUM_RE).sub(" ", value)
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def normalize_text(value: Optional[str], keep_slash: bool = False) -> str:
+    """Minúsculas sin acentos, solo [a-z0-9] (y "/" si keep_slash) separados por un espacio."""
+    return _normalize(value or "", keep_slash)
+
+
+def clean_spaces(value: Optional[str]) -> str:
+    return _WHITESPACE_RE.sub(" ", value or "").strip()
+
+
+def normalize_cache_stats() -> Dict[str, float]:
+    info = _normalize.cache_info()
+    total = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize or 0,
+        "hit_rate": round(info.hits / total, 4) if total else 0.0,
+    }
+
+
+def normalize_cache_summary() -> str:
+    stats = normalize_cache_stats()
+    return (
+        f"hits {stats['hits']}, misses {stats['misses']}, "
+        f"tasa {stats['hit_rate'] * 100:.1f}%, entradas {stats['size']}/{stats['maxsize']}"
+    )
+
+
+def normalize_cache_clear() -> None:
+    _normalize.cache_clear()
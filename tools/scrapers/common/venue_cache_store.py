@@ -0,0 +1,205 @@
+"""
+Cache global de direcciones de venues en SQLite (stdlib sqlite3, modo WAL).
+
+Reemplaza la lectura/reescritura completa de exports/event_venues_cache.csv:
+cada resolución se guarda con un upsert propio (una fila, una transacción), así
+que una corrida interrumpida no pierde lo ya resuelto, y varios scrapers pueden
+usar el mismo archivo a la vez (WAL + busy_timeout). El CSV se mantiene como
+formato de intercambio: import_csv/export_csv.
+
+La tabla venue_negative_cache guarda los venues que no se pudieron resolver
+(motivo, clase de fallo, intentos y hasta cuándo no reintentar); la política de
+TTL/backoff la decide quien escribe.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from common.text import clean_spaces
+
+
+CACHE_HEADERS = [
+    "key",
+    "nombre_lugar",
+    "municipio_id",
+    "direccion",
+    "place_id",
+    "latitud",
+    "longitud",
+    "fuente",
+    "updated_at",
+]
+
+DEFAULT_BUSY_TIMEOUT_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS venue_cache (
+    key TEXT PRIMARY KEY,
+    nombre_lugar TEXT NOT NULL DEFAULT '',
+    municipio_id TEXT NOT NULL DEFAULT '',
+    direccion TEXT NOT NULL DEFAULT '',
+    place_id TEXT NOT NULL DEFAULT '',
+    latitud TEXT NOT NULL DEFAULT '',
+    longitud TEXT NOT NULL DEFAULT '',
+    fuente TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS venue_cache_place_id ON venue_cache (place_id);
+CREATE INDEX IF NOT EXISTS venue_cache_municipio_id ON venue_cache (municipio_id);
+CREATE TABLE IF NOT EXISTS venue_negative_cache (
+    key TEXT PRIMARY KEY,
+    nombre_lugar TEXT NOT NULL DEFAULT '',
+    municipio_id TEXT NOT NULL DEFAULT '',
+    motivo TEXT NOT NULL DEFAULT '',
+    clase TEXT NOT NULL DEFAULT '',
+    intentos INTEGER NOT NULL DEFAULT 1,
+    first_failed_at REAL NOT NULL DEFAULT 0,
+    last_failed_at REAL NOT NULL DEFAULT 0,
+    retry_after REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS venue_negative_cache_retry_after ON venue_negative_cache (retry_after);
+"""
+
+NEGATIVE_HEADERS = [
+    "key",
+    "nombre_lugar",
+    "municipio_id",
+    "motivo",
+    "clase",
+    "intentos",
+    "first_failed_at",
+    "last_failed_at",
+    "retry_after",
+]
+
+_UPSERT = "INSERT INTO venue_cache ({cols}) VALUES ({marks}) ON CONFLICT(key) DO UPDATE SET {updates}".format(
+    cols=", ".join(CACHE_HEADERS),
+    marks=", ".join("?" for _ in CACHE_HEADERS),
+    updates=", ".join(f"{h} = excluded.{h}" for h in CACHE_HEADERS if h != "key"),
+)
+
+
+class VenueCacheStore:
+    def __init__(self, path: Path, busy_timeout: float = DEFAULT_BUSY_TIMEOUT_SECONDS) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: cada upsert es su propia transacción (autocommit).
+        # check_same_thread=False: el resolver también escribe desde el hilo del motor HTTP
+        # (nunca a la vez que el hilo principal, que espera bloqueado).
+        self.conn = sqlite3.connect(str(path), timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self.conn.executescript(_SCHEMA)
+        self.writes = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "VenueCacheStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM venue_cache").fetchone()[0])
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM venue_cache WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM venue_cache WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def by_place_id(self, place_id: str) -> Iterator[dict]:
+        for row in self.conn.execute("SELECT * FROM venue_cache WHERE place_id = ? ORDER BY key", (place_id,)):
+            yield dict(row)
+
+    def by_municipio(self, municipio_id: str) -> Iterator[dict]:
+        for row in self.conn.execute("SELECT * FROM venue_cache WHERE municipio_id = ? ORDER BY key", (municipio_id,)):
+            yield dict(row)
+
+    def rows(self) -> Iterator[dict]:
+        for row in self.conn.execute("SELECT * FROM venue_cache ORDER BY key"):
+            yield dict(row)
+
+    @staticmethod
+    def _values(row: Dict[str, str]) -> tuple:
+        return tuple(clean_spaces(str(row.get(h, "") or "")) for h in CACHE_HEADERS)
+
+    def upsert(self, row: Dict[str, str]) -> None:
+        self.conn.execute(_UPSERT, self._values(row))
+        self.writes += 1
+
+    def upsert_many(self, rows: Iterable[Dict[str, str]]) -> int:
+        """Upsert en una sola transacción (importaciones)."""
+        values = [self._values(row) for row in rows if clean_spaces(row.get("key", ""))]
+        if not values:
+            return 0
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(_UPSERT, values)
+        self.writes += len(values)
+        return len(values)
+
+    # ---- Cache negativo ----
+
+    def get_negative(self, key: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM venue_negative_cache WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def active_negative(self, key: str, now: Optional[float] = None) -> Optional[dict]:
+        """Entrada negativa vigente (retry_after en el futuro) o None."""
+        entry = self.get_negative(key)
+        if entry is None or float(entry["retry_after"]) <= (time.time() if now is None else now):
+            return None
+        return entry
+
+    def put_negative(self, entry: Dict[str, object]) -> None:
+        values = tuple(entry.get(h, "") for h in NEGATIVE_HEADERS)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO venue_negative_cache ({cols}) VALUES ({marks})".format(
+                cols=", ".join(NEGATIVE_HEADERS), marks=", ".join("?" for _ in NEGATIVE_HEADERS)
+            ),
+            values,
+        )
+
+    def clear_negative(self, key: str) -> bool:
+        return self.conn.execute("DELETE FROM venue_negative_cache WHERE key = ?", (key,)).rowcount > 0
+
+    def count_negatives(self, active_only: bool = False) -> int:
+        if active_only:
+            query, params = "SELECT COUNT(*) FROM venue_negative_cache WHERE retry_after > ?", (time.time(),)
+        else:
+            query, params = "SELECT COUNT(*) FROM venue_negative_cache", ()
+        return int(self.conn.execute(query, params).fetchone()[0])
+
+    # ---- CSV ----
+
+    def import_csv(self, csv_path: Path) -> int:
+        if not csv_path.exists():
+            return 0
+        with csv_path.open("r", encoding="utf-8", newline="") as f:
+            return self.upsert_many(csv.DictReader(f))
+
+    def export_csv(self, csv_path: Path) -> int:
+        """Escribe el cache completo (ordenado por key) con el esquema del CSV histórico."""
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = csv_path.with_suffix(csv_path.suffix + ".tmp")
+        count = 0
+        with tmp.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CACHE_HEADERS)
+            writer.writeheader()
+            for row in self.rows():
+                writer.writerow(row)
+                count += 1
+        os.replace(tmp, csv_path)
+        return count
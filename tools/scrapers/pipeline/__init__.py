@@ -0,0 +1 @@
+"""Pipeline compartido de los scrapers de eventos (fuentes, etapas comunes y runner)."""
@@ -0,0 +1,37 @@
+"""
+Claves naturales de las filas exportadas.
+
+Las usan el IdAllocator (ids estables entre corridas) y --push (columna
+clave_origen en Supabase):
+
+  eventos             <fuente>:<slug>
+  eventos_municipios  <fuente>:<slug>:<hash de municipio_id + lugar + dirección>
+  eventoFechas        <clave del venue>:<fecha>T<hora>
+  categoriaEventos    <nombre normalizado> (solo --push; las categorías no dependen de la fuente)
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from common.text import normalize_text
+
+
+def event_key(event_url: str, source: str) -> str:
+    return f"{source}:{event_url.rstrip('/').split('/')[-1]}"
+
+
+def venue_key(evento_key: str, municipio_id: object, lugar: str, direccion: str) -> str:
+    # Mismos campos que deduplican venues por evento en append_event_rows.
+    parts = (str(municipio_id), normalize_text(lugar), normalize_text(direccion))
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+    return f"{evento_key}:{digest}"
+
+
+def fecha_key(venue_clave: str, fecha: str, horainicio: str) -> str:
+    return f"{venue_clave}:{fecha}T{horainicio}"
+
+
+def category_key(nombre: str) -> str:
+    # Misma normalización con la que map_category_id compara categorías.
+    return normalize_text(nombre)
@@ -0,0 +1,98 @@
+"""
+Evento extraído de una página y filas de exportación, comunes a todas las fuentes.
+
+En backfills de varios meses y fuentes se acumulan cientos de miles de filas:
+Venue/EventScraped y cada fila de salida son NamedTuple (sin dict por
+instancia; las filas llevan las columnas del CSV en orden). write_rows
+(pipeline.stages) las escribe tal cual con csv.writer y el checkpoint las
+guarda como listas. No hay un escritor por columnas: cada fila ya es una
+tupla en el orden del CSV y csv.writer.writerows la toma sin copiar;
+bench/bench_memory.py lo compara con el DictWriter de antes. NamedTuple y
+no dataclass(slots=True): los scrapers siguen corriendo con Python 3.8/3.9.
+"""
+
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+
+class Venue(NamedTuple):
+    municipio_id: Optional[int]
+    municipio_nombre: str
+    lugar: str
+    direccion: str
+
+
+class EventScraped(NamedTuple):
+    url: str
+    slug: str
+    nombre: str
+    descripcion: str
+    costo: str
+    categoria_raw: str
+    imagen: str
+    datetimes: List[Tuple[str, str]]
+    venues: List[Venue]
+    motivo_no_exportable: Optional[str] = None
+
+
+def event_to_dict(event: EventScraped) -> dict:
+    data = event._asdict()
+    data["venues"] = [venue._asdict() for venue in event.venues]
+    return data
+
+
+def event_from_dict(data: dict) -> EventScraped:
+    return EventScraped(
+        url=data["url"],
+        slug=data["slug"],
+        nombre=data["nombre"],
+        descripcion=data["descripcion"],
+        costo=data["costo"],
+        categoria_raw=data["categoria_raw"],
+        imagen=data["imagen"],
+        datetimes=[(fecha, hora) for fecha, hora in data.get("datetimes") or []],
+        venues=[Venue(**venue) for venue in data.get("venues") or []],
+        motivo_no_exportable=data.get("motivo_no_exportable"),
+    )
+
+
+class EventoRow(NamedTuple):
+    id: int
+    nombre: str
+    descripcion: str
+    costo: str
+    gratis: str
+    lugar: str
+    direccion: str
+    municipio_id: Union[int, str]
+    categoria: int
+    enlaceboletos: str
+    boletos_por_localidad: str
+    imagen: str
+    activo: str
+
+
+class EventoMunicipioRow(NamedTuple):
+    id: int
+    event_id: int
+    municipio_id: int
+    lugar: str
+    direccion: str
+    enlaceboletos: str
+
+
+class EventoFechaRow(NamedTuple):
+    id: int
+    evento_municipio_id: int
+    fecha: str
+    horainicio: str
+    mismahora: str
+
+
+class NoDatedRow(NamedTuple):
+    url: str
+    nombre: str
+    categoria_raw: str
+    motivo: str
+    descripcion_preview: str
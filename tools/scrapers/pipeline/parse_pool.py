@@ -0,0 +1,102 @@
+"""
+Parseo de páginas en procesos aparte (--parse-workers N).
+
+La descarga corre en el loop del HttpEngine, pero el parseo (regex del
+scanner, html_to_text, normalize_text e infer_venues) es CPU puro y se hacía
+en el hilo principal: con muchas páginas (backfill de archivos) no pasaba de
+un núcleo. ParsePool reparte las páginas ya descargadas en un
+ProcessPoolExecutor; iter_scraped_events pone entre la descarga y el pool una
+cola acotada (queue_size páginas), así la descarga se frena en vez de
+acumular HTML cuando el parseo va más lento.
+
+La tabla de municipios viaja una sola vez por worker (initializer) y cada
+worker arma ahí su MunicipioMatcher; cada tarea lleva solo (fuente, url, html)
+y devuelve el EventScraped. Las fuentes se cargan en el worker con
+get_source(nombre), así que tienen que ser importables (<nombre>/source.py).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from common import metrics
+from common.municipio_matcher import MunicipioMatcher
+from pipeline.models import EventScraped
+from pipeline.source import Source, get_source
+
+SCRAPERS_DIR = Path(__file__).resolve().parents[1]
+# Páginas descargadas por worker que pueden esperar parseo antes de frenar la descarga.
+DEFAULT_QUEUE_PER_WORKER = 4
+
+_worker_municipios: Optional[MunicipioMatcher] = None
+_worker_collect_metrics = False
+
+
+def _init_worker(scrapers_dir: str, municipios_rows: List[dict], collect_metrics: bool) -> None:
+    global _worker_municipios, _worker_collect_metrics
+    if scrapers_dir not in sys.path:
+        sys.path.insert(0, scrapers_dir)
+    from pipeline.stages import build_municipios  # pipeline.stages importa este módulo
+
+    _worker_municipios = build_municipios(municipios_rows)
+    _worker_collect_metrics = collect_metrics
+
+
+def _parse_page(source_name: str, event_url: str, page_html: str) -> Tuple[EventScraped, list]:
+    source = get_source(source_name)
+    if not _worker_collect_metrics:
+        return source.parse(event_url, page_html, _worker_municipios), []
+    # Etapas (scan, extract, dates, infer_venues) medidas en el worker; el padre las suma a su registro.
+    registry = metrics.Metrics()
+    metrics.install(registry)
+    try:
+        scraped = source.parse(event_url, page_html, _worker_municipios)
+    finally:
+        metrics.install(None)
+    return scraped, registry.counter_items()
+
+
+class ParsePool:
+    def __init__(self, workers: int, municipios_rows: Sequence[dict], queue_size: int = 0) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = queue_size if queue_size > 0 else self.workers * DEFAULT_QUEUE_PER_WORKER
+        self.submitted = 0
+        # spawn y no fork: el proceso padre ya tiene corriendo el hilo del HttpEngine.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(SCRAPERS_DIR), list(municipios_rows), metrics.current() is not None),
+        )
+
+    def submit(self, source: Source, event_url: str, page_html: str) -> "Future[EventScraped]":
+        self.submitted += 1
+        outer: Future = Future()
+        inner = self._executor.submit(_parse_page, source.name, event_url, page_html)
+
+        def done(task: Future) -> None:
+            try:
+                scraped, counters = task.result()
+            except BaseException as exc:
+                outer.set_exception(exc)
+                return
+            registry = metrics.current()
+            if registry is not None and counters:
+                registry.merge_counters(counters)
+            outer.set_result(scraped)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
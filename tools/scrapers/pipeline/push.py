@@ -0,0 +1,249 @@
+"""
+Carga directa (--push) de las filas exportadas a Supabase vía PostgREST.
+
+Los ids de los CSV salen de un mapa local (.id_map.json), que choca con el de
+otro scraper que corra a la vez. Aquí no se envían esos ids: cada fila lleva una
+clave natural en `clave_origen` (índice único, ver la migración
+*_eventos_clave_origen.sql; claves en pipeline/keys.py) y se hace upsert por
+esa clave.
+
+El orden respeta las foreign keys: categoriaEventos nuevas → eventos →
+eventos_municipios → eventoFechas. Cada upsert devuelve `id,clave_origen` y
+con eso se reescriben event_id / evento_municipio_id de la tabla siguiente.
+Volver a correr el push (o reintentar un lote) actualiza las mismas filas.
+
+Las filas que ya estaban en Supabase antes de clave_origen (cargadas desde los
+CSV) tienen la clave en null y no chocan con el índice: cada tabla las busca
+antes del upsert (eventos por enlaceboletos, venues por event_id, fechas por
+evento_municipio_id), calcula su clave con los mismos campos y las adopta
+(upsert por id que completa clave_origen) en vez de insertar un duplicado.
+Si ya hay una fila con esa clave, la de null no se toca.
+
+Las categorías nuevas tampoco llevan su id local (max+1 del snapshot, el mismo
+que calcula otro scraper a la vez): push_categories las busca por nombre
+normalizado entre las de Supabase y hace upsert por esa clave de las que
+faltan; `categoria` de cada evento se reescribe con el id remoto.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from common import metrics
+from common.postgrest import DEFAULT_CHUNK_SIZE, PostgrestClient, postgrest_error_detail
+from pipeline.keys import category_key, event_key, fecha_key, venue_key
+from pipeline.models import EventoFechaRow, EventoMunicipioRow, EventoRow
+
+
+KEY_COLUMN = "clave_origen"
+CATEGORIAS_TABLE = "categoriaEventos"
+BOOL_STRINGS = {"true": True, "false": False}
+
+
+@dataclass
+class PushResult:
+    rows: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return ", ".join(f"{table}: {count}" for table, count in self.rows.items()) or "sin filas"
+
+
+def _payload(row: NamedTuple, clave: str, **overrides: object) -> dict:
+    """Fila CSV → JSON de PostgREST: sin id local, 'true'/'false' → bool, '' → null."""
+    payload: Dict[str, object] = {}
+    for column, value in zip(row._fields, row):
+        if column == "id":
+            continue
+        if isinstance(value, str):
+            value = BOOL_STRINGS.get(value, value) if value else None
+        payload[column] = value
+    payload.update(overrides)
+    payload[KEY_COLUMN] = clave
+    return payload
+
+
+def _dedupe(payloads: List[dict]) -> List[dict]:
+    # Un mismo lote no puede tocar dos veces la misma clave (ON CONFLICT DO UPDATE falla); gana la última.
+    by_key = {payload[KEY_COLUMN]: payload for payload in payloads}
+    return list(by_key.values())
+
+
+def _remote_ids(client: PostgrestClient, table: str, payloads: List[dict], chunk_size: int) -> Dict[str, int]:
+    returned = client.upsert(
+        table,
+        _dedupe(payloads),
+        on_conflict=KEY_COLUMN,
+        chunk_size=chunk_size,
+        returning=f"id,{KEY_COLUMN}",
+    )
+    return {row[KEY_COLUMN]: int(row["id"]) for row in returned}
+
+
+def _legacy_ids(live: Sequence[dict], key_of: Callable[[dict], str], wanted: Collection[str]) -> Dict[str, int]:
+    """{clave: id} de filas sin clave_origen que corresponden a una clave del push y que nadie tiene aún."""
+    keyed = {row[KEY_COLUMN] for row in live if row.get(KEY_COLUMN)}
+    legacy: Dict[str, int] = {}
+    # Si la carga desde CSV dejó dos filas iguales, se adopta la más vieja.
+    for row in sorted(live, key=lambda r: int(r["id"])):
+        if row.get(KEY_COLUMN):
+            continue
+        clave = key_of(row)
+        if clave in wanted and clave not in keyed and clave not in legacy:
+            legacy[clave] = int(row["id"])
+    return legacy
+
+
+def _upsert_adopting(
+    client: PostgrestClient,
+    table: str,
+    payloads: List[dict],
+    legacy: Dict[str, int],
+    chunk_size: int,
+    returning: bool = True,
+) -> Dict[str, int]:
+    """Upsert por clave_origen; las filas de `legacy` van por id (se actualizan y quedan con su clave)."""
+    adopted = [dict(payload, id=legacy[payload[KEY_COLUMN]]) for payload in payloads if payload[KEY_COLUMN] in legacy]
+    rest = [payload for payload in payloads if payload[KEY_COLUMN] not in legacy]
+    ids: Dict[str, int] = {}
+    if adopted:
+        returned = client.upsert(table, adopted, on_conflict="id", chunk_size=chunk_size, returning=f"id,{KEY_COLUMN}")
+        ids.update({row[KEY_COLUMN]: int(row["id"]) for row in returned})
+    if returning:
+        ids.update(_remote_ids(client, table, rest, chunk_size))
+    else:
+        client.upsert(table, rest, on_conflict=KEY_COLUMN, chunk_size=chunk_size)
+    return ids
+
+
+def _hora(value: object) -> str:
+    # Postgres devuelve time como HH:MM:SS; los CSV llevan HH:MM.
+    return str(value or "")[:5]
+
+
+def _count(result: PushResult, table: str, count: int) -> None:
+    result.rows[table] = count
+    run_metrics = metrics.current()
+    if run_metrics is not None:
+        run_metrics.inc("push_rows_total", count, table=table)
+
+
+def push_categories(
+    client: PostgrestClient,
+    categorias_rows: Sequence[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    result: Optional[PushResult] = None,
+) -> Dict[int, int]:
+    """Categorías nuevas ({id local, nombre}) por nombre normalizado; devuelve {id local: id en Supabase}."""
+    if not categorias_rows:
+        return {}
+    # Las cargadas a mano o desde la app no tienen clave_origen: se reconocen por nombre antes del upsert.
+    live = client.select(CATEGORIAS_TABLE, "select=id,nombre")
+    live_by_key = {category_key(str(row.get("nombre") or "")): int(row["id"]) for row in live}
+    local_ids: Dict[str, int] = {}
+    payloads: List[dict] = []
+    for row in categorias_rows:
+        clave = category_key(row["nombre"])
+        local_ids[clave] = int(row["id"])
+        if clave not in live_by_key:
+            payloads.append({"nombre": row["nombre"], KEY_COLUMN: clave})
+    # merge-duplicates: si otro scraper la insertó primero, el upsert devuelve su id.
+    remote = _remote_ids(client, CATEGORIAS_TABLE, payloads, chunk_size)
+    if result is not None:
+        _count(result, CATEGORIAS_TABLE, len(remote))
+    live_by_key.update(remote)
+    return {local_id: live_by_key[clave] for clave, local_id in local_ids.items()}
+
+
+def push_export(
+    client: PostgrestClient,
+    source: str,
+    eventos_rows: Sequence[EventoRow],
+    eventos_municipios_rows: Sequence[EventoMunicipioRow],
+    evento_fechas_rows: Sequence[EventoFechaRow],
+    categorias_rows: Sequence[dict] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    category_ids: Optional[Dict[int, int]] = None,
+) -> PushResult:
+    """Upsert de las filas de una corrida en orden de foreign keys; devuelve filas enviadas por tabla.
+
+    `categorias_rows` (categorías nuevas) se suben aquí con push_categories; si ya se subieron (varias
+    fuentes), `category_ids` trae el {id local: id remoto} que devolvió.
+    """
+    result = PushResult()
+
+    category_ids = dict(category_ids or {})
+    category_ids.update(push_categories(client, categorias_rows, chunk_size, result))
+
+    evento_claves: Dict[object, str] = {}
+    payloads: List[dict] = []
+    for row in eventos_rows:
+        clave = event_key(row.enlaceboletos, source)
+        evento_claves[row.id] = clave
+        payloads.append(_payload(row, clave, categoria=category_ids.get(row.categoria, row.categoria)))
+    payloads = _dedupe(payloads)
+    live = client.select_in(
+        "eventos", f"id,enlaceboletos,{KEY_COLUMN}", "enlaceboletos", [row.enlaceboletos for row in eventos_rows]
+    )
+    legacy = _legacy_ids(
+        live, lambda r: event_key(str(r.get("enlaceboletos") or ""), source), {p[KEY_COLUMN] for p in payloads}
+    )
+    evento_ids = _upsert_adopting(client, "eventos", payloads, legacy, chunk_size)
+    _count(result, "eventos", len(evento_ids))
+
+    venue_claves: Dict[object, str] = {}
+    payloads = []
+    for row in eventos_municipios_rows:
+        evento_clave = evento_claves[row.event_id]
+        clave = venue_key(evento_clave, row.municipio_id, row.lugar, row.direccion)
+        venue_claves[row.id] = clave
+        payloads.append(_payload(row, clave, event_id=evento_ids[evento_clave]))
+    payloads = _dedupe(payloads)
+    evento_claves_remotas = {remote_id: clave for clave, remote_id in evento_ids.items()}
+    live = client.select_in(
+        "eventos_municipios",
+        f"id,event_id,municipio_id,lugar,direccion,{KEY_COLUMN}",
+        "event_id",
+        sorted(evento_claves_remotas),
+    )
+
+    def live_venue_key(r: dict) -> str:
+        evento_clave = evento_claves_remotas[r["event_id"]]
+        return venue_key(evento_clave, r.get("municipio_id"), r.get("lugar") or "", r.get("direccion") or "")
+
+    legacy = _legacy_ids(live, live_venue_key, {p[KEY_COLUMN] for p in payloads})
+    venue_ids = _upsert_adopting(client, "eventos_municipios", payloads, legacy, chunk_size)
+    _count(result, "eventos_municipios", len(venue_ids))
+
+    payloads = []
+    for row in evento_fechas_rows:
+        venue_clave = venue_claves[row.evento_municipio_id]
+        clave = fecha_key(venue_clave, row.fecha, row.horainicio)
+        payloads.append(_payload(row, clave, evento_municipio_id=venue_ids[venue_clave]))
+    payloads = _dedupe(payloads)
+    venue_claves_remotas = {remote_id: clave for clave, remote_id in venue_ids.items()}
+    live = client.select_in(
+        "eventoFechas",
+        f"id,evento_municipio_id,fecha,horainicio,{KEY_COLUMN}",
+        "evento_municipio_id",
+        sorted(venue_claves_remotas),
+    )
+
+    def live_fecha_key(r: dict) -> str:
+        venue_clave = venue_claves_remotas[r["evento_municipio_id"]]
+        return fecha_key(venue_clave, str(r.get("fecha") or ""), _hora(r.get("horainicio")))
+
+    legacy = _legacy_ids(live, live_fecha_key, {p[KEY_COLUMN] for p in payloads})
+    _upsert_adopting(client, "eventoFechas", payloads, legacy, chunk_size, returning=False)
+    _count(result, "eventoFechas", len(payloads))
+    return result
+
+
+def describe_push_error(exc: Exception) -> Tuple[str, Optional[str]]:
+    """Mensaje corto + hint para errores típicos del push (p. ej. falta la migración de clave_origen)."""
+    detail = postgrest_error_detail(exc) or {}
+    message = str(detail.get("message") or exc)
+    hint = None
+    if detail.get("code") in {"42703", "42P10", "PGRST204"} or KEY_COLUMN in message:
+        hint = f"¿Se aplicaron las migraciones que agregan {KEY_COLUMN} con índice único? (supabase/migrations/*_eventos_clave_origen.sql)"
+    return message, hint
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Runner de scrapers de eventos: una o varias fuentes en un mismo proceso.
+
+Todas las fuentes comparten un HttpEngine (pool keep-alive y token bucket por
+host), una carga de tablas de referencia (snapshot de Supabase), el mapa de
+ids estables (exports/.id_map.json) y las categorías nuevas. Cada fuente
+exporta a exports/<fuente>/ con su propio cache de páginas, estado
+incremental y checkpoint.
+
+Las descargas de todas las fuentes están en vuelo a la vez (ventana --workers
+por fuente); el parseo y la asignación de ids se hacen en este hilo,
+alternando fuentes en orden fijo, así los ids nuevos no dependen de qué
+respuesta llegó primero. Con --parse-workers N el parseo sale a N procesos
+(pipeline/parse_pool.py) detrás de una cola acotada; el orden de entrega y
+los ids no cambian.
+
+--archive guarda cada página descargada en exports/<fuente>/archive
+(common/page_archive.py); --from-archive vuelve a correr extracción y
+exportación sobre la última corrida archivada sin pedir nada a la fuente,
+para backfills y para ver el efecto de un cambio en el parser. Lee las
+páginas que bajó esa corrida; las que fallaron vuelven a salir como error.
+La re-corrida no toca el estado de las corridas normales: exporta a
+exports/<fuente>/from_archive, no escribe checkpoint ni exports/.id_map.json
+(los ids nuevos son provisorios) y no consulta max(id). Con el snapshot de
+referencia en exports/ no necesita credenciales ni red.
+
+Uso:
+  python3 tools/scrapers/pipeline/runner.py --sources prticket --workers 8
+  python3 tools/scrapers/pipeline/runner.py --sources prticket,pietix --incremental --push
+  python3 tools/scrapers/pipeline/runner.py --sources prticket --workers 16 --parse-workers 4
+  python3 tools/scrapers/pipeline/runner.py --sources prticket --archive
+  python3 tools/scrapers/pipeline/runner.py --sources prticket --from-archive --workers 32 --parse-workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+SCRAPERS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRAPERS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRAPERS_DIR))
+
+from common import metrics, reference_data  # noqa: E402
+from common.checkpoint import DEFAULT_SYNC_EVERY, CheckpointJournal  # noqa: E402
+from common.http_cache import DEFAULT_MAX_AGE_SECONDS, DiskHttpCache  # noqa: E402
+from common.http_engine import HostPolicy, HttpEngine  # noqa: E402
+from common.id_allocator import IdAllocator  # noqa: E402
+from common.incremental_store import IncrementalStore, content_hash  # noqa: E402
+from common.page_archive import DEFAULT_MAX_SHARD_BYTES, PageArchive  # noqa: E402
+from common.postgrest import DEFAULT_CHUNK_SIZE, PostgrestClient  # noqa: E402
+from common.text import normalize_cache_stats, normalize_cache_summary  # noqa: E402
+from pipeline import push  # noqa: E402
+from pipeline.models import EventoFechaRow, EventoMunicipioRow, EventoRow, EventScraped, NoDatedRow  # noqa: E402
+from pipeline.parse_pool import DEFAULT_QUEUE_PER_WORKER, ParsePool  # noqa: E402
+from pipeline.source import Source, get_source  # noqa: E402
+from pipeline.stages import (  # noqa: E402
+    ID_MAP,
+    ID_TABLES,
+    ROW_FORMAT,
+    ExportFiles,
+    ExportState,
+    append_event_rows,
+    build_municipios,
+    find_repo_root,
+    iter_scraped_events,
+    load_env_file,
+    new_category_rows,
+    safe_int,
+    write_category_sql,
+    write_csv,
+    write_rows,
+)
+
+
+REQUEST_SLEEP_SECONDS = 0.2
+DEFAULT_WORKERS = 1
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_CACHE_MAX_MB = 512
+
+ScrapedItem = Tuple[str, Optional[EventScraped], Optional[Exception]]
+
+
+@dataclass
+class SourceRun:
+    """Estado de una fuente dentro de la corrida."""
+
+    source: Source
+    export_dir: Path
+    files: ExportFiles
+    state: ExportState
+    journal: Optional[CheckpointJournal]
+    page_cache: Optional[DiskHttpCache] = None
+    incremental: Optional[IncrementalStore] = None
+    archive: Optional[PageArchive] = None
+    event_urls: List[str] = field(default_factory=list)
+    done_urls: Set[str] = field(default_factory=set)
+    processed: int = 0
+    push_result: Optional[push.PushResult] = None
+
+
+def parse_args(argv: Optional[List[str]] = None, default_sources: Sequence[str] = ()) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scraper de eventos (una o varias fuentes).")
+    parser.add_argument(
+        "--sources",
+        default=",".join(default_sources),
+        required=not default_sources,
+        help="Fuentes separadas por coma (paquetes con source.py, ej. prticket).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Páginas de evento en vuelo a la vez por fuente (1 = secuencial).",
+    )
+    parser.add_argument(
+        "--per-host-limit",
+        type=int,
+        default=DEFAULT_PER_HOST_LIMIT,
+        help="Máximo de requests simultáneos por host.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0 / REQUEST_SLEEP_SECONDS,
+        help="Máximo de requests por segundo por host (0 = sin límite).",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Procesos de parseo (0 = parsear en el hilo principal; ej. núcleos - 1 para backfills grandes).",
+    )
+    parser.add_argument(
+        "--parse-queue",
+        type=int,
+        default=0,
+        help=f"Páginas descargadas esperando parseo antes de frenar la descarga (0 = {DEFAULT_QUEUE_PER_WORKER} por proceso).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usar el cache condicional de páginas (exports/<fuente>/.cache).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help="Tamaño máximo del cache de páginas en MB (por fuente).",
+    )
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        default=DEFAULT_MAX_AGE_SECONDS / 86400,
+        help="Días sin revalidar tras los cuales una página sale del cache.",
+    )
+    parser.add_argument(
+        "--cache-fresh-seconds",
+        type=float,
+        default=0.0,
+        help="Reusar sin revalidar páginas validadas hace menos de N segundos (0 = siempre revalidar).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reusar el parseo de páginas sin cambios y generar delta_<fuente>.csv (nuevos/cambiados/eliminados).",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Guardar cada página descargada en exports/<fuente>/archive (shards gzip + índice) para re-parsear sin red.",
+    )
+    parser.add_argument(
+        "--from-archive",
+        action="store_true",
+        help="No descargar: re-parsear y exportar las URLs de la última corrida archivada con --archive.",
+    )
+    parser.add_argument(
+        "--archive-shard-mb",
+        type=float,
+        default=DEFAULT_MAX_SHARD_BYTES / (1024 * 1024),
+        help="Tamaño a partir del cual --archive abre un shard nuevo.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retomar desde el checkpoint de cada fuente sin volver a descargar los eventos ya procesados.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_SYNC_EVERY,
+        help="Eventos entre fsync del journal de checkpoint.",
+    )
+    parser.add_argument(
+        "--sync-ids",
+        action="store_true",
+        help=(
+            f"Consultar max(id) en Supabase al inicio, junto con las tablas de referencia. Sin esta opción se "
+            f"consulta recién al aparecer la primera clave sin id en exports/{ID_MAP} (siempre antes de numerarla)."
+        ),
+    )
+    parser.add_argument(
+        "--push",
+        action="store_true",
+        help="Tras escribir los CSV, hacer upsert directo a Supabase (requiere SERVICE_ROLE y las migraciones de clave_origen).",
+    )
+    parser.add_argument(
+        "--push-chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Filas por request en el upsert de --push.",
+    )
+    reference_data.add_arguments(parser)
+    metrics.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def round_robin(iterators: Sequence[Tuple[SourceRun, Iterator[ScrapedItem]]]) -> Iterator[Tuple[SourceRun, ScrapedItem]]:
+    """Un evento de cada fuente por turno; las descargas de todas siguen en vuelo mientras tanto."""
+    active = list(iterators)
+    while active:
+        still_active = []
+        for run, iterator in active:
+            item = next(iterator, None)
+            if item is None:
+                continue
+            still_active.append((run, iterator))
+            yield run, item
+        active = still_active
+
+
+def run_push(run: SourceRun, client: PostgrestClient, chunk_size: int, category_ids: Dict[int, int]) -> None:
+    with metrics.stage("push"):
+        run.push_result = push.push_export(
+            client,
+            run.source.name,
+            run.state.eventos_rows,
+            run.state.eventos_municipios_rows,
+            run.state.evento_fechas_rows,
+            chunk_size=chunk_size,
+            category_ids=category_ids,
+        )
+
+
+def print_summary(run: SourceRun, total_new_categories: int, categories_sql: Path, delta_rows: List[dict]) -> None:
+    state, files = run.state, run.files
+    # Confirmación final requerida.
+    print(f"\nRuta de exportación: {run.export_dir}")
+    print(f"Filas {files.eventos_csv}: {len(state.eventos_rows)}")
+    print(f"Filas {files.eventos_municipios_csv}: {len(state.eventos_municipios_rows)}")
+    print(f"Filas {files.evento_fechas_csv}: {len(state.evento_fechas_rows)}")
+    print(f"Filas {files.no_dated_csv}: {len(state.no_dated_rows)}")
+    if categories_sql == run.export_dir / files.categorias_sql:
+        print(f"Filas {files.categorias_sql} (categorías nuevas): {total_new_categories}")
+    else:
+        print(f"Filas {files.categorias_sql} (categorías nuevas): 0 (las de todas las fuentes van en {categories_sql})")
+
+    print(f"\nResumen ({run.source.name}):")
+    print(f"Total eventos exportados: {len(state.eventos_rows)}")
+    print(f"Total venues (eventos_municipios): {len(state.eventos_municipios_rows)}")
+    print(f"Total fechas (eventoFechas): {len(state.evento_fechas_rows)}")
+    print(f"Total items sin fecha: {len(state.no_dated_rows)}")
+    print(f"Total categorías nuevas detectadas: {total_new_categories}")
+    if run.push_result is not None:
+        print(f"Push a Supabase (upsert por clave natural): {run.push_result.summary()}")
+    if run.page_cache is not None:
+        print(f"Cache de páginas: {run.page_cache.summary()}")
+    if run.archive is not None:
+        print(f"Archivo de páginas: {run.archive.summary()}")
+    if run.incremental is not None:
+        by_estado: Dict[str, int] = {}
+        for row in delta_rows:
+            by_estado[row["estado"]] = by_estado.get(row["estado"], 0) + 1
+        print(
+            f"Incremental: {run.incremental.reused} reutilizados, {run.incremental.parsed} parseados; "
+            f"delta {files.delta_csv}: {by_estado or 'sin cambios'}"
+        )
+
+
+def main(argv: Optional[List[str]] = None, default_sources: Sequence[str] = ()) -> int:
+    args = parse_args(argv, default_sources)
+    try:
+        sources = [get_source(name) for name in dict.fromkeys(n.strip() for n in args.sources.split(",") if n.strip())]
+    except KeyError as exc:
+        print(f"ERROR: {exc.args[0]}", file=sys.stderr)
+        return 1
+    if not sources:
+        print("ERROR: --sources no indica ninguna fuente.", file=sys.stderr)
+        return 1
+    if args.from_archive and (args.archive or args.push or args.resume):
+        print("ERROR: --from-archive no se combina con --archive, --push ni --resume.", file=sys.stderr)
+        return 1
+    run_metrics = metrics.install_from_args(args)
+    repo_root = find_repo_root(Path(__file__).resolve().parent)
+    exports_root = repo_root / "exports"
+
+    env = {}
+    env.update(load_env_file(repo_root / ".env"))
+    env.update(load_env_file(repo_root / ".env.local"))
+    env.update(os.environ)
+
+    supabase_url = env.get("SUPABASE_URL", "").strip()
+    supabase_key = (env.get("SUPABASE_SERVICE_ROLE_KEY") or env.get("SUPABASE_ANON_KEY") or "").strip()
+    snapshot_path = exports_root / reference_data.SNAPSHOT_NAME
+    if not supabase_url or not supabase_key:
+        if not (args.from_archive and snapshot_path.exists()):
+            print("ERROR: Falta SUPABASE_URL o key (SERVICE_ROLE/ANON) para mapear municipios/categorías.", file=sys.stderr)
+            return 1
+        # Re-corrida offline: Municipios/categorías salen del snapshot, de cualquier proyecto.
+        supabase_url = supabase_key = ""
+
+    default_headers: Dict[str, str] = {}
+    for source in sources:
+        default_headers.update(source.default_headers)
+    http = HttpEngine(
+        default_headers=default_headers,
+        default_policy=HostPolicy(max_concurrency=args.per_host_limit, rate=max(0.0, args.rate)),
+        timeout=max(source.request_timeout for source in sources),
+    )
+    reference_client = reference_data.ReferenceData(
+        http=http,
+        url=supabase_url,
+        key=supabase_key,
+        snapshot_path=snapshot_path,
+        # Con --from-archive sirve cualquier snapshot: la corrida no depende de Supabase si ya hay uno.
+        ttl_seconds=float("inf") if args.from_archive else args.reference_ttl_hours * 3600,
+        refresh=args.refresh_reference,
+    )
+
+    def load_live_max_ids() -> Dict[str, int]:
+        max_ids = reference_client.load(tables=(), max_id_tables=ID_TABLES).max_ids
+        print(f"[INFO] Claves nuevas: contadores de ids subidos al max(id) en vivo ({', '.join(max_ids)}).")
+        return max_ids
+
+    # IDs estables por clave natural, compartidos por todas las fuentes. Antes de numerar la primera
+    # clave nueva se sube cada contador al max(id) en vivo (filas cargadas por otras vías desde la
+    # última corrida); sin mapa previo o con --sync-ids esa consulta va en la ronda inicial.
+    # Con --from-archive el mapa solo se lee: los CSV son para comparar, no para cargar, y los ids
+    # nuevos siguen los contadores guardados.
+    id_allocator = IdAllocator(
+        exports_root / ID_MAP, tables=ID_TABLES, floor_loader=None if args.from_archive else load_live_max_ids
+    )
+    sync_ids = not args.from_archive and (args.sync_ids or not id_allocator.loaded)
+    # Contadores tal como se leyeron del mapa, para la cabecera del journal de todas las fuentes: después
+    # los mueven el max(id) en vivo y los register de --resume (de la fuente anterior), y la cabecera
+    # tiene que coincidir con la de la corrida cortada para retomarla.
+    id_counters = id_allocator.counters()
+
+    # Cargar equivalentes de tablas base una sola vez para todas las fuentes: Municipios/categorías
+    # del snapshot si está vigente, max id (si hacen falta) en vivo; todo en una ronda concurrente.
+    with metrics.stage("reference_data"):
+        try:
+            reference = reference_client.load(
+                tables=(reference_data.MUNICIPIOS, reference_data.CATEGORIAS),
+                max_id_tables=ID_TABLES if sync_ids else (),
+            )
+        except reference_data.SnapshotMissing as exc:
+            print(f"ERROR: {exc}; hace falta SUPABASE_URL y key.", file=sys.stderr)
+            http.close()
+            return 1
+        municipios_rows = reference.tables["Municipios"]
+        municipios = build_municipios(municipios_rows)
+        categorias_existing = reference.tables["categoriaEventos"]
+        if sync_ids:
+            id_allocator.sync_floor(reference.max_ids)
+    print(f"[INFO] Tablas de referencia: {reference.summary()}")
+
+    archives: Dict[str, PageArchive] = {}
+    if args.archive or args.from_archive:
+        for source in sources:
+            archives[source.name] = PageArchive(
+                exports_root / source.name / ExportFiles.for_source(source.name).archive_dir,
+                max_shard_bytes=int(args.archive_shard_mb * 1024 * 1024),
+            )
+    if args.from_archive:
+        discovered = [archives[source.name].last_run_urls for source in sources]
+    else:
+        # Descubrimiento de URLs de todas las fuentes a la vez.
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            discovered = list(pool.map(lambda source: source.discover(http), sources))
+
+    categories_new: Dict[str, int] = {}
+    next_new_category_id = max(13, max((safe_int(str(r.get("id", 0))) for r in categorias_existing), default=0) + 1)
+    runs: List[SourceRun] = []
+    for source, event_urls in zip(sources, discovered):
+        if not event_urls:
+            where = f"el archivo de {source.name} (¿falta una corrida con --archive?)" if args.from_archive else source.name
+            print(f"ERROR: No se detectaron URLs de eventos en {where}.", file=sys.stderr)
+            continue
+        files = ExportFiles.for_source(source.name)
+        export_dir = exports_root / source.name
+        if args.from_archive:
+            export_dir = export_dir / files.from_archive_dir
+        export_dir.mkdir(parents=True, exist_ok=True)
+        archive = archives.get(source.name)
+        if archive is not None and args.archive:
+            archive.begin_run(event_urls)
+        page_cache: Optional[DiskHttpCache] = None
+        if not args.no_cache and not args.from_archive:
+            page_cache = DiskHttpCache(
+                root=export_dir / files.page_cache_dir,
+                max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                max_age_seconds=args.cache_max_age_days * 86400,
+                fresh_seconds=args.cache_fresh_seconds,
+            )
+        incremental: Optional[IncrementalStore] = None
+        if args.incremental:
+            fingerprint = content_hash(json.dumps([source.parser_version, list(municipios)], ensure_ascii=False))
+            incremental = IncrementalStore(export_dir / files.incremental_state, fingerprint=fingerprint)
+        # Checkpoint: cada evento procesado se agrega al journal; --resume lo reaplica sin volver a descargar.
+        # --from-archive no lo necesita (re-correr sale barato) y no debe pisar el de una corrida cortada.
+        journal: Optional[CheckpointJournal] = None
+        if not args.from_archive:
+            journal = CheckpointJournal(
+                export_dir / files.checkpoint_journal,
+                header={
+                    "kind": source.name,
+                    "parser_version": source.parser_version,
+                    "row_format": ROW_FORMAT,
+                    "id_counters": id_counters,
+                },
+                sync_every=args.checkpoint_every,
+            )
+        state = ExportState(
+            source=source.name,
+            ids=id_allocator,
+            next_new_category_id=next_new_category_id,
+            categories_new=categories_new,
+        )
+        run = SourceRun(
+            source=source,
+            export_dir=export_dir,
+            files=files,
+            state=state,
+            journal=journal,
+            page_cache=page_cache,
+            incremental=incremental,
+            archive=archive,
+            event_urls=event_urls,
+        )
+        records = journal.open(resume=args.resume) if journal is not None else []
+        for record in records:
+            state.apply_record(record)
+            run.done_urls.add(record["url"])
+        next_new_category_id = max(next_new_category_id, state.next_new_category_id)
+        if run.done_urls:
+            print(f"[INFO] Retomando checkpoint de {source.name}: {len(run.done_urls)} eventos ya procesados.")
+            if incremental is not None:
+                for event_url in run.done_urls:
+                    incremental.mark_seen(source.slug(event_url))
+        run.processed = len(run.done_urls)
+        runs.append(run)
+    if not runs:
+        for archive in archives.values():
+            archive.close()
+        http.close()
+        return 1
+
+    parse_pool: Optional[ParsePool] = None
+    if args.parse_workers > 0:
+        # Un solo pool para todas las fuentes; los municipios se envían una vez por proceso.
+        parse_pool = ParsePool(args.parse_workers, municipios_rows, queue_size=args.parse_queue)
+        print(f"[INFO] Parseo en {parse_pool.workers} procesos (cola de {parse_pool.queue_size} páginas por fuente).")
+
+    iterators = []
+    for run in runs:
+        pending_urls = [url for url in run.event_urls if url not in run.done_urls]
+        scraped_events = iter_scraped_events(
+            http=http,
+            source=run.source,
+            event_urls=pending_urls,
+            municipios=municipios,
+            workers=args.workers,
+            page_cache=run.page_cache,
+            incremental=run.incremental,
+            parse_pool=parse_pool,
+            archive=run.archive,
+            from_archive=args.from_archive,
+        )
+        iterators.append((run, scraped_events))
+
+    try:
+        for run, (event_url, scraped, exc) in round_robin(iterators):
+            state = run.state
+            # Las categorías nuevas se numeran en un solo contador para todas las fuentes.
+            state.next_new_category_id = next_new_category_id
+            mark = state.mark()
+            with metrics.stage("rows"):
+                append_event_rows(state, event_url, scraped, exc, categorias_existing)
+            next_new_category_id = state.next_new_category_id
+            if run.journal is not None:
+                run.journal.append(state.checkpoint_record(event_url, mark))
+
+            run.processed += 1
+            if run.processed % 10 == 0:
+                print(f"[INFO] {run.source.name}: procesados {run.processed}/{len(run.event_urls)} eventos...")
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+        for archive in archives.values():
+            archive.close()
+
+    # Las categorías nuevas son compartidas por todas las fuentes: un solo SQL, en la carpeta de la
+    # primera; el de las demás queda vacío para no insertar los mismos ids dos veces.
+    categories_sql = runs[0].export_dir / runs[0].files.categorias_sql
+    with metrics.stage("csv_write"):
+        for run in runs:
+            state, files = run.state, run.files
+            write_rows(run.export_dir / files.eventos_csv, EventoRow, state.eventos_rows)
+            write_rows(run.export_dir / files.eventos_municipios_csv, EventoMunicipioRow, state.eventos_municipios_rows)
+            write_rows(run.export_dir / files.evento_fechas_csv, EventoFechaRow, state.evento_fechas_rows)
+            write_rows(run.export_dir / files.no_dated_csv, NoDatedRow, state.no_dated_rows)
+            write_category_sql(run.export_dir / files.categorias_sql, categories_new if run is runs[0] else {})
+    for run in runs:
+        if run.journal is not None:
+            run.journal.finish()
+    if not args.from_archive:
+        id_allocator.save()
+
+    if args.push:
+        client = PostgrestClient(http=http, url=supabase_url, key=supabase_key)
+        category_ids: Dict[int, int] = {}
+        stage = "categoriaEventos"
+        try:
+            # Las categorías nuevas son compartidas: se suben una vez y todas las fuentes usan los ids remotos.
+            if categories_new:
+                with metrics.stage("push"):
+                    category_ids = push.push_categories(client, new_category_rows(categories_new), args.push_chunk_size)
+                # El snapshot ya no las tiene: sin esto la próxima corrida (dentro del TTL) las vería nuevas.
+                reference_client.forget(push.CATEGORIAS_TABLE)
+                print(f"[INFO] Push categoriaEventos (upsert por nombre): {len(category_ids)} categorías nuevas.")
+            for run in runs:
+                stage = run.source.name
+                run_push(run, client, args.push_chunk_size, category_ids)
+        except Exception as exc:
+            message, hint = push.describe_push_error(exc)
+            print(f"ERROR: Falló el push de {stage} a Supabase: {message}", file=sys.stderr)
+            if hint:
+                print(f"       {hint}", file=sys.stderr)
+            print(
+                "       Los CSV quedaron escritos; para reintentar hay que volver a correr el scraper con --push "
+                "(no hay modo de solo push; el upsert por clave natural no duplica lo que ya subió).",
+                file=sys.stderr,
+            )
+            http.close()
+            return 1
+    http.close()
+
+    for run in runs:
+        if run.page_cache is not None:
+            run.page_cache.evict()
+        delta_rows: List[dict] = []
+        if run.incremental is not None:
+            delta_rows = run.incremental.delta()
+            write_csv(run.export_dir / run.files.delta_csv, ["slug", "url", "estado"], delta_rows)
+            run.incremental.save()
+        print_summary(run, len(categories_new), categories_sql, delta_rows)
+    print(f"\nCache normalize_text: {normalize_cache_summary()}")
+    not_saved = " (no se guarda con --from-archive)" if args.from_archive else ""
+    print(f"IDs ({ID_MAP}){not_saved}: {id_allocator.summary()}")
+
+    if run_metrics is not None:
+        for run in runs:
+            if run.page_cache is not None:
+                cache_stats = run.page_cache.stats
+                run_metrics.record_cache(
+                    f"paginas_{run.source.name}", cache_stats["hits"] + cache_stats["not_modified"], cache_stats["misses"]
+                )
+            if run.incremental is not None:
+                run_metrics.record_cache(f"incremental_{run.source.name}", run.incremental.reused, run.incremental.parsed)
+        normalize_stats = normalize_cache_stats()
+        run_metrics.record_cache("normalize_text", normalize_stats["hits"], normalize_stats["misses"])
+        metrics.export_from_args(run_metrics, args)
+
+    return 0
+
+
+def cli(argv: Optional[List[str]] = None, default_sources: Sequence[str] = ()) -> int:
+    try:
+        return main(argv, default_sources)
+    except KeyboardInterrupt:
+        print("\nInterrumpido. Para continuar: --resume (checkpoint en exports/<fuente>/).", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
@@ -0,0 +1,73 @@
+"""
+Interfaz de una fuente de eventos y registro de fuentes.
+
+Una fuente solo sabe dos cosas: qué URLs de evento hay (discover) y cómo
+convertir el HTML de una de ellas en EventScraped (parse). Mapeo de
+municipios/categorías, ids, checkpoint, cache, CSV y --push son etapas
+comunes (pipeline.stages / pipeline.runner).
+
+Cada fuente vive en su paquete (tools/scrapers/<nombre>/) con un módulo
+source.py que llama a register_source al importarse; get_source lo importa
+la primera vez que se pide por nombre.
+"""
+
+from __future__ import annotations
+
+import importlib
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from common.http_engine import HttpEngine
+from common.municipio_matcher import MunicipioMatcher
+from pipeline.models import EventScraped
+
+
+def url_slug(event_url: str) -> str:
+    return event_url.rstrip("/").split("/")[-1]
+
+
+class Source(ABC):
+    name: str = ""
+    # Subir al cambiar reglas de extracción: invalida los resultados guardados en modo incremental.
+    parser_version: str = "1"
+    default_headers: Dict[str, str] = {}
+    request_timeout: float = 35
+
+    @abstractmethod
+    def discover(self, http: HttpEngine) -> List[str]:
+        """URLs de evento a visitar, en el orden en que se exportan."""
+
+    @abstractmethod
+    def parse(self, event_url: str, page_html: str, municipios: MunicipioMatcher) -> EventScraped:
+        """EventScraped de una página de evento (corre en los procesos de --parse-workers)."""
+
+    def slug(self, event_url: str) -> str:
+        return url_slug(event_url)
+
+
+_REGISTRY: Dict[str, Source] = {}
+
+
+def register_source(source: Source) -> Source:
+    if not source.name:
+        raise ValueError(f"{type(source).__name__} no define name")
+    _REGISTRY[source.name] = source
+    return source
+
+
+def get_source(name: str) -> Source:
+    name = name.strip().lower()
+    if name not in _REGISTRY:
+        try:
+            importlib.import_module(f"{name}.source")
+        except ModuleNotFoundError as exc:
+            if exc.name not in {name, f"{name}.source"}:
+                raise
+    if name not in _REGISTRY:
+        known = ", ".join(sorted(_REGISTRY)) or "ninguna cargada"
+        raise KeyError(f"Fuente desconocida: {name} (registradas: {known})")
+    return _REGISTRY[name]
+
+
+def registered_sources() -> List[str]:
+    return sorted(_REGISTRY)
@@ -0,0 +1,556 @@
+"""
+Etapas comunes a todas las fuentes: entorno, mapeo de municipios/categorías,
+descarga + parseo con ventana de concurrencia, asignación de ids por clave
+natural y exportación (CSV + SQL de categorías nuevas).
+
+Lo específico de cada fuente (descubrir URLs y extraer EventScraped de una
+página) está detrás de pipeline.source.Source.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import ClassVar, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from common import metrics
+from common.http_cache import DiskHttpCache
+from common.http_engine import HttpEngine
+from common.id_allocator import IdAllocator
+from common.incremental_store import IncrementalStore, content_hash
+from common.municipio_matcher import MunicipioMatcher
+from common.page_archive import PageArchive
+from common.text import clean_spaces
+from common.text import normalize_text as shared_normalize_text
+from pipeline import keys
+from pipeline.models import (
+    EventoFechaRow,
+    EventoMunicipioRow,
+    EventoRow,
+    EventScraped,
+    NoDatedRow,
+    Venue,
+    event_from_dict,
+    event_to_dict,
+)
+from pipeline.parse_pool import ParsePool
+from pipeline.source import Source
+
+
+ID_MAP = ".id_map.json"
+ID_TABLES = ("eventos", "eventos_municipios", "eventoFechas")
+
+EVENTOS_HEADERS = list(EventoRow._fields)
+EVENTOS_MUNICIPIOS_HEADERS = list(EventoMunicipioRow._fields)
+EVENTO_FECHAS_HEADERS = list(EventoFechaRow._fields)
+NO_DATED_HEADERS = list(NoDatedRow._fields)
+# Filas del checkpoint como listas en orden de columnas (antes dicts); cambia el encabezado del journal.
+ROW_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class ExportFiles:
+    """Nombres de salida de una fuente dentro de exports/<fuente>/."""
+
+    eventos_csv: str
+    eventos_municipios_csv: str
+    evento_fechas_csv: str
+    no_dated_csv: str
+    delta_csv: str
+    checkpoint_journal: str
+    categorias_sql: str = "categoriaEventos_nuevas_insert.sql"
+    incremental_state: str = ".incremental_state.json"
+    page_cache_dir: str = ".cache"
+    archive_dir: str = "archive"
+    # --from-archive exporta aquí (dentro de exports/<fuente>/) para no pisar los CSV de la última corrida.
+    from_archive_dir: str = "from_archive"
+
+    @classmethod
+    def for_source(cls, source_name: str) -> "ExportFiles":
+        return cls(
+            eventos_csv=f"eventos_{source_name}.csv",
+            eventos_municipios_csv=f"eventos_municipios_{source_name}.csv",
+            evento_fechas_csv=f"eventoFechas_{source_name}.csv",
+            no_dated_csv=f"no_dated_items_{source_name}.csv",
+            delta_csv=f"delta_{source_name}.csv",
+            checkpoint_journal=f".scrape_{source_name}.journal.jsonl",
+        )
+
+
+def normalize_text(value: str) -> str:
+    # Se conserva "/" para no romper fechas d/m/y ni nombres de categoría "A / B".
+    return shared_normalize_text(value, keep_slash=True)
+
+
+def load_env_file(path: Path) -> Dict[str, str]:
+    env: Dict[str, str] = {}
+    if not path.exists():
+        return env
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        value = value.strip().strip("'").strip('"')
+        if key:
+            env[key] = value
+    return env
+
+
+def find_repo_root(start: Path) -> Path:
+    current = start.resolve()
+    for candidate in [current] + list(current.parents):
+        if (candidate / "AGENTS.md").exists() and (candidate / "public").exists():
+            return candidate
+    return start.resolve()
+
+
+def safe_int(value: str, default: int = 0) -> int:
+    try:
+        return int(value)
+    except Exception:
+        return default
+
+
+def build_municipios(municipios_rows: List[dict]) -> MunicipioMatcher:
+    municipios = []
+    for row in municipios_rows:
+        mid = safe_int(str(row.get("id", 0)))
+        nombre = clean_spaces(str(row.get("nombre", "")))
+        if mid and nombre:
+            municipios.append((mid, nombre, normalize_text(nombre)))
+    # Orden por largo para capturar primero municipios compuestos.
+    municipios.sort(key=lambda item: len(item[2]), reverse=True)
+    return MunicipioMatcher(municipios)
+
+
+def detect_municipio_id(text: str, municipios: MunicipioMatcher) -> Tuple[Optional[int], str]:
+    if not text:
+        return None, ""
+    match = municipios.find(normalize_text(text))
+    if match is None:
+        return None, ""
+    return match[0], match[1]
+
+
+def map_category_id(
+    raw_category: str,
+    categories_existing: List[dict],
+    new_categories: Dict[str, int],
+    next_category_id: int,
+) -> Tuple[int, int]:
+    existing_by_norm = {normalize_text(str(row.get("nombre", ""))): int(row.get("id")) for row in categories_existing}
+
+    mapping_keywords = [
+        (1, ["concert", "concierto", "musica", "music"]),
+        (2, ["festival"]),
+        (3, ["sports", "deporte", "deportivo", "basket", "baseball", "futbol", "football", "mma", "boxing", "pickleball", "voleibol", "volleyball"]),
+        (4, ["fair", "feria", "expo"]),
+        (5, ["family", "familiar", "kids", "ninos", "niños"]),
+        (6, ["party", "nightclub", "discoteca", "perreo", "club", "bailable"]),
+        (7, ["culture", "cultura", "theater", "theatre", "teatro", "musical", "artes escenicas", "magia"]),
+        (8, ["food", "gastronomic", "gastronomico", "gastronómico", "rum", "culinary"]),
+        (10, ["comedy", "comedia", "standup", "stand up"]),
+        (12, ["horror", "terror"]),
+        (9, ["other", "otro"]),
+    ]
+
+    # Respeta IDs existentes si están en DB.
+    valid_existing_ids = {int(row.get("id")) for row in categories_existing if row.get("id") is not None}
+
+    raw = normalize_text(raw_category)
+    if raw in existing_by_norm:
+        return existing_by_norm[raw], next_category_id
+
+    for category_id, keywords in mapping_keywords:
+        if any(keyword in raw for keyword in keywords):
+            if category_id in valid_existing_ids:
+                return category_id, next_category_id
+            # Fallback por nombre en DB
+            for norm_name, db_id in existing_by_norm.items():
+                if any(keyword in norm_name for keyword in keywords):
+                    return db_id, next_category_id
+
+    # Fallback defensivo a "Otro" para evitar categorías duplicadas/no confiables.
+    if 9 in valid_existing_ids:
+        return 9, next_category_id
+
+    new_key = clean_spaces(raw_category or "Otro")
+    new_key_norm = normalize_text(new_key)
+    if new_key_norm in existing_by_norm:
+        return existing_by_norm[new_key_norm], next_category_id
+
+    if new_key_norm in new_categories:
+        return new_categories[new_key_norm], next_category_id
+
+    assigned = next_category_id
+    new_categories[new_key_norm] = assigned
+    return assigned, assigned + 1
+
+
+def parse_event_incremental(
+    source: Source,
+    event_url: str,
+    page_html: str,
+    municipios: MunicipioMatcher,
+    incremental: Optional[IncrementalStore],
+) -> EventScraped:
+    """Como source.parse, pero reutiliza el resultado guardado si el HTML no cambió."""
+    if incremental is None:
+        return source.parse(event_url, page_html, municipios)
+    slug = source.slug(event_url)
+    page_hash = content_hash(page_html)
+    stored = incremental.lookup(slug, page_hash)
+    if stored is not None:
+        return event_from_dict(stored)
+    scraped = source.parse(event_url, page_html, municipios)
+    incremental.put(slug, event_url, page_hash, event_to_dict(scraped))
+    return scraped
+
+
+def iter_scraped_events(
+    http: HttpEngine,
+    source: Source,
+    event_urls: List[str],
+    municipios: MunicipioMatcher,
+    workers: int,
+    page_cache: Optional[DiskHttpCache] = None,
+    incremental: Optional[IncrementalStore] = None,
+    parse_pool: Optional[ParsePool] = None,
+    archive: Optional[PageArchive] = None,
+    from_archive: bool = False,
+) -> Iterator[Tuple[str, Optional[EventScraped], Optional[Exception]]]:
+    """Mantiene hasta `workers` descargas en vuelo y entrega los eventos en el orden de `event_urls`.
+
+    Con `parse_pool`, las páginas descargadas pasan a una cola acotada (parse_pool.queue_size) que
+    parsean los procesos del pool; con la cola llena no se sacan más descargas de la ventana.
+    Con `archive`, cada página descargada se agrega al archivo; con `from_archive` se leen de él
+    (sin red), igual de a `workers` por vez, las que archivó la última corrida: una URL que esa
+    corrida no pudo descargar sale con el mismo error de descarga.
+    """
+    window = max(1, workers)
+    pending: Deque[Tuple[str, Future]] = deque()
+    remaining = iter(event_urls)
+
+    def fill_window() -> None:
+        while len(pending) < window:
+            event_url = next(remaining, None)
+            if event_url is None:
+                return
+            if from_archive:
+                pending.append((event_url, read_archived(event_url)))
+                continue
+            if page_cache is not None:
+                fetch = page_cache.afetch_text(http, event_url)
+            else:
+                fetch = http.afetch_text(event_url)
+            pending.append((event_url, http.submit(fetch)))
+
+    def read_archived(event_url: str) -> Future:
+        archived: Future = Future()
+        try:
+            with metrics.stage("archive_read"):
+                archived.set_result(archive.read_last_run(event_url))
+        except Exception as exc:
+            archived.set_exception(exc)
+        return archived
+
+    def page_text(event_url: str, fetched: Future) -> str:
+        with metrics.stage("fetch_wait"):
+            page_html = fetched.result()
+        if archive is not None and not from_archive:
+            with metrics.stage("archive_write"):
+                archive.append(event_url, page_html)
+        return page_html
+
+    fill_window()
+    if parse_pool is None:
+        while pending:
+            event_url, future = pending.popleft()
+            fill_window()
+            if incremental is not None:
+                incremental.mark_seen(source.slug(event_url))
+            try:
+                page_html = page_text(event_url, future)
+                yield event_url, parse_event_incremental(source, event_url, page_html, municipios, incremental), None
+            except Exception as exc:
+                yield event_url, None, exc
+        return
+
+    # (url, hash de la página si el resultado va al estado incremental, parseo en curso)
+    parse_queue: Deque[Tuple[str, str, Future]] = deque()
+
+    def enqueue_parse(event_url: str, fetched: Future) -> None:
+        parsed: Future = Future()
+        page_hash = ""
+        if incremental is not None:
+            incremental.mark_seen(source.slug(event_url))
+        try:
+            page_html = page_text(event_url, fetched)
+        except Exception as exc:
+            parsed.set_exception(exc)
+        else:
+            stored = None
+            if incremental is not None:
+                page_hash = content_hash(page_html)
+                stored = incremental.lookup(source.slug(event_url), page_hash)
+            if stored is not None:
+                page_hash = ""
+                parsed.set_result(event_from_dict(stored))
+            else:
+                parsed = parse_pool.submit(source, event_url, page_html)
+        parse_queue.append((event_url, page_hash, parsed))
+
+    while pending or parse_queue:
+        while pending and len(parse_queue) < parse_pool.queue_size:
+            event_url, fetched = pending.popleft()
+            fill_window()
+            enqueue_parse(event_url, fetched)
+        event_url, page_hash, parsed = parse_queue.popleft()
+        try:
+            with metrics.stage("parse_wait"):
+                scraped = parsed.result()
+        except Exception as exc:
+            yield event_url, None, exc
+            continue
+        if page_hash:
+            incremental.put(source.slug(event_url), event_url, page_hash, event_to_dict(scraped))
+        yield event_url, scraped, None
+
+
+@dataclass
+class ExportState:
+    """Filas acumuladas, ids asignados y categorías nuevas de una fuente; es lo que guarda el checkpoint.
+
+    Varias fuentes de una misma corrida comparten `ids` y el dict `categories_new` (ver pipeline.runner).
+    """
+
+    source: str
+    ids: IdAllocator
+    next_new_category_id: int
+    categories_new: Dict[str, int] = field(default_factory=dict)
+    eventos_rows: List[EventoRow] = field(default_factory=list)
+    eventos_municipios_rows: List[EventoMunicipioRow] = field(default_factory=list)
+    evento_fechas_rows: List[EventoFechaRow] = field(default_factory=list)
+    no_dated_rows: List[NoDatedRow] = field(default_factory=list)
+
+    ROW_LISTS: ClassVar[Tuple[Tuple[str, Type[NamedTuple]], ...]] = (
+        ("eventos_rows", EventoRow),
+        ("eventos_municipios_rows", EventoMunicipioRow),
+        ("evento_fechas_rows", EventoFechaRow),
+        ("no_dated_rows", NoDatedRow),
+    )
+
+    def mark(self) -> Dict[str, int]:
+        mark = {name: len(getattr(self, name)) for name, _ in self.ROW_LISTS}
+        mark["ids"] = len(self.ids.assigned)
+        return mark
+
+    def checkpoint_record(self, event_url: str, mark: Dict[str, int]) -> dict:
+        """Registro de journal con las filas e ids nuevos agregados desde `mark`."""
+        return {
+            "url": event_url,
+            "rows": {name: getattr(self, name)[mark[name]:] for name, _ in self.ROW_LISTS},
+            "ids": [list(item) for item in self.ids.assigned[mark["ids"]:]],
+            "next_new_category_id": self.next_new_category_id,
+            "categories_new": self.categories_new,
+        }
+
+    def apply_record(self, record: dict) -> None:
+        for name, row_type in self.ROW_LISTS:
+            getattr(self, name).extend(row_type(*values) for values in record["rows"].get(name, []))
+        for table, key, value in record["ids"]:
+            self.ids.register(table, key, value)
+        # En sitio y sin retroceder: el dict puede estar compartido con otras fuentes.
+        self.next_new_category_id = max(self.next_new_category_id, record["next_new_category_id"])
+        self.categories_new.update(record["categories_new"])
+
+
+def append_event_rows(
+    state: ExportState,
+    event_url: str,
+    scraped: Optional[EventScraped],
+    exc: Optional[Exception],
+    categorias_existing: List[dict],
+) -> None:
+    """Agrega las filas de un evento (o su motivo de descarte) al estado de exportación."""
+    if scraped is None:
+        state.no_dated_rows.append(
+            NoDatedRow(
+                url=event_url,
+                nombre=event_url.rsplit("/", 1)[-1],
+                categoria_raw="",
+                motivo=f"Error al extraer: {exc}",
+                descripcion_preview="",
+            )
+        )
+        return
+
+    if not scraped.datetimes:
+        state.no_dated_rows.append(
+            NoDatedRow(
+                url=scraped.url,
+                nombre=scraped.nombre,
+                categoria_raw=scraped.categoria_raw,
+                motivo=scraped.motivo_no_exportable or "Sin fecha/hora",
+                descripcion_preview=clean_spaces(scraped.descripcion[:280]),
+            )
+        )
+        return
+
+    if not scraped.venues:
+        state.no_dated_rows.append(
+            NoDatedRow(
+                url=scraped.url,
+                nombre=scraped.nombre,
+                categoria_raw=scraped.categoria_raw,
+                motivo="Sin venue/municipio detectable",
+                descripcion_preview=clean_spaces(scraped.descripcion[:280]),
+            )
+        )
+        return
+
+    category_id, state.next_new_category_id = map_category_id(
+        raw_category=scraped.categoria_raw,
+        categories_existing=categorias_existing,
+        new_categories=state.categories_new,
+        next_category_id=state.next_new_category_id,
+    )
+
+    # 1 fila por combinación única evento + venue/municipio.
+    venues_for_event: List[Venue] = []
+    seen_venue_keys = set()
+    for venue in scraped.venues:
+        if not venue.municipio_id:
+            continue
+        venue_dedupe_key = (venue.municipio_id, normalize_text(venue.lugar), normalize_text(venue.direccion))
+        if venue_dedupe_key in seen_venue_keys:
+            continue
+        seen_venue_keys.add(venue_dedupe_key)
+        venues_for_event.append(venue)
+
+    if not venues_for_event:
+        # Si no hay venue mapeable, mover a revisión manual.
+        state.no_dated_rows.append(
+            NoDatedRow(
+                url=scraped.url,
+                nombre=scraped.nombre,
+                categoria_raw=scraped.categoria_raw,
+                motivo="No se pudo mapear municipio_id",
+                descripcion_preview=clean_spaces(scraped.descripcion[:280]),
+            )
+        )
+        return
+
+    venue_primary = scraped.venues[0]
+    evento_clave = keys.event_key(scraped.url, state.source)
+    event_id = state.ids.get("eventos", evento_clave)
+    state.eventos_rows.append(
+        EventoRow(
+            id=event_id,
+            nombre=scraped.nombre,
+            descripcion=scraped.descripcion,
+            costo=scraped.costo,
+            gratis="false",
+            lugar=venue_primary.lugar,
+            direccion=venue_primary.direccion,
+            municipio_id=venue_primary.municipio_id or "",
+            categoria=category_id,
+            enlaceboletos=scraped.url,
+            boletos_por_localidad="false",
+            imagen=scraped.imagen,
+            activo="true",
+        )
+    )
+
+    venue_rows_for_event: List[Tuple[int, str]] = []
+    for venue in venues_for_event:
+        venue_clave = keys.venue_key(evento_clave, venue.municipio_id, venue.lugar, venue.direccion)
+        venue_id = state.ids.get("eventos_municipios", venue_clave)
+        venue_rows_for_event.append((venue_id, venue_clave))
+        state.eventos_municipios_rows.append(
+            EventoMunicipioRow(
+                id=venue_id,
+                event_id=event_id,
+                municipio_id=venue.municipio_id,
+                lugar=venue.lugar,
+                direccion=venue.direccion,
+                enlaceboletos=scraped.url,
+            )
+        )
+
+    # Asignación de fechas a evento_municipio_id.
+    # Si hay una sola sede: todas las fechas ahí.
+    # Si hay igual número de fechas y sedes: una a una.
+    # Si no: todas a la primera sede.
+    if len(venue_rows_for_event) == 1:
+        assignment = [venue_rows_for_event[0] for _ in scraped.datetimes]
+    elif len(venue_rows_for_event) == len(scraped.datetimes):
+        assignment = list(venue_rows_for_event)
+    else:
+        assignment = [venue_rows_for_event[0] for _ in scraped.datetimes]
+
+    seen_fecha_keys = set()
+    for (fecha, hora), (evento_municipio_id, venue_clave) in zip(scraped.datetimes, assignment):
+        fecha_clave = keys.fecha_key(venue_clave, fecha, hora)
+        if fecha_clave in seen_fecha_keys:
+            # Misma fecha/hora en la misma sede: sería la misma fila (y el mismo id).
+            continue
+        seen_fecha_keys.add(fecha_clave)
+        state.evento_fechas_rows.append(
+            EventoFechaRow(
+                id=state.ids.get("eventoFechas", fecha_clave),
+                evento_municipio_id=evento_municipio_id,
+                fecha=fecha,
+                horainicio=hora,
+                mismahora="false",
+            )
+        )
+
+
+def write_csv(path: Path, headers: List[str], rows: List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=headers)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: row.get(key, "") for key in headers})
+
+
+def write_rows(path: Path, row_type: Type[NamedTuple], rows: Iterable[NamedTuple]) -> None:
+    """CSV de filas NamedTuple: encabezado = campos del tipo, cada fila se escribe tal cual (sin dict)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(row_type._fields)
+        writer.writerows(rows)
+
+
+def new_category_rows(categories_new: Dict[str, int]) -> List[dict]:
+    # categories_new: normalized_name -> id
+    rows = []
+    for cid, norm_name in sorted(((cid, norm_name) for norm_name, cid in categories_new.items()), key=lambda x: x[0]):
+        # Reconstrucción presentable del nombre.
+        readable_name = " ".join(word.capitalize() for word in norm_name.split())
+        readable_name = readable_name.replace(" / ", " / ")
+        rows.append({"id": cid, "nombre": readable_name})
+    return rows
+
+
+def write_category_sql(path: Path, categories_new: Dict[str, int]) -> int:
+    rows = new_category_rows(categories_new)
+    if not rows:
+        path.write_text("", encoding="utf-8")
+        return 0
+
+    lines = [
+        f'insert into public."categoriaEventos" (id, nombre) values ({row["id"]}, {json.dumps(row["nombre"])});'
+        for row in rows
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return len(rows)
@@ -0,0 +1 @@
+"""Scraper de eventos PRticket."""
@@ -0,0 +1,143 @@
+"""
+Fechas y horas de la descripción de PRticket con un solo patrón por tipo.
+
+parse_date_candidates / parse_time_candidates (scrape_prticket, hasta 2243e50)
+hacían un re.findall por formato (4 de fecha, 2 de hora) y se aplicaban tres veces a
+cada línea: al juntar fechas, al juntar horas y en infer_venues para descartar
+líneas con fecha u hora. Aquí cada línea se clasifica una vez:
+
+- DATE_SCAN_RE (sobre el texto normalizado) y TIME_SCAN_RE (sobre el texto
+  tal cual) reúnen los formatos con grupos con nombre; el grupo de cada
+  alternativa (es, num / clock, hour) dice cuál coincidió.
+- Se guarda el final del último match aceptado de cada formato: se aceptan
+  los mismos matches que daba un findall por formato, también cuando un
+  formato empieza dentro del match de otro ("8:10 PM" da 20:10 y 22:00).
+- El resultado conserva el orden de antes (formato por formato, sin repetidos).
+- Los formatos ISO (yyyy-mm-dd) y "Month d, yyyy" de parse_date_candidates se
+  buscaban sobre normalize_text, que reemplaza "-" y "," por espacios: nunca
+  coincidían y el patrón combinado no los incluye (mismo resultado).
+
+scan_lines devuelve un DateTimeScan por línea que build_event_scraped e
+infer_venues comparten. bench/verify_datetime_scanner.py compara contra la
+tabla dorada bench/golden/datetime_scanner.jsonl.gz (fechas y horas que daban
+esas funciones sobre descripciones reales exportadas) y, con --baseline-rev,
+contra esa revisión.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, NamedTuple
+
+from pipeline.stages import normalize_text, safe_int
+from prticket import patterns as rx
+
+
+MONTHS_ES = {
+    "enero": 1,
+    "febrero": 2,
+    "marzo": 3,
+    "abril": 4,
+    "mayo": 5,
+    "junio": 6,
+    "julio": 7,
+    "agosto": 8,
+    "septiembre": 9,
+    "setiembre": 9,
+    "octubre": 10,
+    "noviembre": 11,
+    "diciembre": 12,
+}
+
+# Orden en que se listaban los formatos (un findall tras otro).
+DATE_KINDS = ("es", "num")
+TIME_KINDS = ("clock", "hour")
+
+
+class DateTimeScan(NamedTuple):
+    dates: List[str]
+    times: List[str]
+
+    @property
+    def has_datetime(self) -> bool:
+        return bool(self.dates or self.times)
+
+
+def _format_date(yy: int, mm: int, dd: int) -> str:
+    return f"{yy:04d}-{mm:02d}-{dd:02d}"
+
+
+def _date_value(kind: str, m) -> str:
+    dd = safe_int(m.group("d"))
+    if kind == "es":
+        yy, mm = safe_int(m.group("es_y")), MONTHS_ES.get(m.group("es_m"))
+        if mm and 1900 <= yy <= 2100 and 1 <= dd <= 31:
+            return _format_date(yy, mm, dd)
+    else:
+        yy, mm = safe_int(m.group("num_y")), safe_int(m.group("num_m"))
+        if yy < 100:
+            yy += 2000
+        if 1900 <= yy <= 2100 and 1 <= mm <= 12 and 1 <= dd <= 31:
+            return _format_date(yy, mm, dd)
+    return ""
+
+
+def _time_value(kind: str, m) -> str:
+    # El grupo am/pm es [AaPp].?\s*[Mm].?: basta la primera letra.
+    hh = safe_int(m.group("h"))
+    if kind == "clock":
+        mm = safe_int(m.group("clock_m"))
+        ampm = m.group("clock_ampm")
+        if mm > 59:
+            return ""
+    else:
+        mm = 0
+        ampm = m.group("hour_ampm")
+        if not (1 <= hh <= 12):
+            return ""
+    if ampm and ampm[0] in "Aa":
+        if hh == 12:
+            hh = 0
+        elif not (1 <= hh <= 11):
+            return ""
+    elif ampm:
+        if 1 <= hh <= 11:
+            hh += 12
+        elif hh != 12:
+            return ""
+    elif not (0 <= hh <= 23):
+        return ""
+    return f"{hh:02d}:{mm:02d}"
+
+
+def _scan(pattern, text: str, kinds: tuple, value) -> List[str]:
+    found: Dict[str, List[str]] = {kind: [] for kind in kinds}
+    ends = dict.fromkeys(kinds, 0)
+    for m in pattern.finditer(text):
+        kind = m.lastgroup
+        start = m.start()
+        # Lo que un findall de este formato no vería: empieza dentro de su match anterior.
+        if start < ends[kind]:
+            continue
+        ends[kind] = m.end(kind)
+        parsed = value(kind, m)
+        if parsed:
+            found[kind].append(parsed)
+    return list(dict.fromkeys(val for kind in kinds for val in found[kind]))
+
+
+def scan_dates(text: str) -> List[str]:
+    """Fechas YYYY-MM-DD de `text` (se normaliza aquí, como hacía parse_date_candidates)."""
+    return _scan(rx.DATE_SCAN_RE, normalize_text(text), DATE_KINDS, _date_value)
+
+
+def scan_times(text: str) -> List[str]:
+    """Horas HH:MM de `text` (sin normalizar: los patrones necesitan ':' y 'p.m.')."""
+    return _scan(rx.TIME_SCAN_RE, text, TIME_KINDS, _time_value)
+
+
+def scan_datetimes(text: str) -> DateTimeScan:
+    return DateTimeScan(scan_dates(text), scan_times(text))
+
+
+def scan_lines(lines: Iterable[str]) -> List[DateTimeScan]:
+    return [scan_datetimes(line) for line in lines]
@@ -0,0 +1,206 @@
+"""
+Extracción de una página de evento PRticket en una sola pasada.
+
+EventPageScanner recorre el documento una vez y guarda los offsets/fragmentos
+que antes se obtenían con un re.search sobre el HTML completo por campo
+(sección de descripción, <title>, tag de categoría, <meta>, <picture>/<img> y
+span de precio). Para conservar la semántica de aquellos re.search (primer
+cierre de etiqueta sin anidar, `\\bsrc=` que también acepta data-src, etc.),
+los patrones de prticket.patterns se aplican solo al texto de la etiqueta de
+apertura ya aislada, nunca al documento completo.
+
+El dataLayer era el re.search más caro (DATA_LAYER_RE es (?i): sin prefijo
+literal, el motor prueba cada posición de la página). find_data_layer busca
+con str.find los "p4"/"P4" (todo "datalayerp4" en cualquier caso los tiene),
+confirma ahí "var\\s+dataLayerP4" y aplica DATA_LAYER_RE.match en ese inicio:
+mismo primer match, sin recorrer la página con re.I.
+
+El recorrido usa un único tokenizer de etiquetas compilado (TAG_TOKEN_RE) que
+solo se detiene en las etiquetas relevantes. El contenido de <script>/<style>
+se recorre igual que el resto, como hacían los re.search: una etiqueta dentro
+de un string de JavaScript (document.write('<img ...>')) cuenta. html.parser
+hace el recorrido en Python puro y resultó ~3x más lento que los re.search.
+
+bench/verify_page_parser.py compara contra el corpus dorado
+bench/golden/page_parser.jsonl.gz (páginas + EventScraped de la extracción con
+un re.search por campo) y, con --baseline-rev, contra esa revisión.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from prticket import patterns as rx
+
+
+SECTION_CLASS_RE = re.compile(r"""(?is)class=["'][^"']*event-description-landing[^"']*["']""")
+COL_CLASS_RE = re.compile(r"""(?is)class=["'][^"']*event-description-landing-col[^"']*["']""")
+CATEGORY_CLASS_RE = re.compile(r"""(?is)class=["'][^"']*tag-event-info-orion[^"']*["']""")
+PRICE_CLASS_RE = re.compile(r"""(?is)class=["'][^"']*price-text[^"']*["']""")
+
+DATA_LAYER_NAME = "datalayerp4"
+# Solo las etiquetas que alimentan algún campo; el resto del documento se salta en C.
+TAG_TOKEN_RE = re.compile(r"<(/?)(meta|title|section|div|h1|span|picture|img)\b[^>]*>", re.I)
+
+
+@dataclass
+class EventPageFields:
+    """Fragmentos crudos de la página; los *_from_fields de scrape_prticket los convierten en valores."""
+
+    data_layer_json: str = ""
+    description_html: str = ""
+    h1_html: Optional[str] = None
+    title_html: Optional[str] = None
+    category_tag_html: Optional[str] = None
+    price_html: Optional[str] = None
+    picture_img_src: str = ""
+    any_img_src: str = ""
+    meta_tags: List[str] = field(default_factory=list)
+
+    def meta_content_raw(self, attr_name: str, attr_value: str) -> Optional[str]:
+        """Primero atributo→content en todas las <meta>, luego al revés (como el re.search de antes)."""
+        forward, reverse = rx.meta_content_patterns(attr_name, attr_value)
+        for pattern in (forward, reverse):
+            for tag_text in self.meta_tags:
+                m = pattern.search(tag_text)
+                if m:
+                    return m.group(1)
+        return None
+
+
+def _next_p4(page_html: str, start: int) -> int:
+    lower = page_html.find("p4", start)
+    upper = page_html.find("P4", start)
+    if lower == -1 or upper == -1:
+        return max(lower, upper)
+    return min(lower, upper)
+
+
+def find_data_layer(page_html: str) -> str:
+    """Grupo 1 del primer match de rx.DATA_LAYER_RE en la página ("" si no hay)."""
+    name_len = len(DATA_LAYER_NAME)
+    pos = _next_p4(page_html, name_len - 2)
+    while pos != -1:
+        name_start = pos + 2 - name_len
+        if page_html[name_start : pos + 2].lower() == DATA_LAYER_NAME:
+            # \s+ antes del nombre (\s de re sobre str == str.isspace) y "var" (re.I) antes.
+            start = name_start
+            while start > 0 and page_html[start - 1].isspace():
+                start -= 1
+            if start < name_start and start >= 3 and page_html[start - 3 : start].lower() == "var":
+                m = rx.DATA_LAYER_RE.match(page_html, start - 3)
+                if m:
+                    return m.group(1)
+        pos = _next_p4(page_html, pos + 1)
+    return ""
+
+
+class EventPageScanner:
+    def __init__(self, page_html: str) -> None:
+        self.page_html = page_html
+        self.fields = EventPageFields()
+        # Capturas abiertas: nombre -> (tag de cierre esperado, offset de inicio del contenido).
+        self._open: Dict[str, Tuple[str, int]] = {}
+        self._spans: Dict[str, Tuple[int, int]] = {}
+        self._h1_spans: List[Tuple[int, int]] = []
+        self._h1_open: Optional[int] = None
+        self._picture_seen = False
+        self._picture_img_src: Optional[str] = None
+        self._picture_closed_after_img = False
+
+    def scan(self) -> EventPageFields:
+        page_html = self.page_html
+        self.fields.data_layer_json = find_data_layer(page_html)
+        search = TAG_TOKEN_RE.search
+        pos = 0
+        while True:
+            m = search(page_html, pos)
+            if m is None:
+                break
+            pos = m.end()
+            tag = m.group(2).lower()
+            if m.group(1):
+                self._handle_endtag(tag, m.start())
+            else:
+                self._handle_starttag(tag, m.group(0), m.end())
+        return self._finish()
+
+    def _capture_start(self, name: str, end_tag: str, content_start: int) -> None:
+        if name in self._spans or name in self._open:
+            return
+        self._open[name] = (end_tag, content_start)
+
+    def _handle_starttag(self, tag: str, tag_text: str, content_start: int) -> None:
+        if tag == "meta":
+            self.fields.meta_tags.append(tag_text)
+        elif tag == "title":
+            self._capture_start("title", "title", content_start)
+        elif tag == "section":
+            if "section" not in self._spans and SECTION_CLASS_RE.search(tag_text):
+                self._capture_start("section", "section", content_start)
+        elif tag == "div":
+            if "section" in self._open and COL_CLASS_RE.search(tag_text):
+                self._capture_start("col", "div", content_start)
+        elif tag == "h1":
+            if self._h1_open is None:
+                self._h1_open = content_start
+        elif tag == "span":
+            if CATEGORY_CLASS_RE.search(tag_text):
+                self._capture_start("category", "span", content_start)
+            if PRICE_CLASS_RE.search(tag_text):
+                self._capture_start("price", "span", content_start)
+        elif tag == "picture":
+            self._picture_seen = True
+        elif tag == "img":
+            m = rx.ANY_IMG_RE.search(tag_text)
+            if m:
+                if not self.fields.any_img_src:
+                    self.fields.any_img_src = m.group(1)
+                if self._picture_seen and self._picture_img_src is None:
+                    self._picture_img_src = m.group(1)
+
+    def _handle_endtag(self, tag: str, offset: int) -> None:
+        if tag == "h1":
+            if self._h1_open is not None:
+                self._h1_spans.append((self._h1_open, offset))
+                self._h1_open = None
+            return
+        if tag == "picture":
+            if self._picture_img_src is not None:
+                self._picture_closed_after_img = True
+            return
+        for name, (end_tag, start) in list(self._open.items()):
+            if end_tag == tag:
+                self._spans[name] = (start, offset)
+                del self._open[name]
+
+    def _slice(self, name: str) -> Optional[str]:
+        span = self._spans.get(name)
+        if span is None:
+            return None
+        return self.page_html[span[0]:span[1]]
+
+    def _finish(self) -> EventPageFields:
+        fields = self.fields
+        section = self._spans.get("section")
+        col = self._spans.get("col")
+        if section is not None:
+            description_span = col if col is not None and col[1] <= section[1] else section
+            fields.description_html = self.page_html[description_span[0]:description_span[1]]
+            for h1_start, h1_end in self._h1_spans:
+                if description_span[0] <= h1_start and h1_end <= description_span[1]:
+                    fields.h1_html = self.page_html[h1_start:h1_end]
+                    break
+        fields.title_html = self._slice("title")
+        fields.category_tag_html = self._slice("category")
+        fields.price_html = self._slice("price")
+        if self._picture_closed_after_img and self._picture_img_src:
+            fields.picture_img_src = self._picture_img_src
+        return fields
+
+
+def scan_event_page(page_html: str) -> EventPageFields:
+    """Recorre la página una sola vez y devuelve los fragmentos que necesita parse_event_page."""
+    return EventPageScanner(page_html).scan()
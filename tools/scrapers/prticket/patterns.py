@@ -0,0 +1,68 @@
+"""
+Patrones precompilados del camino caliente de extracción de PRticket.
+
+Todas las expresiones que scrape_prticket aplicaba con re.sub/re.search/re.findall
+sobre strings se compilan una sola vez al importar. Los patrones de <meta> dependen
+del atributo buscado, así que se construyen una vez por (atributo, valor) y quedan
+en cache.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Pattern, Tuple
+
+
+# html_to_text.
+SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style)[^>]*>.*?</\1>")
+BR_RE = re.compile(r"(?i)<br\s*/?>")
+BLOCK_CLOSE_RE = re.compile(r"(?i)</(p|div|li|h1|h2|h3|section|article|tr)>")
+TAG_RE = re.compile(r"(?s)<[^>]+>")
+CRLF_RE = re.compile(r"\r\n?")
+INLINE_SPACE_RE = re.compile(r"[ \t]+")
+MULTI_NEWLINE_RE = re.compile(r"\n{2,}")
+
+# Frontpage.
+HREF_RE = re.compile(r"""href=["']([^"']+)["']""", re.I)
+EVENT_PATH_RE = re.compile(r"^/events/(?:en|es)/([A-Za-z0-9_-]+)$")
+
+# Página de evento (prticket/page_parser.py: el dataLayer y el src de cada <img> ya aislado).
+DATA_LAYER_RE = re.compile(r"(?is)var\s+dataLayerP4\s*=\s*(\{.*?\});")
+ANY_IMG_RE = re.compile(r"""(?is)<img[^>]*\bsrc=["']([^"']+)["'][^>]*>""")
+
+# Fechas y horas (prticket/datetime_scanner.py). Todos los formatos vivos empiezan con
+# \b + 1-2 dígitos: se consumen solo esos dígitos y el resto va en un lookahead con grupos con
+# nombre, así la búsqueda sigue justo después y ve un formato que empiece dentro del match de
+# otro, como pasaba con un findall por formato. Las fechas se buscan sobre texto normalizado.
+DATE_SCAN_RE = re.compile(
+    r"\b(?P<d>\d{1,2})"
+    r"(?=(?P<es>\s+de\s+(?P<es_m>[a-z]+)\s+de\s+(?P<es_y>\d{4})\b)"
+    r"|(?P<num>/(?P<num_m>\d{1,2})/(?P<num_y>\d{2,4})\b))"
+)
+TIME_SCAN_RE = re.compile(
+    r"\b(?P<h>\d{1,2})"
+    r"(?=(?P<clock>:(?P<clock_m>\d{2})\s*(?P<clock_ampm>[AaPp]\.?\s*[Mm]\.?)?\b)"
+    r"|(?P<hour>\s*(?P<hour_ampm>[AaPp]\.?\s*[Mm]\.?)\b))"
+)
+
+# Precio y venues.
+PRICE_AMOUNT_RE = re.compile(r"\$\s*\d[\d,]*(?:\.\d{2})?")
+FREE_RE = re.compile(r"\b(gratis|free|libre de costo)\b", re.I)
+LEADING_JUNK_RE = re.compile(r"^[^A-Za-z0-9ÁÉÍÓÚÜÑáéíóúüñ]+")
+
+
+@lru_cache(maxsize=64)
+def meta_content_patterns(attr_name: str, attr_value: str) -> Tuple[Pattern[str], Pattern[str]]:
+    """Patrones (atributo antes de content, content antes de atributo) para un <meta>."""
+    name = re.escape(attr_name)
+    value = re.escape(attr_value)
+    forward = re.compile(
+        rf"""<meta\b[^>]*\b{name}=["']{value}["'][^>]*\bcontent=["']([^"']*)["'][^>]*>""",
+        re.I,
+    )
+    reverse = re.compile(
+        rf"""<meta\b[^>]*\bcontent=["']([^"']*)["'][^>]*\b{name}=["']{value}["'][^>]*>""",
+        re.I,
+    )
+    return forward, reverse
@@ -0,0 +1,35 @@
+"""
+Fuente PRticket para el pipeline común (pipeline.runner --sources prticket).
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from common.http_engine import HttpEngine
+from common.municipio_matcher import MunicipioMatcher
+from pipeline.models import EventScraped
+from pipeline.source import Source, register_source
+from prticket.scrape_prticket import (
+    FRONTPAGE_URL,
+    PARSER_VERSION,
+    REQUEST_TIMEOUT,
+    extract_frontpage_event_urls,
+    parse_event_page,
+)
+
+
+class PrticketSource(Source):
+    name = "prticket"
+    parser_version = PARSER_VERSION
+    default_headers = {"Accept-Language": "en-US,en;q=0.9,es;q=0.8"}
+    request_timeout = REQUEST_TIMEOUT
+
+    def discover(self, http: HttpEngine) -> List[str]:
+        return extract_frontpage_event_urls(http.fetch_text(FRONTPAGE_URL))
+
+    def parse(self, event_url: str, page_html: str, municipios: MunicipioMatcher) -> EventScraped:
+        return parse_event_page(event_url, page_html, municipios)
+
+
+SOURCE = register_source(PrticketSource())